@@ -0,0 +1,166 @@
+"""Asynchronous dispatch of input actions (pyautogui calls, volume commands, screenshots).
+
+Detectors used to call pyautogui directly and time.sleep() to debounce, stalling hand
+tracking for the whole duration. They now submit() actions to an ActionExecutor, which
+runs them in order on a worker thread. Rate limits and debouncing are checked at
+submission time instead of sleeping, and back-to-back events with the same key (scroll
+ticks, cursor moves) are coalesced while they wait in the queue.
+
+A synchronous executor (synchronous=True) applies the same limits but runs accepted
+actions inline; trace replay uses it, together with the trace's clock, to be deterministic.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from tracing import tracer
+from event_log import event_log
+
+
+class _PendingAction:
+    __slots__ = ('key', 'func', 'args', 'amount', 'submitted_at')
+
+    def __init__(self, key, func, args, amount, submitted_at):
+        self.key = key
+        self.func = func
+        self.args = args
+        self.amount = amount
+        self.submitted_at = submitted_at
+
+
+class ActionExecutor:
+    """Runs submitted actions in FIFO order on a single background worker thread."""
+
+    def __init__(self, max_queue: int = 64, name: str = "ActionExecutor", synchronous: bool = False,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_queue = max_queue
+        self.name = name
+        self.synchronous = synchronous
+        self.clock = clock  # Time source for rate limits and debouncing
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._running = False
+        self._thread = None
+
+        self._last_accepted: Dict[str, float] = {}  # Per-key time of the last accepted submission
+        self._last_attempt: Dict[str, float] = {}   # Per-key time of the last submission, accepted or not
+
+        # Statistics
+        self.submitted = 0
+        self.executed = 0
+        self.rate_limited = 0
+        self.coalesced = 0
+        self.dropped = 0   # Rejected because the queue was full
+        self.errors = 0
+        self.last_latency = 0.0  # Seconds from submission to completion of the last action
+
+    def start(self):
+        """Start the worker thread. Returns self so it can be chained."""
+        if not self._running and not self.synchronous:
+            self._running = True
+            self._thread = threading.Thread(target=self._worker, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, key: str, func: Callable[..., Any], args: tuple = (), amount: Optional[float] = None,
+               min_interval: float = 0.0, debounce: float = 0.0, coalesce: bool = False, force: bool = False) -> bool:
+        """Queue func(*args) (or func(*args, amount)) without blocking. Returns True if accepted.
+
+        min_interval: accept at most one `key` action per interval (rate limit).
+        debounce: ignore `key` until it has not been submitted for this long (held triggers fire once).
+        coalesce: if the newest queued action has the same key, merge into it instead of queueing
+                  another one: amounts are added up, otherwise the latest args win.
+        force: always accept, past the rate limits and max_queue. For actions that end something
+               (mouse_up after a drag): dropping those would leave an OS button held.
+        """
+        now = self.clock()
+        with self._cond:
+            self.submitted += 1
+            last_attempt = self._last_attempt.get(key)
+            self._last_attempt[key] = now
+            if debounce and not force and last_attempt is not None and now - last_attempt < debounce:
+                self.rate_limited += 1
+                return False
+            if min_interval and not force and now - self._last_accepted.get(key, -min_interval) < min_interval:
+                self.rate_limited += 1
+                return False
+
+            if coalesce and self._queue and self._queue[-1].key == key:
+                pending = self._queue[-1]
+                if amount is not None and pending.amount is not None:
+                    pending.amount += amount
+                else:
+                    pending.args, pending.amount = args, amount
+                self.coalesced += 1
+                self._last_accepted[key] = now
+                return True
+
+            if len(self._queue) >= self.max_queue and not force:
+                self.dropped += 1
+                return False
+
+            self._last_accepted[key] = now
+            action = _PendingAction(key, func, args, amount, time.monotonic())
+            if not self.synchronous:
+                self._queue.append(action)
+                self._cond.notify()
+                return True
+
+        self._run(action)
+        return True
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue and self._running:
+                    self._cond.wait()
+                if not self._queue:
+                    return  # Stopped and drained
+                action = self._queue.popleft()
+                self._busy = True
+            self._run(action)
+
+    def _run(self, action):
+        t = tracer.now() if tracer.enabled else 0
+        try:
+            if action.amount is None:
+                action.func(*action.args)
+            else:
+                action.func(*action.args, action.amount)
+        except Exception as e:
+            self.errors += 1
+            event_log.error('action_error', f"Error executing action '{action.key}': {e}", key='action_error:' + action.key,
+                            latency=time.monotonic() - action.submitted_at)
+        finally:
+            with self._cond:
+                self.executed += 1
+                self.last_latency = time.monotonic() - action.submitted_at
+                self._busy = False
+                self._cond.notify_all()
+            if t: tracer.lap('action ' + action.key, t) # On the thread that ran it
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of actions waiting to run."""
+        return len(self._queue)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued action has run. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout: float = 2.0):
+        """Run what is still queued, then stop the worker."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
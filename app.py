@@ -1,10 +1,12 @@
 import cv2
 import mediapipe as mp
 from controller import Controller
+from frame_capture import FrameGrabber
 import threading
 import time
 
-cap = cv2.VideoCapture(0)
+# Capture runs on its own thread; the loop below always gets the freshest frame
+cap = FrameGrabber(0).start() # Opens (and on release() closes) camera 0 itself
 
 mpHands = mp.solutions.hands
 hands = mpHands.Hands()
@@ -26,12 +28,13 @@ def handle_keyboard_input():
             if command.startswith('record '):
                 # Start recording a new gesture
                 gesture_name = command[7:]  # Remove 'record ' prefix
-                if gesture_name:
+                if gesture_name and Controller.start_gesture_recording(gesture_name):
                     recording_gesture_name = gesture_name
                     recording_gesture = True
                     recording_start_time = time.time()
-                    Controller.start_gesture_recording(gesture_name)
                     print(f"Recording gesture '{gesture_name}' - hold the gesture steady...")
+                elif gesture_name:
+                    print("Gesture name is too long, please choose a shorter one")
                 else:
                     print("Please provide a gesture name: record <gesture_name>")
             
@@ -114,11 +117,14 @@ print("Type 'help' for available commands")
 print("Press ESC in the video window to exit")
 print()
 
+imgRGB = None
 while True:
     success, img = cap.read()
-    img = cv2.flip(img, 1)
+    if not success:
+        break
+    img = cv2.flip(img, 1, dst=img) # In place, no new frame per call
 
-    imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=imgRGB) # Reuses last frame's buffer
     results = hands.process(imgRGB)
 
     if results.multi_hand_landmarks:
@@ -133,7 +139,7 @@ while True:
         Controller.detect_dragging()
         
         # Detect custom gestures
-        Controller.detect_custom_gestures()
+        Controller.detect_custom_gestures(Controller.hand_Landmarks)
     
     # Add recording indicator to the image
     if recording_gesture:
@@ -151,7 +157,9 @@ while True:
     if cv2.waitKey(5) & 0xff == 27:
         break
 
-cap.release()
+Controller.get_action_executor().stop() # Let queued input actions finish
+Controller.get_gesture_mapper().flush_config() # Write pending config changes
+cap.release() # Stops the capture thread and releases the camera
 cv2.destroyAllWindows()
 
 # Original gesture functions (comments from original code):
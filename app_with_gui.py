@@ -4,13 +4,26 @@ from controller import Controller # Assuming controller.py is in the same direct
 import threading
 import tkinter as tk
 from gesture_gui import GestureMapperGUI # Assuming gesture_gui.py is in the same directory
-import pyautogui
+from frame_capture import FrameGrabber
+from gesture_pipeline import process_hands, handedness_labels
+from hand_tracker import HandTracker, POLICIES
+from landmark_trace import TraceWriter
+from roi_inference import RoiHandDetector
+from inference_scheduler import InferenceScheduler
+from metrics import MetricsRing
+from tracing import tracer
+from event_log import event_log, FileSink
+from cursor_filter import FILTERS, make_filter
+import argparse
+import time
 
 # Initialize camera and MediaPipe
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
+camera = cv2.VideoCapture(0)
+if not camera.isOpened():
     print("Error: Could not open webcam.")
     exit()
+# Frames are read on a background thread so inference always sees the latest one
+cap = FrameGrabber(camera).start()
 
 mpHands = mp.solutions.hands
 # Initialize Hands with max_num_hands=2 for two-hand detection
@@ -39,30 +52,14 @@ def run_gui():
             pass # Ignore if already destroyed
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
-    
-    # Periodic update for GUI displays (e.g., list of gestures, actions)
-    def periodic_gui_update():
-        global gui_running
-        if gui_running and app: # Check if app object exists
-            try:
-                if root.winfo_exists(): # Check if root window still exists
-                    app.update_displays()
-                    root.after(2000, periodic_gui_update) # Update every 2 seconds
-                else:
-                    gui_running = False # Stop if window is gone
-            except Exception as e:
-                print(f"Error during GUI periodic update: {e}")
-                # gui_running = False # Optionally stop on error
-    
-    # Start the first periodic update if GUI is running
-    if gui_running:
-        root.after(100, periodic_gui_update) # Initial short delay
+    # GUI displays (gestures, actions, mappings) update themselves from the mapper's change queue
 
     try:
         root.mainloop()
     except Exception as e:
         print(f"Exception in GUI mainloop: {e}")
     finally:
+        app.close() # Stop queueing mapper changes for this window
         gui_running = False # Ensure flag is set if mainloop exits unexpectedly
         print("GUI mainloop finished.")
 
@@ -79,8 +76,36 @@ def start_gui():
         print("GUI is already running or attempting to start.")
 
 
-def main():
+def main(record_trace=None, roi=False, infer_every=1, primary='right', profile=None, log_file=None,
+         cursor_filter='one_euro'):
     global gui_running
+    # Persistent hand ids; the primary hand (cursor, clicks, drags) is chosen by this policy
+    Controller.set_hand_tracker(HandTracker(policy=primary))
+    # Cursor smoothing: One Euro by default; 'lerp' is the old fixed 0.3 blend
+    Controller.cursor_filter = make_filter(cursor_filter)
+    # Optionally run inference on a crop around the tracked hand instead of the full frame
+    # (crops go to their own static-mode Hands, see roi_inference.py)
+    detector = RoiHandDetector(hands, mpHands.Hands(static_image_mode=True, max_num_hands=2,
+                                                    min_detection_confidence=0.7)) if roi else hands
+    # Inference every N frames ('auto': from measured inference time); landmarks are predicted in between
+    scheduler = InferenceScheduler(detector, every=1 if infer_every == 'auto' else int(infer_every),
+                                   adaptive=infer_every == 'auto')
+    # Optionally record every frame's landmarks for offline replay (see landmark_trace.py)
+    trace_writer = TraceWriter(record_trace) if record_trace else None
+    # Per-frame timings for the GUI's performance tab (a few stores per frame; the GUI does the math)
+    metrics = MetricsRing()
+    Controller.set_metrics(metrics)
+    executor = Controller.get_action_executor()
+    if trace_writer is not None:
+        print(f"Recording landmark trace to '{record_trace}'")
+    # Optionally also write every log record (detector events, gesture actions, errors) as JSON lines
+    log_sink = FileSink(log_file) if log_file else None
+    if log_sink is not None:
+        event_log.add_sink(log_sink)
+    # Optionally record hot-path spans (capture, inference, detectors, matching, actions) for chrome://tracing
+    if profile:
+        tracer.enable()
+        print(f"Tracing enabled; spans will be written to '{profile}' on exit")
     print("Hand Gesture Control with Custom Mapping (Two-Hand Capable)")
     print("==========================================================")
     print("Controls (in video window):")
@@ -89,63 +114,43 @@ def main():
     print("  ESC - Exit application")
     print()
     
+    imgRGB = None
     try:
         while True:
+            t = tracer.now() if tracer.enabled else 0
             success, img = cap.read()
+            if t: tracer.lap('capture', t)
             if not success:
                 print("Failed to grab frame from webcam. Exiting.")
                 break # Exit if no frame
                 
-            img = cv2.flip(img, 1) # Flip horizontally for intuitive movement
-            imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            results = hands.process(imgRGB)
+            img = cv2.flip(img, 1, dst=img) # Flip horizontally for intuitive movement (in place)
+            imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=imgRGB) # Reuses last frame's buffer
+            t = tracer.now() if tracer.enabled else 0
+            t0 = time.perf_counter()
+            results = scheduler.process(imgRGB)
+            t1 = time.perf_counter()
+            if t: tracer.lap('inference' if results.inferred else 'predict_landmarks', t)
 
-            primary_hand_lms = None # Landmarks of the designated primary hand
+            if trace_writer is not None and results.inferred:
+                trace_writer.write_results(results)
+
+            # Built-in gestures on the primary hand, custom gestures on every hand
+            process_hands(results.multi_hand_landmarks, handedness_labels(results.multi_handedness),
+                          inferred=results.inferred)
+            t2 = time.perf_counter()
+            metrics.record(t1 - t0 if results.inferred else float('nan'), t2 - t1, executor.queue_depth,
+                           cap.frames_captured, cap.frames_dropped, t2)
 
             if results.multi_hand_landmarks:
-                # Determine primary hand (e.g., first detected, or prefer 'Right' hand if available)
-                primary_hand_idx = 0 # Default to first hand
-                if results.multi_handedness:
-                    for i, handedness_info in enumerate(results.multi_handedness):
-                        if handedness_info.classification[0].label == 'Right':
-                            primary_hand_idx = i
-                            break # Found 'Right' hand, use it as primary
-                
-                if primary_hand_idx < len(results.multi_hand_landmarks):
-                     primary_hand_lms = results.multi_hand_landmarks[primary_hand_idx]
-
-                if primary_hand_lms:
-                    Controller.hand_Landmarks = primary_hand_lms # Set for built-in functions
-                    Controller.update_fingers_status() # Based on Controller.hand_Landmarks (primary)
-                    
-                    # These built-in actions will use the primary hand's landmarks
-                    Controller.cursor_moving()
-                    Controller.detect_scrolling()
-                    Controller.detect_zoomming() # Renamed from zoomming
-                    Controller.detect_clicking()
-                    Controller.detect_dragging()
-                
-                # Process ALL detected hands for custom gestures and drawing
-                for i, hand_lms_data in enumerate(results.multi_hand_landmarks):
-                    # If recording, only use the primary hand for collecting gesture data
-                    if Controller.get_gesture_mapper().recording_mode:
-                        if hand_lms_data == primary_hand_lms: # Compare actual landmark objects
-                            Controller.detect_custom_gestures(hand_lms_data)
-                    else:
-                        # If not recording, detect custom gestures on any hand
-                        Controller.detect_custom_gestures(hand_lms_data)
-                    
+                h, w = img.shape[:2]
+                for hand_lms_data in results.multi_hand_landmarks:
                     # Draw landmarks for the current hand
-                    mpDraw.draw_landmarks(img, hand_lms_data, mpHands.HAND_CONNECTIONS)
-            else:
-                # No hands detected, clear primary hand landmarks for Controller
-                Controller.hand_Landmarks = None 
-                # Optionally reset states like dragging if no hands are present for a while
-                if Controller.dragging:
-                    pyautogui.mouseUp(button="left")
-                    Controller.dragging = False
-                    print("Dragging STOPPED (no hands detected)")
-
+                    if results.inferred:
+                        mpDraw.draw_landmarks(img, hand_lms_data, mpHands.HAND_CONNECTIONS)
+                    else: # Predicted (21, 3) array between inference frames
+                        for x, y, _ in hand_lms_data:
+                            cv2.circle(img, (int(x * w), int(y * h)), 3, (0, 255, 255), cv2.FILLED)
 
             # --- Add status information to the image ---
             cv2.putText(img, "Hand Gesture Control", (10, 30), 
@@ -183,7 +188,20 @@ def main():
             # Note: GUI thread itself might take a moment to close if stuck in mainloop.
             # Consider root.quit() or root.destroy() if accessible and thread-safe.
 
+        if trace_writer is not None:
+            trace_writer.close()
+            print(f"Saved {trace_writer.frames_written} frames to '{record_trace}'")
+        if profile:
+            tracer.disable()
+            print(f"Saved {tracer.export_chrome(profile)} spans to '{profile}'")
+
         print("Releasing camera and destroying OpenCV windows...")
+        Controller.get_action_executor().stop() # Let queued input actions finish
+        Controller.get_gesture_mapper().flush_config() # Write pending config changes
+        event_log.flush(timeout=2.0) # Let queued log records reach the console and the log file
+        if log_sink is not None:
+            event_log.remove_sink(log_sink)
+            log_sink.close()
         cap.release()
         cv2.destroyAllWindows()
         print("Application main loop finished.")
@@ -229,13 +247,31 @@ def show_help():
     print(help_text)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hand gesture control with custom gesture mapping")
+    parser.add_argument('--record-trace', metavar='PATH',
+                        help="record per-frame hand landmarks to a binary trace file for replay")
+    parser.add_argument('--roi', action='store_true',
+                        help="run hand inference on a crop around the tracked hand (faster on high-res cameras)")
+    parser.add_argument('--infer-every', default='1', metavar='N|auto',
+                        help="run hand inference every N frames, or 'auto' to adapt to inference time")
+    parser.add_argument('--primary', default='right', choices=POLICIES,
+                        help="which hand drives the cursor, clicks and drags (default: right)")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="record hot-path timing spans and write them as Chrome trace JSON on exit")
+    parser.add_argument('--cursor-filter', default='one_euro', choices=list(FILTERS),
+                        help="cursor smoothing filter (default: one_euro; lerp is the old fixed blend)")
+    parser.add_argument('--log-file', metavar='PATH',
+                        help="also append structured log records (JSON lines) to this file")
+    args = parser.parse_args()
     try:
-        main()
+        main(record_trace=args.record_trace, roi=args.roi, infer_every=args.infer_every, primary=args.primary,
+             profile=args.profile, log_file=args.log_file, cursor_filter=args.cursor_filter)
     except Exception as e:
         print(f"An error occurred in main: {str(e)}")
     finally:
         # Ensure cleanup, though main() already has its own.
-        if cap.isOpened():
-            cap.release()
+        cap.release()
+        if camera.isOpened():
+            camera.release()
         cv2.destroyAllWindows()
         print("Application closed.")
\ No newline at end of file
@@ -0,0 +1 @@
+"""Headless benchmarks. Run from the repository root, e.g. `python -m benchmarks.capture`."""
@@ -0,0 +1,60 @@
+"""Time the vision loop spends dispatching actions: synchronous calls vs ActionExecutor.
+
+Uses a fake input backend whose calls take as long as real pyautogui/subprocess calls.
+    python -m benchmarks.action_dispatch [--frames 300] [--call-ms 20]
+"""
+import argparse
+import time
+
+from action_executor import ActionExecutor
+
+
+class FakeInput:
+    """Stand-in for pyautogui: every call blocks for call_s and is logged."""
+
+    def __init__(self, call_s):
+        self.call_s = call_s
+        self.events = []
+
+    def scroll(self, amount):
+        time.sleep(self.call_s)
+        self.events.append(('scroll', amount))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--call-ms', type=float, default=20.0)
+    args = parser.parse_args()
+    call_s = args.call_ms / 1000.0
+
+    # Old behaviour: scroll + time.sleep(0.2) inline on every frame the gesture is held
+    fake = FakeInput(call_s)
+    frames = min(args.frames, 20)  # Each frame takes >200 ms here, keep it short
+    start = time.perf_counter()
+    for _ in range(frames):
+        fake.scroll(120)
+        time.sleep(0.2)
+    sync_ms = (time.perf_counter() - start) / frames * 1000
+    print(f"synchronous: {sync_ms:.2f} ms/frame in the vision loop, {len(fake.events)} scrolls")
+
+    fake = FakeInput(call_s)
+    executor = ActionExecutor().start()
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        executor.submit('scroll_up', fake.scroll, amount=120, min_interval=0.2, coalesce=True)
+        time.sleep(1 / 60)  # 60 FPS loop
+    loop_s = time.perf_counter() - start
+    executor.wait_idle()
+    executor.stop()
+    print(f"executor:    {executor.submitted} submits over {loop_s:.1f}s, "
+          f"{len(fake.events)} scrolls, {executor.rate_limited} rate-limited, "
+          f"last latency {executor.last_latency * 1000:.1f} ms")
+    submit_start = time.perf_counter()
+    for _ in range(10000):
+        executor.submit('noop', lambda: None, min_interval=1e9)
+    print(f"submit cost: {(time.perf_counter() - submit_start) / 10000 * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Serial vs threaded capture: how old is the frame the vision loop works on?
+
+Simulates a 60 FPS camera and a 25 ms inference step, no camera or MediaPipe needed.
+    python -m benchmarks.capture [--fps 60] [--work-ms 25] [--frames 300]
+"""
+import argparse
+import statistics
+import time
+
+from frame_capture import FrameGrabber, synthetic_frames
+
+
+class _PacedCamera:
+    """cv2.VideoCapture stand-in that buffers frames like a driver does."""
+
+    def __init__(self, fps, count):
+        self.interval = 1.0 / fps
+        self.count = count
+        self.start = time.perf_counter()
+        self.delivered = 0
+        self.frames = synthetic_frames(count=count)
+
+    def read(self):
+        if self.delivered >= self.count:
+            return False, None
+        # Frame n becomes available at start + n * interval; a serial reader that falls
+        # behind gets queued (old) frames, exactly like the driver buffer.
+        due = self.start + self.delivered * self.interval
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self.delivered += 1
+        self.last_capture_time = due
+        return True, next(self.frames)
+
+
+def run_serial(fps, work_s, frames):
+    cam = _PacedCamera(fps, frames)
+    ages = []
+    while True:
+        success, _ = cam.read()
+        if not success:
+            break
+        ages.append(time.perf_counter() - cam.last_capture_time)
+        time.sleep(work_s)  # Stand-in for flip + cvtColor + hands.process + detectors
+    return ages
+
+
+def run_threaded(fps, work_s, frames):
+    grabber = FrameGrabber(synthetic_frames(count=frames, fps=fps)).start()
+    ages = []
+    while True:
+        success, _ = grabber.read()
+        if not success:
+            break
+        ages.append(time.perf_counter() - grabber.last_timestamp)
+        time.sleep(work_s)
+    grabber.stop()
+    return ages, grabber.frames_dropped
+
+
+def _summary(ages):
+    ms = sorted(a * 1000 for a in ages)
+    return (f"frames={len(ms)} mean_age={statistics.mean(ms):.1f}ms "
+            f"p95_age={ms[int(0.95 * (len(ms) - 1))]:.1f}ms max_age={ms[-1]:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fps', type=float, default=60.0)
+    parser.add_argument('--work-ms', type=float, default=25.0)
+    parser.add_argument('--frames', type=int, default=300)
+    args = parser.parse_args()
+
+    work_s = args.work_ms / 1000.0
+    print("serial:  ", _summary(run_serial(args.fps, work_s, args.frames)))
+    ages, dropped = run_threaded(args.fps, work_s, args.frames)
+    print("threaded:", _summary(ages), f"dropped={dropped}")
+
+
+if __name__ == "__main__":
+    main()
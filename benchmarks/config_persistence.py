@@ -0,0 +1,65 @@
+"""Latency of GestureMapper mutations: synchronous config saves vs write-behind.
+
+Times map_gesture_to_action/remove_gesture_mapping calls (what the GUI triggers) on a
+mapper with many mappings, with save_delay=None (blocking JSON dump per call, the old
+behavior) and with the debounced background writer. Files go to a temporary directory.
+    python -m benchmarks.config_persistence [--mappings 2000] [--calls 200]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic import random_templates
+from gesture_mapper import GestureMapper
+from input_backend import NullBackend
+
+
+def run(directory, save_delay, mappings, calls):
+    config = os.path.join(directory, f"config_{save_delay}.json")
+    with contextlib.redirect_stdout(io.StringIO()):  # Keep console output out of the timings
+        mapper = GestureMapper(config, backend=NullBackend(), save_delay=save_delay)
+        mapper.import_templates(random_templates(mappings))
+        actions = mapper.get_available_actions()
+        for i in range(mappings):
+            mapper.gesture_mapping[f"gesture_{i}"] = actions[i % len(actions)]
+        mapper.save_config()
+        mapper.flush_config()
+
+        latencies = []
+        start = time.perf_counter()
+        for i in range(calls):
+            t = time.perf_counter()
+            if i % 2:
+                mapper.remove_gesture_mapping(f"gesture_{i}")
+            else:
+                mapper.map_gesture_to_action(f"gesture_{i}", actions[(i + 1) % len(actions)])
+            latencies.append(time.perf_counter() - t)
+        total = time.perf_counter() - start
+        t = time.perf_counter()
+        mapper.flush_config()
+        flush = time.perf_counter() - t
+    writes = mapper.config_writer.writes if mapper.config_writer else calls + 1
+    return latencies, total, flush, writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mappings', type=int, default=2000)
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label, delay in (("synchronous", None), ("write-behind", 0.5)):
+            latencies, total, flush, writes = run(directory, delay, args.mappings, args.calls)
+            ms = sorted(l * 1000 for l in latencies)
+            print(f"{label:>13}: p50 {statistics.median(ms):.3f} ms, p99 {ms[int(0.99 * (len(ms) - 1))]:.3f} ms, "
+                  f"max {ms[-1]:.3f} ms per call; {args.calls} calls in {total * 1000:.1f} ms, "
+                  f"final flush {flush * 1000:.1f} ms, {writes} file writes")
+
+
+if __name__ == "__main__":
+    main()
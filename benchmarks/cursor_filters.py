@@ -0,0 +1,148 @@
+"""Cursor filters compared on replayed hand motion: jitter, delay, tracking error, settle time.
+
+Feeds the index fingertip of each frame (the point Controller.cursor_moving uses) with
+its timestamp through every filter in cursor_filter.py and measures, in screen pixels:
+
+    jitter  RMS frame-to-frame cursor movement once the hand has been still for SETTLED s
+    delay   time shift that best aligns the cursor with the true path while moving
+    error   mean distance to the true path while moving
+    settle  time after a fast move ends until the cursor is within --tolerance px of
+            the target (synthetic motion only)
+
+The default source is scripted motion (holds, fast flicks, slow drags and circles) with
+Gaussian landmark noise, where the true path is known. With --trace, a recorded landmark
+trace is replayed and a centered (zero-lag) moving average stands in for the true path.
+    python -m benchmarks.cursor_filters [--seconds 60] [--noise 0.003] [--trace FILE]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from cursor_filter import KalmanFilter, LerpFilter, OneEuroFilter
+
+SCREEN = (1920, 1080)
+INDEX_TIP = 8
+STILL_SPEED = 0.02  # Normalized units per second below which the hand counts as still
+SETTLED = 0.5  # Seconds a hand must have been still before its frames count towards jitter
+
+
+def _min_jerk(start, end, frames):
+    s = np.linspace(0.0, 1.0, frames)[:, None]
+    return start + (end - start) * (10 * s ** 3 - 15 * s ** 4 + 6 * s ** 5)
+
+
+def scripted_motion(seconds: float, fps: float = 30.0, seed: int = 0):
+    """(timestamps, true path, ends of fast moves): holds alternating with flicks, drags and circles."""
+    rng = np.random.default_rng(seed)
+    path, flick_ends = [np.array([[0.5, 0.5]])], []
+    while len(np.concatenate(path)) < seconds * fps:
+        here = path[-1][-1]
+        path.append(np.repeat(here[None], int(rng.uniform(0.8, 1.5) * fps), axis=0))  # Hold
+        kind = rng.integers(3)
+        target = rng.uniform(0.2, 0.8, 2)
+        if kind == 0:  # Flick: most of the screen in 150-250 ms
+            path.append(_min_jerk(here, target, int(rng.uniform(0.15, 0.25) * fps)))
+            flick_ends.append(len(np.concatenate(path)) - 1)
+        elif kind == 1:  # Slow drag
+            path.append(_min_jerk(here, target, int(rng.uniform(1.5, 2.5) * fps)))
+        else:  # Circle back to the start
+            angle = np.linspace(0.0, 2 * np.pi, int(rng.uniform(1.0, 2.0) * fps))[:, None]
+            radius = rng.uniform(0.05, 0.15)
+            path.append(here + radius * np.hstack([np.cos(angle) - 1.0, np.sin(angle)]))
+    truth = np.concatenate(path)
+    return np.arange(len(truth)) / fps, truth, flick_ends
+
+
+def trace_motion(path: str):
+    """(timestamps, fingertip path, reference path) of the first hand in a landmark trace."""
+    from landmark_trace import read_trace
+    times, tips = [], []
+    for frame in read_trace(path):
+        if len(frame.hands):
+            times.append(frame.timestamp)
+            tips.append(frame.hands[0][INDEX_TIP, :2])
+    tips = np.asarray(tips, dtype=np.float64)
+    kernel = np.ones(5) / 5.0
+    reference = np.column_stack([np.convolve(np.pad(tips[:, i], 2, mode='edge'), kernel, 'valid') for i in range(2)])
+    return np.asarray(times), tips, reference
+
+
+def run(cursor_filter, times, measurements):
+    cursor_filter.reset()
+    out = np.empty_like(measurements)
+    start = time.perf_counter()
+    for i, (t, (x, y)) in enumerate(zip(times, measurements)):
+        out[i] = cursor_filter(x, y, t)
+    return out, (time.perf_counter() - start) / len(times)
+
+
+def evaluate(out, truth, times, flick_ends, tolerance):
+    scale = np.array(SCREEN, dtype=np.float64)
+    dt = float(np.median(np.diff(times)))
+    speed = np.r_[0.0, np.hypot(*np.diff(truth, axis=0).T)] / dt
+    still = speed < STILL_SPEED
+    # Frames still for SETTLED seconds: the filters have caught up, what is left is jitter
+    window = max(int(round(SETTLED / dt)), 1)
+    settled = np.convolve(still, np.ones(window), 'full')[:len(still)] >= window
+    steps = np.diff(out, axis=0) * scale
+    jitter = float(np.sqrt(np.mean(np.sum(steps[settled[1:]] ** 2, axis=1))))
+
+    moving = ~still
+    error = float(np.mean(np.hypot(*((out[moving] - truth[moving]) * scale).T)))
+    # Delay: the shift of the true path (sub-frame, interpolated) that brings it closest to the cursor
+    shifts = np.arange(0.0, 10.0, 0.25)
+    shift_errors = [np.mean(np.hypot(*((out[moving] - np.column_stack(
+        [np.interp(times[moving] - s * dt, times, truth[:, i]) for i in range(2)])) * scale).T)) for s in shifts]
+    delay = float(shifts[int(np.argmin(shift_errors))] * dt)
+
+    settles = []
+    for end in flick_ends:
+        distance = np.hypot(*((out[end:] - truth[end]) * scale).T)
+        within = np.flatnonzero(distance <= tolerance)
+        if len(within):
+            settles.append(within[0] * dt)
+    settle = float(np.mean(settles)) if settles else float('nan')
+    return jitter, delay, error, settle
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=60.0)
+    parser.add_argument('--noise', type=float, default=0.003, help="landmark noise std (normalized units)")
+    parser.add_argument('--tolerance', type=float, default=10.0, help="settle distance (px)")
+    parser.add_argument('--trace', help="replay the first hand of a landmark trace instead")
+    args = parser.parse_args()
+
+    if args.trace:
+        times, measurements, truth = trace_motion(args.trace)
+        flick_ends = []
+        print(f"{args.trace}: {len(times)} frames with a hand (reference: centered 5-frame average)")
+    else:
+        times, truth, flick_ends = scripted_motion(args.seconds)
+        measurements = truth + np.random.default_rng(1).normal(0.0, args.noise, truth.shape)
+        print(f"{len(times)} frames at 30 FPS, {len(flick_ends)} flicks, noise {args.noise} "
+              f"({args.noise * SCREEN[0]:.1f} px)")
+
+    filters = [
+        ('raw (no filter)', None),
+        ('lerp 0.3 (old)', LerpFilter(0.3)),
+        ('lerp 0.5', LerpFilter(0.5)),
+        ('one euro (default)', OneEuroFilter()),
+        ('one euro beta 40', OneEuroFilter(beta=40.0)),
+        ('one euro min_cutoff 0.5', OneEuroFilter(min_cutoff=0.5)),
+        ('kalman (default)', KalmanFilter()),
+        ('kalman process 0.3', KalmanFilter(process_noise=0.3)),
+    ]
+    print(f"{'filter':<26}{'jitter px':>10}{'delay ms':>10}{'error px':>10}{'settle ms':>11}{'us/call':>9}")
+    for name, cursor_filter in filters:
+        if cursor_filter is None:
+            out, cost = measurements, 0.0
+        else:
+            out, cost = run(cursor_filter, times, measurements)
+        jitter, delay, error, settle = evaluate(out, truth, times, flick_ends, args.tolerance)
+        print(f"{name:<26}{jitter:>10.2f}{delay * 1000:>10.0f}{error:>10.1f}{settle * 1000:>11.0f}{cost * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
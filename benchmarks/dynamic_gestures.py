@@ -0,0 +1,160 @@
+"""Streaming DTW for moving gestures: per-frame cost vs template count, and detection accuracy.
+
+Templates are swipes (four directions), circles (both ways) and a wave recorded from
+synthetic hands, plus random smooth motions as filler templates. The live session
+alternates idle stretches with one of the gestures performed faster or slower (speed
+0.6-1.5x), at a random position and hand size, with landmark noise. Reports:
+- per-frame update cost (motion feature included) and the share of DTW cells still live,
+  with early abandoning and without (the matches must be identical)
+- gestures detected correctly, confused, missed, and matches fired while idle
+    python -m benchmarks.dynamic_gestures [--gestures 200] [--templates 7,50,200,1000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import hand_pose
+from dynamic_gestures import DynamicGestureMatcher, motion_feature, trim_idle
+
+OPEN_PALM = (True, True, True, True, True)
+POINTING = (False, True, False, False, False)
+TEMPLATE_FRAMES = 24  # Frames a gesture takes at speed 1
+
+
+def _ease(t):
+    return t * t * (3.0 - 2.0 * t)
+
+
+# name -> (pose, path(t) -> (dx, dy) for t in [0, 1])
+GESTURES = {
+    'swipe_right': (OPEN_PALM, lambda t: (0.3 * _ease(t) - 0.15, 0.0)),
+    'swipe_left': (OPEN_PALM, lambda t: (0.15 - 0.3 * _ease(t), 0.0)),
+    'swipe_up': (OPEN_PALM, lambda t: (0.0, 0.12 - 0.24 * _ease(t))),
+    'swipe_down': (OPEN_PALM, lambda t: (0.0, 0.24 * _ease(t) - 0.12)),
+    'circle_cw': (POINTING, lambda t: (0.1 * np.sin(2 * np.pi * t), -0.1 * np.cos(2 * np.pi * t))),
+    'circle_ccw': (POINTING, lambda t: (-0.1 * np.sin(2 * np.pi * t), -0.1 * np.cos(2 * np.pi * t))),
+    'wave': (OPEN_PALM, lambda t: (0.07 * np.sin(3 * np.pi * t), 0.0)),
+}
+
+
+def perform(pose, path, frames, origin=(0.0, 0.0), scale=1.0, jitter=0.0, rng=None):
+    """Hands following path over the given number of frames."""
+    hands = []
+    for t in np.linspace(0.0, 1.0, frames):
+        dx, dy = path(t)
+        hands.append(hand_pose(pose, (origin[0] + dx * scale, origin[1] + dy * scale), scale, jitter, rng))
+    return hands
+
+
+def features(hands):
+    rows, previous = [], None
+    for hand in hands:
+        feature, previous = motion_feature(hand, previous)
+        if feature is not None:
+            rows.append(feature)
+    return np.array(rows)
+
+
+def filler_templates(count, seed=0):
+    """Random smooth motions (sums of a few sinusoids) of 15-60 frames."""
+    rng = np.random.default_rng(seed)
+    templates = {}
+    for i in range(count):
+        a, f, p = rng.uniform(0.02, 0.12, (2, 3)), rng.uniform(0.3, 2.0, (2, 3)), rng.uniform(0, 2 * np.pi, (2, 3))
+
+        def path(t, a=a, f=f, p=p):
+            return tuple((a[axis] * np.sin(2 * np.pi * f[axis] * t + p[axis])).sum() for axis in range(2))
+        pose = tuple(bool(b) for b in rng.integers(0, 2, 5))
+        templates[f'filler_{i}'] = features(perform(pose, path, int(rng.integers(15, 61))))
+    return templates
+
+
+def gesture_templates():
+    return {name: trim_idle(features(perform(pose, path, TEMPLATE_FRAMES + 1)))
+            for name, (pose, path) in GESTURES.items()}
+
+
+def live_session(num_gestures, seed=1, jitter=0.0015):
+    """(hands, [(gesture, first frame, last frame)]) of idle stretches and performed gestures."""
+    rng = np.random.default_rng(seed)
+    names = list(GESTURES)
+    hands, truth = [], []
+    for _ in range(num_gestures):
+        origin = tuple(rng.uniform(-0.1, 0.1, 2))
+        scale = rng.uniform(0.75, 1.25)
+        name = names[rng.integers(len(names))]
+        pose, path = GESTURES[name]
+        start_pose = path(0.0)
+        idle = int(rng.integers(15, 40))
+        hands += perform(pose, lambda t: start_pose, idle, origin, scale, jitter, rng)
+        frames = max(6, int(round(TEMPLATE_FRAMES / rng.uniform(0.6, 1.5))))
+        truth.append((name, len(hands), len(hands) + frames - 1))
+        hands += perform(pose, path, frames, origin, scale, jitter, rng)
+    return hands, truth
+
+
+def run(matcher, hands):
+    """(matches as (frame, name), us per frame)."""
+    matcher.reset()
+    matches = []
+    start = time.perf_counter()
+    for frame, hand in enumerate(hands):
+        match = matcher.update(0, hand)
+        if match:
+            matches.append((frame, match[0]))
+    return matches, (time.perf_counter() - start) / len(hands) * 1e6
+
+
+def score(matches, truth, grace=12):
+    correct = confused = false_alarms = 0
+    windows = iter(truth)
+    window = next(windows, None)
+    detected = set()
+    for frame, name in matches:
+        while window and frame > window[2] + grace:
+            window = next(windows, None)
+        if window and window[1] <= frame:
+            if window in detected:
+                false_alarms += 1
+            elif name == window[0]:
+                correct += 1
+                detected.add(window)
+            else:
+                confused += 1
+                detected.add(window)
+        else:
+            false_alarms += 1
+    return correct, confused, len(truth) - len(detected), false_alarms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--gestures', type=int, default=200, help="gestures performed in the live session")
+    parser.add_argument('--templates', default='7,50,200,1000', help="template counts (first 7 are the gestures)")
+    args = parser.parse_args()
+
+    hands, truth = live_session(args.gestures)
+    counts = [int(c) for c in args.templates.split(',')]
+    fillers = filler_templates(max(counts) - len(GESTURES))
+    print(f"{len(hands)} frames, {len(truth)} gestures performed")
+    print(f"{'templates':>10}{'frames':>8}{'us/frame':>10}{'live':>7}{'no abandon':>12}"
+          f"{'correct':>9}{'confused':>10}{'missed':>8}{'false':>7}")
+    for count in counts:
+        templates = gesture_templates()
+        templates.update(list(fillers.items())[:max(0, count - len(GESTURES))])
+        pruned = DynamicGestureMatcher()
+        pruned.compile(templates)
+        dense = DynamicGestureMatcher(early_abandon=False)
+        dense.compile(templates)
+        matches, us = run(pruned, hands)
+        dense_matches, _ = run(dense, hands)
+        assert matches == dense_matches, "early abandoning changed the matches"
+        correct, confused, missed, false_alarms = score(matches, truth)
+        print(f"{len(templates):>10}{pruned.size:>8}{us:>10.1f}"
+              f"{pruned.cells_active / pruned.cells_total:>7.1%}{dense.cells_active / dense.cells_total:>12.1%}"
+              f"{correct:>9}{confused:>10}{missed:>8}{false_alarms:>7}")
+
+
+if __name__ == "__main__":
+    main()
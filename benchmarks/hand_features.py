@@ -0,0 +1,136 @@
+"""Gesture matching across camera distance and hand roll: raw-distance vs invariant signatures.
+
+Records one template per finger combination (32) at the reference size, then matches
+poses shown smaller/larger (hand at another distance from the camera) and rolled in the
+image plane, with landmark noise. Compares the old signature (finger states + two raw
+3D tip distances) with the hand_features vector at several tolerances: correct matches,
+wrong matches (each would dispatch the wrong action) and misses. Also times the
+feature extraction.
+
+The touch test (Controller's thumb-to-fingertip clicks) is compared the same way: a fixed
+0.05 2D distance (the old test), 3D distance in palm sizes, and 2D distance in palm sizes
+(Controller.touch_threshold), on thumb tips placed touching (within 0.15 palm sizes) or
+apart (0.35-1.0 palm sizes) from the index tip, with more noise on z than on x and y, as
+MediaPipe's depth estimate has.
+    python -m benchmarks.hand_features [--queries 2000] [--max-roll 20] [--z-noise 0.015]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import hand_pose
+from hand_features import extract_features
+from landmark_array import analyze_hand, signature_distances
+from template_matcher import TemplateMatcher
+
+SCALES = ((0.55, 0.8), (0.8, 1.25), (1.25, 1.6))
+
+
+def legacy_signature(hand):
+    return {'fingers_up': list(analyze_hand(hand).fingers_extended), 'finger_distances': signature_distances(hand).tolist()}
+
+
+def invariant_signature(hand):
+    return {'fingers_up': list(analyze_hand(hand).fingers_extended),
+            'finger_distances': extract_features(hand).vector.tolist()}
+
+
+def rolled(hand, degrees):
+    angle = np.radians(degrees)
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]], dtype=np.float32)
+    out = hand.copy()
+    out[:, :2] = (hand[:, :2] - hand[0, :2]) @ rotation.T + hand[0, :2]
+    return out
+
+
+def combinations():
+    return [tuple(bool(mask >> bit & 1) for bit in range(5)) for mask in range(32)]
+
+
+def queries(count, scale_range, max_roll, seed=0):
+    rng = np.random.default_rng(seed)
+    poses = combinations()
+    result = []
+    for _ in range(count):
+        truth = int(rng.integers(len(poses)))
+        hand = hand_pose(poses[truth], rng.uniform(-0.1, 0.1, 2), rng.uniform(*scale_range), 0.002, rng)
+        result.append((f'pose_{truth}', rolled(hand, rng.uniform(-max_roll, max_roll))))
+    return result
+
+
+def accuracy(signature, frames, tolerance):
+    matcher = TemplateMatcher()
+    matcher.compile({f'pose_{i}': signature(hand_pose(pose)) for i, pose in enumerate(combinations())})
+    correct = wrong = 0
+    for truth, hand in frames:
+        name, _ = matcher.best_match(signature(hand), 1.0 - tolerance)
+        correct += name == truth
+        wrong += name is not None and name != truth
+    return correct, wrong, len(frames) - correct - wrong
+
+
+def touch_poses(count, scale_range, z_noise, seed=0):
+    """(touching, hand) pairs: thumb tip moved next to or away from the index tip."""
+    rng = np.random.default_rng(seed)
+    result = []
+    for _ in range(count):
+        scale = rng.uniform(*scale_range)
+        hand = hand_pose(offset=rng.uniform(-0.1, 0.1, 2), scale=scale, jitter=0.002, rng=rng)
+        palm = float(np.hypot(*(hand[9, :2] - hand[0, :2])))
+        touching = bool(rng.integers(2))
+        gap = rng.uniform(0.0, 0.15) if touching else rng.uniform(0.35, 1.0)
+        angle = rng.uniform(0.0, 2 * np.pi)
+        hand[4, :2] = hand[8, :2] + gap * palm * np.array([np.cos(angle), np.sin(angle)])
+        hand[:, 2] += rng.normal(0.0, z_noise * scale, 21).astype(np.float32)
+        result.append((touching, hand))
+    return result
+
+
+def touch_errors(frames):
+    """(missed touches, false touches) for the fixed 2D, 3D palm-size and 2D palm-size tests."""
+    errors = np.zeros((3, 2), dtype=np.int64)
+    for touching, hand in frames:
+        features = extract_features(hand)
+        tests = (float(np.hypot(*(hand[8, :2] - hand[4, :2]))) < 0.05,
+                 features.vector[0] < 0.3,  # Thumb-index, 3D palm sizes
+                 analyze_hand(hand).thumb_distances[0] < 0.25)
+        for i, touch in enumerate(tests):
+            errors[i] += (touching and not touch, touch and not touching)
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--max-roll', type=float, default=20.0, help="largest in-plane rotation (degrees)")
+    parser.add_argument('--z-noise', type=float, default=0.015, help="landmark z noise std at scale 1 (touch test)")
+    args = parser.parse_args()
+
+    print(f"{args.queries} queries per size range, roll up to {args.max_roll:.0f} degrees, 32 templates")
+    print(f"{'hand size':>10}{'tolerance':>10}{'raw correct':>13}{'wrong':>7}{'miss':>6}"
+          f"{'invariant correct':>19}{'wrong':>7}{'miss':>6}")
+    for scale_range in SCALES:
+        frames = queries(args.queries, scale_range, args.max_roll)
+        for tolerance in (0.1, 0.25):
+            raw = accuracy(legacy_signature, frames, tolerance)
+            invariant = accuracy(invariant_signature, frames, tolerance)
+            print(f"{scale_range[0]:>4.2f}-{scale_range[1]:<5.2f}{tolerance:>10.2f}"
+                  f"{raw[0]:>13}{raw[1]:>7}{raw[2]:>6}{invariant[0]:>19}{invariant[1]:>7}{invariant[2]:>6}")
+
+    print(f"touch test, {args.queries} poses per size range: missed touches / false touches")
+    print(f"{'hand size':>10}{'2D < 0.05':>12}{'3D palm < 0.3':>15}{'2D palm < 0.25':>16}")
+    for scale_range in SCALES:
+        errors = touch_errors(touch_poses(args.queries, scale_range, args.z_noise))
+        print(f"{scale_range[0]:>4.2f}-{scale_range[1]:<5.2f}" + "".join(
+            f"{f'{missed} / {false}':>{width}}" for (missed, false), width in zip(errors.tolist(), (12, 15, 16))))
+
+    hands = [hand for _, hand in queries(2000, (0.8, 1.25), args.max_roll, seed=1)]
+    start = time.perf_counter()
+    for hand in hands:
+        extract_features(hand)
+    print(f"extract_features: {(time.perf_counter() - start) / len(hands) * 1e6:.1f} us/hand")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Primary hand stability under handedness flicker, and HandTracker.update() cost.
+
+Replays a scripted two-hand session (the 'Right' hand circles, the 'Left' hand holds a
+pose) where each frame's handedness labels are flipped with probability --flicker and
+the hand order is shuffled, and the 'Right' hand misses single frames with probability
+--dropout (MediaPipe dropouts). Compares picking the primary hand from the labels each
+frame (the old select_primary_hand) with HandTracker: frames where the primary is the
+wrong hand, and how often the primary changes (each change would release a drag).
+Dropout frames themselves are not scored.
+    python -m benchmarks.hand_tracking [--frames 3000] [--flicker 0.1] [--dropout 0.02]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import as_landmark_list, random_poses, scripted_session
+from gesture_pipeline import select_primary_hand
+from hand_tracker import HandTracker
+
+FLIP = {'Right': 'Left', 'Left': 'Right'}
+
+
+def flickering_frames(num_frames, flicker, dropout=0.0, seed=0):
+    """(hands, labels, index of the true right hand, -1 if it dropped out) per frame."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for frame in scripted_session(num_frames, num_hands=2):
+        order = rng.permutation(len(frame.hands))
+        if rng.random() < dropout:
+            order = order[order != 0]  # The right hand is hand 0
+            frames.append(([frame.hands[i] for i in order], [frame.labels[i] for i in order], -1))
+            continue
+        hands = [frame.hands[i] for i in order]
+        labels = [FLIP[frame.labels[i]] if rng.random() < flicker else frame.labels[i] for i in order]
+        frames.append((hands, labels, int(np.flatnonzero(order == 0)[0])))
+    return frames
+
+
+def stability(frames, pick):
+    wrong = changes = 0
+    previous = None
+    for hands, labels, right in frames:
+        primary = pick(hands, labels)
+        if right < 0:
+            continue
+        primary_is_right = primary == right
+        wrong += not primary_is_right
+        if previous is not None and primary_is_right != previous:
+            changes += 1
+        previous = primary_is_right
+    return wrong, changes
+
+
+def update_cost(num_hands, landmark_lists, repeats=5000):
+    poses = random_poses(num_hands, seed=num_hands)
+    hands = [as_landmark_list(p) for p in poses] if landmark_lists else poses
+    labels = ['Right', 'Left', 'Right', 'Left'][:num_hands]
+    tracker = HandTracker()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        tracker.update(hands, labels)
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--flicker', type=float, default=0.1, help="probability of a flipped label per hand")
+    parser.add_argument('--dropout', type=float, default=0.02, help="probability the right hand misses a frame")
+    args = parser.parse_args()
+
+    frames = flickering_frames(args.frames, args.flicker, args.dropout)
+    tracker = HandTracker()
+    print(f"{args.frames} frames, 2 hands, {args.flicker:.0%} of labels flipped, {args.dropout:.0%} right hand "
+          f"dropouts, hand order shuffled")
+    for name, pick in (("labels", lambda hands, labels: select_primary_hand(len(hands), labels)),
+                       ("tracker", lambda hands, labels: tracker.update(hands, labels).primary)):
+        wrong, changes = stability(frames, pick)
+        print(f"{name:>8}: wrong primary in {wrong} frames ({wrong / len(frames):.1%}), {changes} primary changes")
+
+    print(f"{'hands':>6}{'arrays us':>11}{'mp lists us':>13}")
+    for num_hands in range(1, 5):
+        print(f"{num_hands:>6}{update_cost(num_hands, False):>11.1f}{update_cost(num_hands, True):>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Per-frame landmark cost: each consumer walking the landmarks vs one shared analyze_hand pass.
+
+Also times the batched helpers on a stack of hands, the path meant for many hands at once.
+
+    python -m benchmarks.landmarks [--frames 20000]
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import as_landmark_list, random_poses
+import numpy as np
+
+from landmark_array import analyze_hand, fingers_extended, fingers_up, thumb_tip_distances
+
+TOUCH_THRESHOLD = 0.25  # Controller.touch_threshold, palm sizes
+
+
+def scalar_frame(hand):
+    """What Controller.update_fingers_status + detect_zoomming + get_gesture_signature used to do.
+
+    The signature's raw 3D distances are left out: signatures now use hand_features
+    (timed by benchmarks.hand_features).
+    """
+    lm = hand.landmark
+    up = [lm[4].y < lm[3].y, lm[8].y < lm[6].y, lm[12].y < lm[10].y, lm[16].y < lm[14].y, lm[20].y < lm[18].y]
+    within = [((lm[t].x - lm[4].x) ** 2 + (lm[t].y - lm[4].y) ** 2) ** 0.5 < 0.05 for t in (8, 12, 16, 20)]
+    zoom = ((lm[8].x - lm[12].x) ** 2 + (lm[8].y - lm[12].y) ** 2) ** 0.5
+    tips, pips, mcps = [4, 8, 12, 16, 20], [3, 6, 10, 14, 18], [2, 5, 9, 13, 17]
+    extended = [lm[tips[i]].y < lm[pips[i]].y and lm[tips[i]].y < lm[mcps[i]].y for i in range(5)]
+    return up, within, zoom, extended
+
+
+def shared_frame(hand):
+    """The same work through analyze_hand (distances in palm sizes): one pass, later consumers hit the cache."""
+    analysis = analyze_hand(hand)  # Controller.update_fingers_status
+    within = [d < TOUCH_THRESHOLD for d in analysis.thumb_distances]
+    zoom = analysis.index_middle_distance  # zoom_step: Controller.hand_analysis
+    signature = analyze_hand(hand)  # GestureMapper.get_gesture_signature: cache hit
+    return analysis.fingers_up, within, zoom, signature.fingers_extended
+
+
+def batched_hands(stack):
+    """Finger and touch tests for a whole (N, 21, 3) stack in a handful of array ops."""
+    return fingers_up(stack), thumb_tip_distances(stack) < TOUCH_THRESHOLD, fingers_extended(stack)
+
+
+def _time_per_frame(fn, hands, rounds=5):
+    """Best of several rounds, in microseconds per frame."""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for hand in hands:
+            fn(hand)
+        best = min(best, time.perf_counter() - start)
+    return best / len(hands) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=20000)
+    args = parser.parse_args()
+
+    poses = random_poses(args.frames)
+    hands = [as_landmark_list(p) for p in poses]
+    for hand in hands[:200]:  # Both paths must agree before we compare their speed
+        s, a = scalar_frame(hand), shared_frame(hand)
+        assert s[0] == a[0] and s[3] == a[3], "finger tests disagree"
+
+    scalar_us = _time_per_frame(scalar_frame, hands)
+    shared_us = _time_per_frame(shared_frame, hands)
+    print(f"scalar: {scalar_us:.2f} us/frame")
+    print(f"shared: {shared_us:.2f} us/frame  ({scalar_us / shared_us:.2f}x)")
+    array_us = _time_per_frame(shared_frame, poses)
+    print(f"shared, (21, 3) array input: {array_us:.2f} us/frame")
+
+    # Replay/multi-hand paths already hold arrays and can analyze many hands at once
+    stack = np.stack(poses)
+    start = time.perf_counter()
+    batched_hands(stack)
+    batched_us = (time.perf_counter() - start) / len(poses) * 1e6
+    print(f"batched: {batched_us:.3f} us/hand over a ({len(poses)}, 21, 3) stack")
+
+
+if __name__ == "__main__":
+    main()
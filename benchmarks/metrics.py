@@ -0,0 +1,42 @@
+"""Cost of the performance dashboard's metrics for the vision loop.
+
+Times MetricsRing.record() (one per frame) plus a per-hand record_score(), against a
+30 FPS frame budget, and the dashboard's drain() of a batch on the GUI thread.
+    python -m benchmarks.metrics [--frames 100000] [--drain-every 15]
+"""
+import argparse
+import time
+
+from metrics import MetricsRing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=100000)
+    parser.add_argument('--drain-every', type=int, default=15, help="frames per dashboard refresh (15 = 500 ms at 30 FPS)")
+    args = parser.parse_args()
+
+    metrics = MetricsRing()
+    start = time.perf_counter()
+    for frame in range(args.frames):
+        metrics.record(0.012, 0.0004, 0, frame, frame // 50, frame / 30.0)
+        metrics.record_score('thumbs_up', 0.9)
+    per_frame = (time.perf_counter() - start) / args.frames
+    print(f"record + record_score: {per_frame * 1e6:.2f} us/frame "
+          f"({per_frame * 30 * 100:.4f}% of a 30 FPS frame budget)")
+
+    drains, summary = 0, None
+    start = time.perf_counter()
+    for frame in range(args.frames):
+        metrics.record(0.012 if frame % 2 else float('nan'), 0.0004, frame % 3, frame, frame // 50, frame / 30.0)
+        if frame % args.drain_every == 0:
+            summary = metrics.drain() or summary
+            drains += 1
+    total = time.perf_counter() - start
+    print(f"drain every {args.drain_every} frames: {(total - per_frame * args.frames) / drains * 1e6:.1f} us/drain "
+          f"(GUI thread); last: {summary.fps:.1f} fps, {summary.inference_ms:.1f} ms inference, "
+          f"{summary.dropped} dropped")
+
+
+if __name__ == "__main__":
+    main()
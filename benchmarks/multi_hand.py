@@ -0,0 +1,108 @@
+"""Custom gestures with several hands in view: shared hold state vs per-hand batched matching.
+
+legacy:  every hand goes through detect_custom_gestures() with the same state (hand_id=0),
+         as before, so two hands holding different gestures keep resetting each other's
+         hold timer and the matcher runs once per hand.
+batched: process_hands() matches all hands in one best_matches() call with per-hand state.
+
+Replays a scripted two-hand session whose poses are mapped to hotkey actions (plus random
+filler templates) and reports decision time and the hotkey actions fired. Also checks
+best_matches() against best_match() and times both.
+    python -m benchmarks.multi_hand [--frames 3000] [--templates 1000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+from benchmarks.synthetic import SESSION_POSES, hand_pose, random_signatures, random_templates, scripted_session
+from gesture_mapper import GestureMapper
+from gesture_pipeline import process_hands
+from input_backend import RecordingBackend
+from landmark_trace import ReplayEngine
+
+ACTIONS = ['copy', 'paste', 'undo', 'redo', 'select_all']
+
+
+def build_mapper(directory, filler):
+    mapper = GestureMapper(os.path.join(directory, 'multi_hand.json'), backend=RecordingBackend(), save_delay=None)
+    mapper.import_templates(random_templates(filler))
+    templates = {}
+    for i, pose in enumerate(SESSION_POSES):
+        templates[f'pose_{i}'] = mapper.get_gesture_signature(hand_pose(pose))
+        mapper.gesture_mapping[f'pose_{i}'] = ACTIONS[i % len(ACTIONS)]
+    mapper.import_templates(templates)
+    return mapper
+
+
+def replay(mapper, frames, batched):
+    engine = ReplayEngine(frames, backend=mapper.backend, mapper=mapper)
+    controller = engine.install()
+    mapper.backend.clear()
+    decision = 0.0
+    for frame in frames:
+        engine.trace_time = frame.timestamp
+        hands = list(frame.hands)
+        t0 = time.perf_counter()
+        if batched:
+            process_hands(hands, frame.labels, controller=controller)
+        else:
+            process_hands(hands[:1], frame.labels[:1], hand_ids=[0], controller=controller)
+            for hand in hands:
+                controller.detect_custom_gestures(hand, hand_id=0)
+        decision += time.perf_counter() - t0
+    fired = Counter('+'.join(event[2]) for event in mapper.backend.events_named('hotkey'))
+    return decision / len(frames) * 1e6, fired
+
+
+def matcher_timing(mapper, hands_per_frame, repeats=2000):
+    matcher = mapper.template_matcher
+    if matcher.dirty:
+        matcher.compile(mapper.gesture_templates)
+    queries = random_signatures(hands_per_frame * repeats, seed=3)
+    frames = [queries[i:i + hands_per_frame] for i in range(0, len(queries), hands_per_frame)]
+    threshold = 0.75
+    for frame in frames[:200]:
+        assert matcher.best_matches(frame, threshold) == [matcher.best_match(s, threshold) for s in frame]
+    start = time.perf_counter()
+    for frame in frames:
+        for signature in frame:
+            matcher.best_match(signature, threshold)
+    single = (time.perf_counter() - start) / len(frames) * 1e6
+    start = time.perf_counter()
+    for frame in frames:
+        matcher.best_matches(frame, threshold)
+    batched = (time.perf_counter() - start) / len(frames) * 1e6
+    return single, batched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--templates', type=int, default=1000, help="random filler templates")
+    args = parser.parse_args()
+
+    frames = scripted_session(args.frames, num_hands=2)
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()) as log:
+        mapper = build_mapper(directory, args.templates)
+        results = {mode: replay(mapper, frames, mode == 'batched') for mode in ('legacy', 'batched')}
+        timings = {hands: matcher_timing(mapper, hands) for hands in (2, 4)}
+    del log
+
+    print(f"{args.frames} frames, 2 hands, {len(mapper.gesture_templates)} templates")
+    for mode, (us, fired) in results.items():
+        hotkeys = ', '.join(f"{keys}: {count}" for keys, count in sorted(fired.items()))
+        print(f"{mode:>8}: {us:7.1f} us/frame decision, {sum(fired.values())} hotkey actions ({hotkeys})")
+    for hands, (single, batched) in timings.items():
+        print(f"matcher, {hands} hands: best_match x{hands} {single:.1f} us, best_matches {batched:.1f} us "
+              f"({single / batched:.2f}x)")
+
+
+if __name__ == "__main__":
+    np.seterr(invalid='ignore')
+    main()
@@ -0,0 +1,256 @@
+"""Full per-frame pipeline benchmark with a per-stage latency breakdown.
+
+Sources:
+    --video PATH            decode a video file and run MediaPipe on it (needs cv2 + mediapipe)
+    --synthetic-video N     N generated frames through MediaPipe (no hands, inference cost only)
+    --trace PATH            replay a landmark trace (decision path only, no cv2/MediaPipe)
+    --synthetic-trace N     N frames of a scripted synthetic session (decision path only)
+
+Reports p50/p95/p99 per stage, FPS and memory, and writes them as JSON for comparing runs:
+    python -m benchmarks.pipeline --synthetic-trace 3000 --output run.json [--compare previous.json]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Stage order in reports; stages that were not measured are omitted
+STAGES = ['capture', 'flip', 'cvt_color', 'hands_process', 'track_hands', 'update_fingers_status',
+          'cursor_moving', 'built_in_rules', 'detect_custom_gestures', 'draw', 'imshow', 'frame_total']
+
+
+class StageTimer:
+    """Collects per-stage durations. lap(stage, start) records now - start and returns now."""
+
+    def __init__(self):
+        self.samples = OrderedDict((stage, []) for stage in STAGES)
+        self.now = time.perf_counter
+
+    def lap(self, stage: str, start: float) -> float:
+        now = time.perf_counter()
+        self.samples.setdefault(stage, []).append(now - start)
+        return now
+
+    def summary(self) -> dict:
+        stages = OrderedDict()
+        for stage, values in self.samples.items():
+            if not values:
+                continue
+            ms = np.asarray(values) * 1000
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            stages[stage] = {'count': len(ms), 'mean_ms': float(ms.mean()), 'p50_ms': float(p50),
+                             'p95_ms': float(p95), 'p99_ms': float(p99), 'total_ms': float(ms.sum())}
+        return stages
+
+
+def _memory() -> dict:
+    """Peak and (on Linux) current resident set size in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024  # bytes on macOS, KB elsewhere
+    memory = {'peak_rss_mb': peak_mb}
+    try:
+        with open('/proc/self/statm') as f:
+            memory['rss_mb'] = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        pass
+    return memory
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ''
+
+
+class _IterSource:
+    """cv2.VideoCapture-style read() over a frame iterator."""
+
+    def __init__(self, frames):
+        self._frames = iter(frames)
+
+    def read(self):
+        frame = next(self._frames, None)
+        return frame is not None, frame
+
+
+def _setup_headless_controller(config):
+    """Point Controller at a recording backend and a synchronous executor."""
+    from action_executor import ActionExecutor
+    from controller import Controller
+    from gesture_mapper import GestureMapper
+    from input_backend import RecordingBackend
+    backend = RecordingBackend()
+    Controller.set_input_backend(backend)
+    Controller.set_action_executor(ActionExecutor(synchronous=True))
+    Controller.set_gesture_mapper(GestureMapper(config, executor=Controller.get_action_executor(),
+                                                backend=backend))
+    return backend
+
+
+def run_trace(frames, timer: StageTimer):
+    """Decision path only: process_hands over trace frames."""
+    from controller import Controller
+    from gesture_pipeline import process_hands
+    trace_time = [0.0]
+    Controller.clock = lambda: trace_time[0]  # Hold/cooldown timing follows the trace
+    for frame in frames:
+        trace_time[0] = frame.timestamp
+        hands = list(frame.hands)
+        start = timer.now()
+        process_hands(hands, frame.labels, timer=timer)
+        timer.lap('frame_total', start)
+    return len(frames)
+
+
+def run_video(source, timer: StageTimer, display: bool = False, max_frames=None, roi: bool = False,
+              infer_every='1'):
+    """Full pipeline: capture, flip/convert, MediaPipe, detectors, drawing (and imshow)."""
+    import cv2
+    import mediapipe as mp
+    from gesture_pipeline import handedness_labels, process_hands
+
+    mp_hands = mp.solutions.hands
+    hands = mp_hands.Hands(max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.5)
+    mp_draw = mp.solutions.drawing_utils
+    detector = hands
+    if roi:
+        from roi_inference import RoiHandDetector
+        detector = RoiHandDetector(hands, mp_hands.Hands(static_image_mode=True, max_num_hands=2,
+                                                         min_detection_confidence=0.7))
+    if infer_every != '1':
+        from inference_scheduler import InferenceScheduler
+        detector = InferenceScheduler(detector, every=1 if infer_every == 'auto' else int(infer_every),
+                                      adaptive=infer_every == 'auto')
+    frames = 0
+    try:
+        while max_frames is None or frames < max_frames:
+            start = t = timer.now()
+            success, img = source.read()
+            if not success:
+                break
+            t = timer.lap('capture', t)
+            img = cv2.flip(img, 1)
+            t = timer.lap('flip', t)
+            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            t = timer.lap('cvt_color', t)
+            results = detector.process(img_rgb)
+            timer.lap('hands_process', t)
+
+            inferred = getattr(results, 'inferred', True)
+            process_hands(results.multi_hand_landmarks, handedness_labels(results.multi_handedness), timer=timer,
+                          inferred=inferred)
+
+            t = timer.now()
+            if inferred:
+                for hand_lms in results.multi_hand_landmarks or []:
+                    mp_draw.draw_landmarks(img, hand_lms, mp_hands.HAND_CONNECTIONS)
+            t = timer.lap('draw', t)
+            if display:
+                cv2.imshow('Pipeline benchmark', img)
+                cv2.waitKey(1)
+                timer.lap('imshow', t)
+            timer.lap('frame_total', start)
+            frames += 1
+    finally:
+        hands.close()
+        if display:
+            cv2.destroyAllWindows()
+    return frames
+
+
+def _print_report(report: dict, previous: dict = None):
+    print(f"{report['source']}: {report['frames']} frames, {report['fps']:.1f} FPS, "
+          f"peak RSS {report['memory']['peak_rss_mb']:.0f} MB")
+    header = f"{'stage':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}"
+    if previous:
+        header += f"{'p50 vs prev':>14}"
+    print(header)
+    for stage, s in report['stages'].items():
+        line = f"{stage:<24}{s['p50_ms']:>10.3f}{s['p95_ms']:>10.3f}{s['p99_ms']:>10.3f}{s['mean_ms']:>10.3f}"
+        old = (previous or {}).get('stages', {}).get(stage)
+        if old and old['p50_ms'] > 0:
+            line += f"{(s['p50_ms'] / old['p50_ms'] - 1) * 100:>+13.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--video', help="video file (or camera index) to run through MediaPipe")
+    source.add_argument('--synthetic-video', type=int, metavar='N', help="N generated frames through MediaPipe")
+    source.add_argument('--trace', help="landmark trace file (decision path only)")
+    source.add_argument('--synthetic-trace', type=int, metavar='N', help="N scripted frames (decision path only)")
+    parser.add_argument('--hands', type=int, default=1, help="hands per frame for --synthetic-trace")
+    parser.add_argument('--max-frames', type=int, help="stop after this many video frames")
+    parser.add_argument('--roi', action='store_true', help="run inference on a crop around the tracked hand")
+    parser.add_argument('--infer-every', default='1', metavar='N|auto',
+                        help="run inference every N frames ('auto': adapt to inference time)")
+    parser.add_argument('--display', action='store_true', help="also time cv2.imshow (needs a display)")
+    parser.add_argument('--config', default='benchmark_gesture_config.json', help="gesture config to load")
+    parser.add_argument('--output', help="write the JSON report here")
+    parser.add_argument('--compare', help="previous JSON report to compare p50 against")
+    args = parser.parse_args()
+
+    backend = _setup_headless_controller(args.config)
+    timer = StageTimer()
+    start = time.perf_counter()
+    if args.trace or args.synthetic_trace:
+        if args.trace:
+            from landmark_trace import read_trace
+            frames, source_name = read_trace(args.trace), args.trace
+        else:
+            from benchmarks.synthetic import scripted_session
+            frames = scripted_session(args.synthetic_trace, num_hands=args.hands)
+            source_name = f"synthetic-trace:{args.synthetic_trace}x{args.hands}"
+        count = run_trace(frames, timer)
+    else:
+        import cv2
+        if args.video is not None:
+            capture = cv2.VideoCapture(int(args.video) if args.video.isdigit() else args.video)
+            source_name = args.video
+        else:
+            from frame_capture import synthetic_frames
+            capture = _IterSource(synthetic_frames(count=args.synthetic_video))
+            source_name = f"synthetic-video:{args.synthetic_video}"
+        if args.roi:
+            source_name += " (roi)"
+        if args.infer_every != '1':
+            source_name += f" (infer every {args.infer_every})"
+        count = run_video(capture, timer, display=args.display, max_frames=args.max_frames, roi=args.roi,
+                          infer_every=args.infer_every)
+    elapsed = time.perf_counter() - start
+
+    report = {
+        'meta': {'commit': _git_commit(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 'python': platform.python_version(), 'platform': platform.platform(),
+                 'processor': platform.processor()},
+        'source': source_name,
+        'frames': count,
+        'elapsed_s': elapsed,
+        'fps': count / elapsed if elapsed > 0 else 0.0,
+        'input_events': len(backend.events),
+        'stages': timer.summary(),
+        'memory': _memory(),
+    }
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    _print_report(report, previous)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Frame hand-off between processes: copy-per-stage + pickling vs the shared-memory ring.
+
+copy: the producer flips and converts into new arrays (as the apps used to) and sends the
+      RGB frame over a pipe, which pickles and copies it.
+ring: the producer flips in place and converts straight into a SharedFrameRing slot, and
+      only sends the 8-byte sequence number; the consumer reads the slot in place.
+Both use the same credit-based flow control (at most slots - 1 frames in flight), so every
+frame is consumed. Also reports the in-process flip + cvtColor cost with and without dst=.
+    python -m benchmarks.shared_frames [--width 1280] [--height 720] [--frames 500]
+"""
+import argparse
+import multiprocessing
+import time
+
+import cv2
+import numpy as np
+
+from shared_frames import SharedFrameReader, SharedFrameRing, _SEQ
+
+SLOTS = 4
+
+
+def _raw_frames(width, height, count=4):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def _producer(mode, width, height, frames, conn, credits):
+    raws = _raw_frames(width, height)
+    ring = SharedFrameRing((height, width, 3), SLOTS) if mode == 'ring' else None
+    if ring is not None:
+        conn.send((ring.name, ring.shape, ring.slots))
+    in_flight = 0
+    for i in range(frames):
+        while in_flight >= SLOTS - 1:
+            credits.recv_bytes()
+            in_flight -= 1
+        raw = raws[i % len(raws)]
+        if ring is None:
+            img = cv2.flip(raw, 1)
+            conn.send(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+        else:
+            conn.send_bytes(_SEQ.pack(ring.write_camera_frame(raw)))
+        in_flight += 1
+    while in_flight:  # Keep the ring alive until the consumer is done with it
+        credits.recv_bytes()
+        in_flight -= 1
+    conn.close()
+    if ring is not None:
+        ring.close()
+
+
+def run(mode, width, height, frames):
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    credit_receiver, credit_sender = context.Pipe(duplex=False)
+    producer = context.Process(target=_producer, args=(mode, width, height, frames, sender, credit_receiver))
+    producer.start()
+    sender.close()
+
+    reader = SharedFrameReader(receiver) if mode == 'ring' else None
+    checksum = 0
+    start = None
+    for i in range(frames):
+        if reader is None:
+            frame = receiver.recv()
+        else:
+            # read() would skip to the newest frame; take them in order here so both modes see every frame
+            if reader.ring is None:
+                reader._attach(None)
+            frame = reader.ring.frame(_SEQ.unpack(receiver.recv_bytes())[0])
+        if start is None:
+            start = time.perf_counter()  # Exclude process start-up
+        checksum += int(frame[0, 0, 0])
+        frame = None
+        credit_sender.send_bytes(b'.')
+    elapsed = time.perf_counter() - start
+    producer.join()
+    if reader is not None:
+        reader.release()
+    return (frames - 1) / elapsed
+
+
+def stage_cost(width, height, repeats=200):
+    """Per-frame flip + cvtColor in one process: new arrays vs dst= buffers."""
+    raws = _raw_frames(width, height)
+    start = time.perf_counter()
+    for i in range(repeats):
+        img = cv2.flip(raws[i % len(raws)], 1)
+        rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    allocating = (time.perf_counter() - start) / repeats
+
+    rgb = np.empty_like(raws[0])
+    start = time.perf_counter()
+    for i in range(repeats):
+        img = raws[i % len(raws)]
+        cv2.flip(img, 1, dst=img)
+        cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=rgb)
+    in_place = (time.perf_counter() - start) / repeats
+    return allocating, in_place
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--frames', type=int, default=500)
+    args = parser.parse_args()
+
+    allocating, in_place = stage_cost(args.width, args.height)
+    print(f"{args.width}x{args.height}, {args.frames} frames")
+    print(f"flip+cvtColor in process: new arrays {allocating * 1000:.2f} ms/frame, dst= buffers {in_place * 1000:.2f} ms/frame")
+    for mode in ('copy', 'ring'):
+        print(f"{mode:>5}: {run(mode, args.width, args.height, args.frames):8.1f} frames/s across processes")
+
+
+if __name__ == "__main__":
+    main()
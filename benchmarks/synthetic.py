@@ -0,0 +1,101 @@
+"""Synthetic hand landmarks for headless benchmarks (no camera, no MediaPipe)."""
+from types import SimpleNamespace
+
+import numpy as np
+
+from hand_features import NUM_FEATURES
+
+# Open palm, normalized image coordinates, wrist at the bottom (y grows downwards)
+_OPEN_PALM = np.array([
+    [0.50, 0.80, 0.00],                                                           # 0 wrist
+    [0.44, 0.76, -0.01], [0.40, 0.71, -0.02], [0.37, 0.66, -0.03], [0.35, 0.61, -0.03],  # thumb
+    [0.45, 0.62, -0.01], [0.44, 0.54, -0.02], [0.44, 0.49, -0.02], [0.44, 0.44, -0.03],  # index
+    [0.50, 0.61, -0.01], [0.50, 0.52, -0.02], [0.50, 0.46, -0.02], [0.50, 0.41, -0.03],  # middle
+    [0.55, 0.62, -0.01], [0.55, 0.54, -0.02], [0.55, 0.49, -0.02], [0.55, 0.45, -0.03],  # ring
+    [0.60, 0.64, -0.01], [0.60, 0.58, -0.02], [0.60, 0.54, -0.02], [0.60, 0.51, -0.03],  # little
+], dtype=np.float32)
+
+_FINGER_JOINTS = [(2, 3, 4), (6, 7, 8), (10, 11, 12), (14, 15, 16), (18, 19, 20)]
+
+
+def hand_pose(fingers_up=(True, True, True, True, True), offset=(0.0, 0.0), scale=1.0,
+              jitter=0.0, rng=None) -> np.ndarray:
+    """(21, 3) float32 hand with the given fingers curled down, moved/scaled/jittered."""
+    points = _OPEN_PALM.copy()
+    for is_up, (pip, dip, tip) in zip(fingers_up, _FINGER_JOINTS):
+        if not is_up:
+            # Fold the finger back below its PIP joint
+            base_y = points[pip - 1, 1]
+            points[dip, 1] = base_y + 0.02
+            points[tip, 1] = base_y + 0.05
+    center = points[0].copy()
+    points[:, :2] = (points[:, :2] - center[:2]) * scale + center[:2] + np.asarray(offset, dtype=np.float32)
+    if jitter:
+        rng = rng or np.random.default_rng()
+        points += rng.normal(0.0, jitter, points.shape).astype(np.float32)
+    return points
+
+
+def as_landmark_list(points: np.ndarray):
+    """Wrap an array in a MediaPipe-like object exposing .landmark[i].x/.y/.z."""
+    return SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z))
+                                     for x, y, z in points])
+
+
+def random_poses(count: int, seed: int = 0, jitter: float = 0.003):
+    """count random poses (random finger states, position and scale) as arrays."""
+    rng = np.random.default_rng(seed)
+    poses = []
+    for _ in range(count):
+        fingers = tuple(bool(b) for b in rng.integers(0, 2, 5))
+        offset = rng.uniform(-0.2, 0.15, 2)
+        poses.append(hand_pose(fingers, offset, rng.uniform(0.7, 1.3), jitter, rng))
+    return poses
+
+
+def random_templates(count: int, seed: int = 0, num_distances: int = NUM_FEATURES):
+    """count gesture templates in GestureMapper's format, with random finger states."""
+    rng = np.random.default_rng(seed)
+    return {f"gesture_{i}": {'fingers_up': [bool(b) for b in rng.integers(0, 2, 5)],
+                             'finger_distances': rng.uniform(0.1, 2.0, num_distances).tolist()}
+            for i in range(count)}
+
+
+def random_signatures(count: int, seed: int = 1, num_distances: int = NUM_FEATURES):
+    """count live-frame signatures in GestureMapper.get_gesture_signature's format."""
+    return list(random_templates(count, seed, num_distances).values())
+
+
+# Poses cycled through by scripted_session(): (thumb, index, middle, ring, little) up
+SESSION_POSES = [
+    (True, True, True, True, True),      # Open palm: cursor moves
+    (False, True, False, False, False),  # Index only: built-in scroll down
+    (False, False, False, False, True),  # Little only: built-in scroll up
+    (True, False, False, False, False),  # Fist: built-in drag
+    (False, True, True, False, False),   # Index + middle: zoom
+]
+
+
+def scripted_session(num_frames: int = 3000, fps: float = 30.0, num_hands: int = 1,
+                     segment_s: float = 2.0, seed: int = 0, jitter: float = 0.002):
+    """Trace frames (landmark_trace.TraceFrame) of a scripted session cycling through SESSION_POSES.
+
+    The first hand is labelled 'Right' and traces a slow circle; a second hand, if any,
+    is labelled 'Left' and holds the next pose in the cycle.
+    """
+    from landmark_trace import TraceFrame
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(num_frames):
+        t = i / fps
+        segment = int(t / segment_s)
+        angle = t * 0.8
+        hands = [hand_pose(SESSION_POSES[segment % len(SESSION_POSES)],
+                           (0.12 * np.cos(angle), 0.08 * np.sin(angle)), 1.0, jitter, rng)]
+        labels = ['Right']
+        if num_hands > 1:
+            hands.append(hand_pose(SESSION_POSES[(segment + 1) % len(SESSION_POSES)],
+                                   (-0.25, 0.0), 0.9, jitter, rng))
+            labels.append('Left')
+        frames.append(TraceFrame(t, np.stack(hands), labels, [0.95] * len(labels)))
+    return frames
@@ -0,0 +1,85 @@
+"""Template persistence: pretty-printed JSON config vs the binary memory-mapped store.
+
+Measures startup (load + compile the matcher) and the cost of adding or updating one
+template, for growing library sizes. Files go to a temporary directory.
+    python -m benchmarks.template_store [--sizes 100 1000 10000 50000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import random_templates
+from template_matcher import TemplateMatcher
+from template_store import TemplateStore
+
+
+def _time(func, repeats=5):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_size(directory, size):
+    templates = random_templates(size)
+    new_template = random_templates(1, seed=99)['gesture_0']
+    json_path = os.path.join(directory, f'config_{size}.json')
+    store_path = os.path.join(directory, f'config_{size}.templates')
+    with open(json_path, 'w') as f:
+        json.dump({'gesture_mapping': {}, 'gesture_templates': templates}, f, indent=4)
+    if os.path.exists(store_path):
+        os.remove(store_path)
+    TemplateStore(store_path).import_templates(templates)
+
+    def json_load():
+        with open(json_path) as f:
+            TemplateMatcher().compile(json.load(f)['gesture_templates'])
+
+    def store_load():
+        TemplateMatcher().compile(TemplateStore(store_path))
+
+    def json_save():
+        # What save_config did after every recording or mapping change
+        templates['recorded'] = new_template
+        with open(json_path, 'w') as f:
+            json.dump({'gesture_mapping': {}, 'gesture_templates': templates}, f, indent=4)
+
+    store = TemplateStore(store_path)
+
+    def store_update():
+        store['gesture_1'] = new_template  # In-place record rewrite
+
+    counter = [0]
+
+    def store_append():
+        counter[0] += 1
+        store[f'recorded_{counter[0]}'] = new_template
+
+    return {
+        'json_load': _time(json_load), 'store_load': _time(store_load),
+        'json_save': _time(json_save), 'store_update': _time(store_update), 'store_append': _time(store_append),
+        'json_bytes': os.path.getsize(json_path), 'store_bytes': os.path.getsize(store_path),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    args = parser.parse_args()
+
+    print(f"{'templates':>10}{'json load':>12}{'store load':>12}{'json save':>12}{'store upd':>12}"
+          f"{'store add':>12}{'json KB':>10}{'store KB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            r = bench_size(directory, size)
+            print(f"{size:>10}{r['json_load'] * 1000:>10.2f}ms{r['store_load'] * 1000:>10.2f}ms"
+                  f"{r['json_save'] * 1000:>10.2f}ms{r['store_update'] * 1000:>10.3f}ms{r['store_append'] * 1000:>10.3f}ms"
+                  f"{r['json_bytes'] / 1024:>10.0f}{r['store_bytes'] / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
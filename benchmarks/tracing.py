@@ -0,0 +1,86 @@
+"""Overhead of the hot-path tracer (tracing.py): disabled, enabled, and per call site.
+
+Replays a scripted synthetic session through process_hands (decision path only) with
+tracing disabled and enabled, alternating runs, and times a bare disabled call site.
+Optionally writes the enabled run's spans as Chrome trace JSON.
+    python -m benchmarks.tracing [--frames 3000] [--hands 2] [--templates 50] [--output trace.json]
+"""
+import argparse
+import time
+
+from benchmarks.pipeline import _setup_headless_controller
+from benchmarks.synthetic import random_templates, scripted_session
+from tracing import tracer
+
+
+def replay(frames) -> float:
+    """Seconds per frame for process_hands over the frames."""
+    from controller import Controller
+    from gesture_pipeline import process_hands
+    trace_time = [0.0]
+    Controller.clock = lambda: trace_time[0]
+    start = time.perf_counter()
+    for frame in frames:
+        trace_time[0] = frame.timestamp
+        process_hands(list(frame.hands), frame.labels)
+    return (time.perf_counter() - start) / len(frames)
+
+
+def site_cost(iterations: int) -> float:
+    """Seconds per disabled call site (both halves), minus an empty loop."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        pass
+    empty = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t = tracer.now() if tracer.enabled else 0
+        if t: tracer.lap('site', t)
+    return (time.perf_counter() - start - empty) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--hands', type=int, default=2)
+    parser.add_argument('--templates', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--config', default='benchmark_gesture_config.json')
+    parser.add_argument('--output', help="write the enabled run's spans here (Chrome trace JSON)")
+    args = parser.parse_args()
+
+    from controller import Controller
+    _setup_headless_controller(args.config)
+    mapper = Controller.get_gesture_mapper()
+    templates = random_templates(args.templates)
+    mapper.gesture_templates.import_templates(templates)
+    mapper.template_matcher.invalidate()
+    for name in list(templates)[:5]:
+        mapper.map_gesture_to_action(name, 'volume_up')
+    frames = scripted_session(args.frames, num_hands=args.hands)
+    replay(frames[:100])  # Warm up
+
+    disabled, enabled = [], []
+    for _ in range(args.rounds):
+        tracer.disable()
+        disabled.append(replay(frames))
+        tracer.clear()
+        tracer.enable()
+        enabled.append(replay(frames))
+    tracer.disable()
+
+    best_off, best_on = min(disabled), min(enabled)
+    print(f"{args.frames} frames x {args.hands} hands, {args.templates} templates, best of {args.rounds}")
+    print(f"tracing disabled: {best_off * 1e6:8.1f} us/frame")
+    print(f"tracing enabled:  {best_on * 1e6:8.1f} us/frame ({(best_on / best_off - 1) * 100:+.1f}%)")
+    print(f"disabled call site: {site_cost(1_000_000) * 1e9:.1f} ns")
+
+    print(f"{'span':<28}{'count':>8}{'mean us':>10}{'p95 us':>10}")
+    for name, stats in sorted(tracer.summary().items(), key=lambda item: -item[1]['count']):
+        print(f"{name:<28}{stats['count']:>8}{stats['mean_ms'] * 1000:>10.1f}{stats['p95_ms'] * 1000:>10.1f}")
+    if args.output:
+        print(f"Wrote {tracer.export_chrome(args.output)} spans to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
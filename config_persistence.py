@@ -0,0 +1,148 @@
+"""Write-behind persistence for the gesture config.
+
+GestureMapper used to dump its config synchronously on every mapping change, removal and
+recording, so a GUI click could stall the frame loop on file I/O. A DebouncedWriter only
+marks the config dirty; a background thread writes a snapshot once changes have stopped
+for `delay` seconds (or at the latest `max_delay` seconds after the first pending
+change), so a burst of edits costs one write. Writes go to a temporary file that is then
+renamed over the config, so a crash never leaves a half-written file. Pending changes are
+flushed by flush(), stop() and at interpreter exit. A failed write (disk full, file locked
+by a virus scanner) leaves the changes pending: the thread retries every `max_delay`
+seconds, and flush(), stop() and the exit hook try again.
+
+The writer thread only runs while changes are pending, and the exit hook holds writers
+weakly, so an idle writer (and the mapper whose snapshot it calls) is freed like any
+other object.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, Optional
+
+_live_writers = weakref.WeakSet()  # Writers to flush at interpreter exit
+
+
+@atexit.register
+def _flush_live_writers():
+    for writer in list(_live_writers):
+        writer.flush()
+
+
+def atomic_write_json(path: str, data: Any):
+    """Write JSON to a temporary file next to path, then atomically replace path with it."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class DebouncedWriter:
+    """Writes snapshot() to path on a background thread, coalescing bursts of mark_dirty() calls."""
+
+    def __init__(self, path: str, snapshot: Callable[[], Any], delay: float = 0.5, max_delay: float = 2.0,
+                 name: str = "ConfigWriter"):
+        self.path = path
+        self.snapshot = snapshot  # Called on the writer thread; must return JSON-serializable data
+        self.delay = delay
+        self.max_delay = max_delay
+        self.name = name
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()  # Held for a whole snapshot + write
+        self._first_change = None  # monotonic time of the oldest unsaved change (None: clean)
+        self._last_change = 0.0
+        self._running = False
+        self._thread = None
+
+        # Statistics
+        self.requests = 0  # mark_dirty() calls
+        self.writes = 0
+        self.errors = 0
+        self.last_write_time = 0.0  # Seconds the last write took
+
+        _live_writers.add(self)
+
+    @property
+    def dirty(self) -> bool:
+        return self._first_change is not None
+
+    def mark_dirty(self):
+        """Schedule a write. Returns immediately."""
+        with self._cond:
+            now = time.monotonic()
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self.requests += 1
+            if not self._running:
+                self._running = True
+                self._thread = threading.Thread(target=self._worker, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while self._running and self._first_change is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                # Wait for a quiet period, but never postpone a pending change beyond max_delay
+                while self._running and self._first_change is not None:
+                    due = min(self._last_change + self.delay, self._first_change + self.max_delay)
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            written = self._write_if_dirty()
+            with self._cond:
+                if self._first_change is None:  # Idle: exit; the next mark_dirty() starts a new thread
+                    self._running = False
+                    return
+                if not written and self._running:
+                    self._cond.wait(self.max_delay)  # Don't spin on a failing write
+
+    def _write_if_dirty(self) -> bool:
+        """Write if changes are pending. Returns False if the write failed (the changes stay pending)."""
+        with self._write_lock:
+            with self._cond:
+                first_change = self._first_change
+                if first_change is None:
+                    return True  # Already flushed
+                self._first_change = None
+            start = time.perf_counter()
+            try:
+                atomic_write_json(self.path, self.snapshot())
+                self.writes += 1
+                return True
+            except Exception as e:
+                self.errors += 1
+                print(f"Error saving '{self.path}': {e}")
+                with self._cond:  # Still unsaved: keep the oldest change time so the retry is not postponed
+                    if self._first_change is None or first_change < self._first_change:
+                        self._first_change = first_change
+                return False
+            finally:
+                self.last_write_time = time.perf_counter() - start
+
+    def flush(self) -> bool:
+        """Write pending changes now (blocks), and wait for a write already in progress. False if it failed."""
+        return self._write_if_dirty()
+
+    def stop(self, timeout: Optional[float] = 2.0):
+        """Flush and stop the writer thread."""
+        if self.flush():
+            _live_writers.discard(self)  # Otherwise the exit hook tries once more
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
@@ -1,359 +1,436 @@
-import pyautogui
 from gesture_mapper import GestureMapper
+from landmark_array import analyze_hand
+from action_executor import ActionExecutor
+from input_backend import PyAutoGUIBackend
+from hand_tracker import HandTracker
+from gesture_rules import DEFAULT_RULE_TABLE, EDGE, LEVEL, RuleTable, frame_state
+from tracing import tracer
+from event_log import event_log
+from cursor_filter import OneEuroFilter
 import time
 
-class Controller:
-    prev_hand = None
-    right_clicked = False
-    left_clicked = False
-    double_clicked = False
-    dragging = False
-    hand_Landmarks = None  # This will be set to the PRIMARY hand's landmarks by the app
-    
-    # Finger status attributes (will be updated based on PRIMARY hand_Landmarks)
-    little_finger_down = None
-    little_finger_up = None
-    index_finger_down = None
-    index_finger_up = None
-    middle_finger_down = None
-    middle_finger_up = None
-    ring_finger_down = None
-    ring_finger_up = None
-    Thump_finger_down = None # Thumb misspelled
-    Thump_finger_up = None   # Thumb misspelled
-    all_fingers_down = None
-    all_fingers_up = None
-    index_finger_within_Thumb_finger = None
-    middle_finger_within_Thumb_finger = None
-    little_finger_within_Thumb_finger = None
-    ring_finger_within_Thumb_finger = None
-    
-    screen_width, screen_height = pyautogui.size()
-    
-    _gesture_mapper = None  # Private class variable for lazy initialization
-    
-    @classmethod
-    def get_gesture_mapper(cls):
-        if cls._gesture_mapper is None:
-            cls._gesture_mapper = GestureMapper()
-        return cls._gesture_mapper
-    
-    # --- Custom Gesture Detection State ---
-    last_gesture_time = 0           # Timestamp of the last executed custom gesture (for cooldown)
-    gesture_cooldown = 1.0          # Cooldown in seconds between distinct custom gesture executions
-    
-    # Variables for gesture hold detection
-    last_detected_gesture_name = None # Name of the gesture currently being detected/held
-    gesture_hold_start_time = 0     # Timestamp when the current gesture started being detected
-    gesture_hold_threshold = 0.5    # Seconds to hold a gesture before executing its action
-
-    @staticmethod
-    def update_fingers_status():
-        """Updates finger statuses based on Controller.hand_Landmarks (PRIMARY hand)."""
-        if Controller.hand_Landmarks is None:
+class HandGestureState:
+    """Custom gesture hold/cooldown state of one tracked hand."""
+    __slots__ = ('gesture_name', 'hold_start_time', 'last_gesture_time', 'last_seen')
+
+    def __init__(self):
+        self.gesture_name = None           # Gesture currently being detected/held
+        self.hold_start_time = 0           # When the current gesture started being detected
+        self.last_gesture_time = float('-inf') # When this hand last executed a gesture (for cooldown)
+        self.last_seen = 0
+
+
+# Finger flags set by update_fingers_status() for the primary hand
+FINGER_FLAGS = (
+    'little_finger_down', 'little_finger_up', 'index_finger_down', 'index_finger_up',
+    'middle_finger_down', 'middle_finger_up', 'ring_finger_down', 'ring_finger_up',
+    'Thump_finger_down', 'Thump_finger_up', # Thumb misspelled
+    'all_fingers_down', 'all_fingers_up',
+    'index_finger_within_Thumb_finger', 'middle_finger_within_Thumb_finger',
+    'little_finger_within_Thumb_finger', 'ring_finger_within_Thumb_finger',
+)
+
+
+class ControllerEngine:
+    """Built-in and custom gesture handling for one pipeline, with all of its state per instance.
+
+    The input backend, action executor, gesture mapper (or its config file), hand tracker
+    and clock are injected, or created lazily on first use. Several engines can run side
+    by side in one process, e.g. a replay next to the live app or one per benchmark run.
+    """
+    __slots__ = FINGER_FLAGS + (
+        'hand_Landmarks', 'hand_analysis', 'right_clicked', 'left_clicked', 'double_clicked', 'dragging',
+        'prev_zoom_dist', 'finger_state', 'rule_table', 'hand_gesture_states', 'screen_width', 'screen_height', 'clock', 'config_file',
+        'scroll_interval', 'zoom_interval', 'touch_threshold', 'cursor_filter',
+        'gesture_cooldown', 'gesture_hold_threshold', 'hand_state_timeout',
+        '_gesture_mapper', '_action_executor', '_input_backend', '_hand_tracker', '_metrics',
+    )
+
+    def __init__(self, backend=None, executor=None, mapper=None, tracker=None, clock=time.time,
+                 config_file="gesture_config.json", rules=None):
+        for flag in FINGER_FLAGS:
+            setattr(self, flag, None)
+        self.right_clicked = False
+        self.left_clicked = False
+        self.double_clicked = False
+        self.dragging = False
+        self.hand_Landmarks = None  # This will be set to the PRIMARY hand's landmarks by the app
+        self.hand_analysis = None   # landmark_array.HandAnalysis of hand_Landmarks, refreshed by update_fingers_status
+        self.prev_zoom_dist = None  # Index-middle distance of the last zoom frame
+        self.finger_state = 0       # gesture_rules state bits of the primary hand
+        # Built-in gestures (gesture_rules.BUILT_IN_RULES unless other rules are given)
+        self.rule_table = DEFAULT_RULE_TABLE if rules is None else RuleTable(rules)
+
+        self.screen_width, self.screen_height = None, None # Taken from the input backend when it is set
+        self.config_file = config_file # Config the gesture mapper is loaded from if none is injected
+        self._gesture_mapper = mapper     # Created lazily unless given
+        self._action_executor = executor  # Worker that runs input calls off the vision loop
+        self._input_backend = None        # InputBackend; PyAutoGUIBackend unless one is given
+        self._hand_tracker = tracker      # Persistent hand ids and the primary hand across frames
+        self._metrics = None              # Optional metrics.MetricsRing for the performance dashboard
+        if backend is not None:
+            self.set_input_backend(backend)
+
+        # Rate limits for continuous gestures (replace the old time.sleep debounces)
+        self.scroll_interval = 0.2   # Seconds between built-in scroll ticks while the gesture is held
+        self.zoom_interval = 0.1     # Seconds between built-in zoom steps
+        self.touch_threshold = 0.25 # Thumb-tip distance, in palm sizes, that counts as a touch (for clicking)
+        # Smooths the hand position before it is mapped to the screen (see cursor_filter.py)
+        self.cursor_filter = OneEuroFilter()
+
+        # Time source for gesture hold/cooldown timing; trace replay swaps in the trace's clock
+        self.clock = clock
+
+        # --- Custom Gesture Detection State ---
+        self.gesture_cooldown = 1.0          # Cooldown in seconds between distinct custom gesture executions (per hand)
+        self.gesture_hold_threshold = 0.5    # Seconds to hold a gesture before executing its action
+        self.hand_state_timeout = 5.0        # Forget a hand's hold/cooldown state after it is gone this long
+        # Hold/cooldown state per hand, keyed by hand track id, so two hands never reset each other
+        self.hand_gesture_states = {}
+
+    def get_input_backend(self):
+        if self._input_backend is None:
+            self.set_input_backend(PyAutoGUIBackend())
+        return self._input_backend
+
+    def set_input_backend(self, backend):
+        """Use another backend (e.g. RecordingBackend for headless runs). Call before first use."""
+        self._input_backend = backend
+        self.screen_width, self.screen_height = backend.size()
+        if self._gesture_mapper is not None:
+            self._gesture_mapper.set_input_backend(backend)
+
+    def get_action_executor(self):
+        if self._action_executor is None:
+            self._action_executor = ActionExecutor().start()
+        return self._action_executor
+
+    def set_action_executor(self, executor):
+        """Use another ActionExecutor (e.g. a synchronous one for deterministic replay)."""
+        self._action_executor = executor
+        if self._gesture_mapper is not None:
+            self._gesture_mapper.executor = executor
+
+    def get_hand_tracker(self):
+        if self._hand_tracker is None:
+            self._hand_tracker = HandTracker()
+        return self._hand_tracker
+
+    def set_hand_tracker(self, tracker):
+        """Use another HandTracker (e.g. with a different primary hand policy)."""
+        self._hand_tracker = tracker
+
+    def set_gesture_mapper(self, mapper):
+        """Use a specific GestureMapper (e.g. one loaded from another config file)."""
+        self._gesture_mapper = mapper
+        if self._metrics is not None:
+            mapper.metrics = self._metrics
+
+    def get_metrics(self):
+        """MetricsRing the vision loop records into, or None when nobody is watching."""
+        return self._metrics
+
+    def set_metrics(self, metrics):
+        """Record per-frame metrics (and gesture match scores) into a metrics.MetricsRing."""
+        self._metrics = metrics
+        if self._gesture_mapper is not None:
+            self._gesture_mapper.metrics = metrics
+
+    def get_gesture_mapper(self):
+        if self._gesture_mapper is None:
+            self._gesture_mapper = GestureMapper(self.config_file, executor=self.get_action_executor(),
+                                                 backend=self.get_input_backend())
+            self._gesture_mapper.metrics = self._metrics
+        return self._gesture_mapper
+
+    def update_fingers_status(self):
+        """Updates finger statuses based on self.hand_Landmarks (PRIMARY hand)."""
+        if self.hand_Landmarks is None:
             # print("No primary hand landmarks to update finger status.")
             return
 
-        landmarks = Controller.hand_Landmarks.landmark # shortcut
+        # One cached pass over the landmarks per frame, which every later consumer of this hand reuses
+        analysis = self.hand_analysis = analyze_hand(self.hand_Landmarks)
         
-        # Using PIP (Proximal Interphalangeal) vs MCP (Metacarpophalangeal) for up/down
+        # Tip vs PIP (Proximal Interphalangeal) for up/down.
         # For Thumb (landmark 4,3,2), Y might not be best. Comparing X to wrist or other fingers can be better.
         # Simplified: Thumb tip Y vs Thumb IP Y
-        Controller.Thump_finger_up = landmarks[4].y < landmarks[3].y
-        Controller.Thump_finger_down = not Controller.Thump_finger_up
-        
-        # Index: Tip (8) vs PIP (6)
-        Controller.index_finger_up = landmarks[8].y < landmarks[6].y
-        Controller.index_finger_down = not Controller.index_finger_up
-        
-        # Middle: Tip (12) vs PIP (10)
-        Controller.middle_finger_up = landmarks[12].y < landmarks[10].y
-        Controller.middle_finger_down = not Controller.middle_finger_up
-        
-        # Ring: Tip (16) vs PIP (14)
-        Controller.ring_finger_up = landmarks[16].y < landmarks[14].y
-        Controller.ring_finger_down = not Controller.ring_finger_up
-        
-        # Little: Tip (20) vs PIP (18)
-        Controller.little_finger_up = landmarks[20].y < landmarks[18].y
-        Controller.little_finger_down = not Controller.little_finger_up
-
-        Controller.all_fingers_down = (Controller.index_finger_down and
-                                       Controller.middle_finger_down and
-                                       Controller.ring_finger_down and
-                                       Controller.little_finger_down)
-        Controller.all_fingers_up = (Controller.index_finger_up and
-                                     Controller.middle_finger_up and
-                                     Controller.ring_finger_up and
-                                     Controller.little_finger_up)
+        up = analysis.fingers_up # Thumb, Index, Middle, Ring, Little
+        self.Thump_finger_up, self.index_finger_up, self.middle_finger_up, \
+            self.ring_finger_up, self.little_finger_up = up
+        self.Thump_finger_down = not up[0]
+        self.index_finger_down = not up[1]
+        self.middle_finger_down = not up[2]
+        self.ring_finger_down = not up[3]
+        self.little_finger_down = not up[4]
+
+        self.all_fingers_down = not any(up[1:])
+        self.all_fingers_up = all(up[1:])
 
         # Proximity checks for thumb + finger (for clicking)
-        # These are approximate, might need tuning based on hand size and camera angle
-        threshold_touch = 0.05 # Normalized distance threshold for touch
+        # 2D distances in palm sizes, so the same threshold works near and far from the camera
+        threshold_touch = self.touch_threshold
         
-        # Index finger tip (8) to Thumb tip (4)
-        dist_idx_thumb = ((landmarks[8].x - landmarks[4].x)**2 + (landmarks[8].y - landmarks[4].y)**2)**0.5
-        Controller.index_finger_within_Thumb_finger = dist_idx_thumb < threshold_touch
+        # Index (8), Middle (12), Ring (16) and Little (20) tips to Thumb tip (4)
+        within = [distance < threshold_touch for distance in analysis.thumb_distances]
+        self.index_finger_within_Thumb_finger, self.middle_finger_within_Thumb_finger, \
+            self.ring_finger_within_Thumb_finger, self.little_finger_within_Thumb_finger = within
 
-        # Middle finger tip (12) to Thumb tip (4)
-        dist_mid_thumb = ((landmarks[12].x - landmarks[4].x)**2 + (landmarks[12].y - landmarks[4].y)**2)**0.5
-        Controller.middle_finger_within_Thumb_finger = dist_mid_thumb < threshold_touch
-        
-        # Ring finger tip (16) to Thumb tip (4)
-        dist_ring_thumb = ((landmarks[16].x - landmarks[4].x)**2 + (landmarks[16].y - landmarks[4].y)**2)**0.5
-        Controller.ring_finger_within_Thumb_finger = dist_ring_thumb < threshold_touch
-
-        # Little finger (20) to Thumb tip (4) - less common for clicks, but for completeness
-        dist_lit_thumb = ((landmarks[20].x - landmarks[4].x)**2 + (landmarks[20].y - landmarks[4].y)**2)**0.5
-        Controller.little_finger_within_Thumb_finger = dist_lit_thumb < threshold_touch
-
-    @staticmethod
-    def get_position(hand_x_position, hand_y_position):
-        # This smoothing logic can be complex. A simple direct mapping or light smoothing.
-        # pyautogui.moveTo clamps to screen edges automatically.
-        
-        # Raw mapping:
-        # current_x = int(hand_x_position * Controller.screen_width)
-        # current_y = int(hand_y_position * Controller.screen_height)
+        # Everything the built-in rules look at, packed into one lookup key
+        self.finger_state = frame_state(up, within)
 
-        # Smoothed movement (exponential moving average or simple interpolation)
-        # For simplicity, using a sensitivity factor for now.
-        sensitivity = 1.5 # Adjust this for faster/slower cursor
-        
-        old_x, old_y = pyautogui.position()
+    def get_position(self, hand_x_position, hand_y_position):
+        """Screen position for a normalized hand position, smoothed by cursor_filter.
+
+        The filter keeps its own state (timed by self.clock), so nothing is read back from
+        the backend or the OS cursor. pyautogui.moveTo clamps to screen edges.
+        """
+        self.get_input_backend() # Screen size comes from the backend
         
-        # Map normalized hand position (0-1) to screen coordinates
         # Invert X if camera is mirrored and flip is applied (img = cv2.flip(img, 1))
         # If not flipped, hand_x_position directly maps. Assuming flip is done.
-        target_x = int((1.0 - hand_x_position) * Controller.screen_width)
-        target_y = int(hand_y_position * Controller.screen_height)
+        x, y = self.cursor_filter(1.0 - hand_x_position, hand_y_position, self.clock())
 
-        # Interpolate for smoother movement
-        move_x = old_x + (target_x - old_x) * 0.3 # Adjust 0.3 for smoothness
-        move_y = old_y + (target_y - old_y) * 0.3
+        # Map the smoothed normalized position (0-1) to screen coordinates
+        return (int(x * self.screen_width), int(y * self.screen_height))
 
-        # Apply sensitivity by amplifying the delta from current position to target
-        # This might make it jumpy if not careful. The interpolation above is usually better.
-        # Let's stick to interpolated move_x, move_y for now.
-
-        # pyautogui.moveTo already handles clamping to screen edges.
-        return (int(move_x), int(move_y))
-
-    @staticmethod
-    def cursor_moving():
-        if Controller.hand_Landmarks is None: return
+    def cursor_moving(self):
+        if self.hand_Landmarks is None: return
         
         # Use index finger tip (landmark 8) for cursor control
         # Using MCP (landmark 0) or a point between fingers can also be stable.
-        point_idx = 8 
-        current_x_norm = Controller.hand_Landmarks.landmark[point_idx].x
-        current_y_norm = Controller.hand_Landmarks.landmark[point_idx].y
+        current_x_norm, current_y_norm = analyze_hand(self.hand_Landmarks).index_tip # Landmark 8
         
-        x, y = Controller.get_position(current_x_norm, current_y_norm)
+        x, y = self.get_position(current_x_norm, current_y_norm)
         
         # Cursor freeze condition: e.g., fist (all fingers down) or specific gesture
         # Original: all_fingers_up and Thump_finger_down
         # Let's use: if all fingers are down (fist-like) or a specific 'freeze' custom gesture
-        cursor_freezed = Controller.all_fingers_up and Controller.Thump_finger_down # Original logic
+        cursor_freezed = self.all_fingers_up and self.Thump_finger_down # Original logic
 
         if not cursor_freezed:
-            pyautogui.moveTo(x, y, duration=0) # duration=0 for fastest response
-
-    @staticmethod
-    def detect_scrolling():
-        if Controller.hand_Landmarks is None: return
-
-        # Scroll Up: Little finger up, others down (Index, Middle, Ring)
-        scrolling_up = (Controller.little_finger_up and
-                        Controller.index_finger_down and
-                        Controller.middle_finger_down and
-                        Controller.ring_finger_down)
-        if scrolling_up:
-            pyautogui.scroll(120) # Scroll amount
-            print("Scrolling UP (built-in)")
-            time.sleep(0.2) # Small delay to prevent rapid scrolling
-
-        # Scroll Down: Index finger up, others down (Middle, Ring, Little)
-        scrolling_down = (Controller.index_finger_up and
-                          Controller.middle_finger_down and
-                          Controller.ring_finger_down and
-                          Controller.little_finger_down)
-        if scrolling_down:
-            pyautogui.scroll(-120) # Scroll amount
-            print("Scrolling DOWN (built-in)")
-            time.sleep(0.2) # Small delay
-
-    @staticmethod
-    def detect_zoomming(): # Renamed from zoomming
-        if Controller.hand_Landmarks is None: return
-
-        # Zoom: Index and Middle up, Ring and Little down
-        zoom_base_gesture = (Controller.index_finger_up and
-                             Controller.middle_finger_up and
-                             Controller.ring_finger_down and
-                             Controller.little_finger_down)
-        
-        if zoom_base_gesture:
-            # Distance between index tip (8) and middle tip (12)
-            landmarks = Controller.hand_Landmarks.landmark
-            dist_index_middle = ((landmarks[8].x - landmarks[12].x)**2 + 
-                                 (landmarks[8].y - landmarks[12].y)**2)**0.5
-            
-            # Define thresholds for pinch/spread
-            pinch_threshold = 0.07  # Fingers close
-            spread_threshold = 0.12 # Fingers further apart
-                                    # These thresholds are relative to normalized coordinates
-                                    # and may need calibration.
-
-            # Store previous distance to detect change
-            if not hasattr(Controller, 'prev_zoom_dist'):
-                Controller.prev_zoom_dist = dist_index_middle
-
-            current_dist = dist_index_middle
-            
-            # Zoom In: Fingers spreading apart
-            if current_dist > Controller.prev_zoom_dist and current_dist > spread_threshold * 0.8: # check if spreading and somewhat spread
-                pyautogui.keyDown('ctrl')
-                pyautogui.scroll(100) # positive for zoom in
-                pyautogui.keyUp('ctrl')
-                print("Zooming In (built-in)")
-                time.sleep(0.1) # debounce
-            
-            # Zoom Out: Fingers pinching together
-            elif current_dist < Controller.prev_zoom_dist and current_dist < pinch_threshold * 1.2: # check if pinching and somewhat pinched
-                pyautogui.keyDown('ctrl')
-                pyautogui.scroll(-100) # negative for zoom out
-                pyautogui.keyUp('ctrl')
-                print("Zooming Out (built-in)")
-                time.sleep(0.1) # debounce
-            
-            Controller.prev_zoom_dist = current_dist
-
-
-    @staticmethod
-    def detect_clicking():
-        if Controller.hand_Landmarks is None: return
-
-        # Left Click: Index finger touches thumb, other main fingers (Middle, Ring, Little) are up.
-        left_click_condition = (Controller.index_finger_within_Thumb_finger and
-                                Controller.middle_finger_up and
-                                Controller.ring_finger_up and
-                                Controller.little_finger_up and
-                                not Controller.middle_finger_within_Thumb_finger and # Ensure other fingers aren't also touching
-                                not Controller.ring_finger_within_Thumb_finger)
-
-        if not Controller.left_clicked and left_click_condition:
-            pyautogui.click()
-            Controller.left_clicked = True
-            print("Left Clicking (built-in)")
-            # time.sleep(0.2) # Debounce if needed
-        elif not Controller.index_finger_within_Thumb_finger: # Reset when finger moves away
-            Controller.left_clicked = False
-
-        # Right Click: Middle finger touches thumb, other main fingers (Index, Ring, Little) are up.
-        right_click_condition = (Controller.middle_finger_within_Thumb_finger and
-                                 Controller.index_finger_up and
-                                 Controller.ring_finger_up and
-                                 Controller.little_finger_up and
-                                 not Controller.index_finger_within_Thumb_finger and
-                                 not Controller.ring_finger_within_Thumb_finger)
-        if not Controller.right_clicked and right_click_condition:
-            pyautogui.rightClick()
-            Controller.right_clicked = True
-            print("Right Clicking (built-in)")
-            # time.sleep(0.2)
-        elif not Controller.middle_finger_within_Thumb_finger:
-            Controller.right_clicked = False
-
-        # Double Click: Ring finger touches thumb (example, can be changed)
-        double_click_condition = (Controller.ring_finger_within_Thumb_finger and
-                                  Controller.index_finger_up and
-                                  Controller.middle_finger_up and
-                                  Controller.little_finger_up and
-                                  not Controller.index_finger_within_Thumb_finger and
-                                  not Controller.middle_finger_within_Thumb_finger)
-        if not Controller.double_clicked and double_click_condition:
-            pyautogui.doubleClick()
-            Controller.double_clicked = True
-            print("Double Clicking (built-in)")
-            # time.sleep(0.2)
-        elif not Controller.ring_finger_within_Thumb_finger:
-            Controller.double_clicked = False
-
-    @staticmethod
-    def detect_dragging():
-        if Controller.hand_Landmarks is None: return
-        
-        # Drag: All fingers (Index, Middle, Ring, Little) are down (fist-like)
-        # Assumes thumb state doesn't matter for this simple drag.
-        drag_condition = Controller.all_fingers_down 
-
-        if not Controller.dragging and drag_condition:
-            pyautogui.mouseDown(button="left")
-            Controller.dragging = True
-            print("Dragging STARTED (built-in)")
-        elif Controller.dragging and not drag_condition: # If dragging and condition is no longer met
-            pyautogui.mouseUp(button="left")
-            Controller.dragging = False
-            print("Dragging STOPPED (built-in)")
+            # duration=0 for fastest response; queued moves collapse into the latest position
+            self.get_action_executor().submit('move', self.get_input_backend().move_to,
+                                          args=(x, y), coalesce=True)
+
+    def apply_built_in_rules(self, inferred=True, group=None):
+        """Run the built-in gestures (gesture_rules) for the primary hand with one table lookup.
+
+        inferred=False (predicted landmarks) skips rules that fire discrete actions; group
+        limits evaluation to one kind of gesture ('scroll', 'zoom', 'click' or 'drag').
+        """
+        if self.hand_Landmarks is None: return
+
+        state = self.finger_state
+        for rule, trigger, latch, release, matched in self.rule_table.lookup[state]:
+            if (rule.inferred_only and not inferred) or (group is not None and rule.group != group):
+                continue
+            if trigger == LEVEL:
+                self._fire_rule(rule)
+            elif matched and not getattr(self, latch): # Edge or start of a hold
+                # A hold start the executor rejected must not latch: its end action would release nothing
+                if self._fire_rule(rule) or trigger == EDGE:
+                    setattr(self, latch, True)
+            elif trigger == EDGE:
+                if not state & release and getattr(self, latch): # Reset when the finger moves away
+                    setattr(self, latch, False)
+            elif not matched and getattr(self, latch): # HOLD, and the condition is no longer met
+                # force: the end of a hold (mouse_up) must never be dropped or rate-limited
+                self.get_action_executor().submit(rule.name, getattr(self.get_input_backend(), rule.end_action),
+                                                  args=rule.args, force=True)
+                setattr(self, latch, False)
+                if rule.end_message:
+                    event_log.log(rule.name + '_end', rule.end_message)
+
+    def _fire_rule(self, rule) -> bool:
+        """Run or submit the rule's action. Returns False if the executor rejected it."""
+        t = tracer.now() if tracer.enabled else 0
+        accepted = True
+        if rule.action.startswith('engine.'):
+            getattr(self, rule.action[len('engine.'):])()
+        else:
+            # Level rules are rate-limited instead of sleeping; ticks still waiting in the queue are merged
+            min_interval = getattr(self, rule.interval) if rule.interval else 0.0
+            accepted = self.get_action_executor().submit(rule.name, getattr(self.get_input_backend(), rule.action),
+                                                         args=rule.args, amount=rule.amount, min_interval=min_interval,
+                                                         coalesce=rule.trigger == LEVEL)
+            if accepted and rule.message: # Rate-limited per rule; a held scroll logs about once a second
+                event_log.log(rule.name, rule.message)
+        if t: tracer.lap(rule.name, t) # One span per built-in detector that fired
+        return accepted
+
+    def zoom_step(self):
+        """Zoom rule handler: zoom in while index and middle spread apart, out while they pinch."""
+        # Distance between index tip (8) and middle tip (12), in palm sizes
+        dist_index_middle = self.hand_analysis.index_middle_distance
+
+        # Define thresholds for pinch/spread
+        pinch_threshold = 0.35  # Fingers close
+        spread_threshold = 0.6  # Fingers further apart
+                                # These thresholds are in 2D palm sizes (wrist to middle MCP)
+                                # and may need calibration.
+
+        # Store previous distance to detect change
+        if self.prev_zoom_dist is None:
+            self.prev_zoom_dist = dist_index_middle
+
+        current_dist = dist_index_middle
+
+        # Zoom In: Fingers spreading apart
+        if current_dist > self.prev_zoom_dist and current_dist > spread_threshold * 0.8: # check if spreading and somewhat spread
+            if self.get_action_executor().submit('zoom_in', self.get_input_backend().ctrl_scroll, amount=100, # positive for zoom in
+                                                 min_interval=self.zoom_interval, coalesce=True):
+                event_log.log('zoom_in', "Zooming In (built-in)")
+
+        # Zoom Out: Fingers pinching together
+        elif current_dist < self.prev_zoom_dist and current_dist < pinch_threshold * 1.2: # check if pinching and somewhat pinched
+            if self.get_action_executor().submit('zoom_out', self.get_input_backend().ctrl_scroll, amount=-100, # negative for zoom out
+                                                 min_interval=self.zoom_interval, coalesce=True):
+                event_log.log('zoom_out', "Zooming Out (built-in)")
+
+        self.prev_zoom_dist = current_dist
+
+    # The per-gesture entry points app.py calls; each runs its slice of the rule table
+    def detect_scrolling(self):
+        self.apply_built_in_rules(group='scroll')
+
+    def detect_zoomming(self): # Renamed from zoomming
+        self.apply_built_in_rules(group='zoom')
+
+    def detect_clicking(self):
+        self.apply_built_in_rules(group='click')
+
+    def detect_dragging(self):
+        self.apply_built_in_rules(group='drag')
+
+    def release_drag(self, reason):
+        """End a built-in drag that is in progress (e.g. the hand holding it left or lost primary)."""
+        if self.dragging:
+            self.get_action_executor().submit('drag', self.get_input_backend().mouse_up, args=("left",), force=True)
+            self.dragging = False
+            event_log.log('drag_end', f"Dragging STOPPED ({reason})")
             
-    @staticmethod
-    def detect_custom_gestures(current_hand_landmarks):
+    def detect_custom_gestures(self, current_hand_landmarks, hand_id=0):
         """Detect and execute custom gestures for the given hand landmarks."""
-        current_time = time.time()
-
         # Handle recording mode:
-        if Controller.get_gesture_mapper().recording_mode:
+        if self.get_gesture_mapper().recording_mode:
             # The app_with_gui.py ensures this is called only for the primary hand during recording.
-            Controller.get_gesture_mapper().record_gesture_frame(current_hand_landmarks)
-            # print(f"Recording frame for {Controller.gesture_mapper.current_gesture_name}...") # Debug
+            self.get_gesture_mapper().record_gesture_frame(current_hand_landmarks)
+            # print(f"Recording frame for {self.gesture_mapper.current_gesture_name}...") # Debug
             return # Don't try to match/execute while recording
 
-        # Cooldown check: only allow new gesture execution after cooldown period
-        if current_time - Controller.last_gesture_time < Controller.gesture_cooldown:
-            return
-
-        detected_gesture_name = Controller.get_gesture_mapper().match_gesture(current_hand_landmarks)
-
+        self.detect_custom_gestures_batch([current_hand_landmarks], [hand_id])
+
+    def detect_custom_gestures_batch(self, hand_landmarks_list, hand_ids):
+        """Match every hand of a frame in one batched call and run hold/cooldown logic per hand."""
+        current_time = self.clock()
+        states = self.hand_gesture_states
+        mapper = self.get_gesture_mapper()
+
+        hand_states = []
+        for hand_id in hand_ids:
+            state = states.get(hand_id)
+            if state is None:
+                state = states[hand_id] = HandGestureState()
+            state.last_seen = current_time
+            hand_states.append(state)
+
+        # Moving gestures: every hand's motion is streamed each frame (also during cooldown) and a
+        # completed motion fires right away, no hold needed
+        dynamic_names = mapper.match_dynamic_gestures(hand_landmarks_list, hand_ids)
+        for hand_id, state, dynamic_name in zip(hand_ids, hand_states, dynamic_names):
+            if dynamic_name and current_time - state.last_gesture_time >= self.gesture_cooldown:
+                if mapper.execute_gesture_action(dynamic_name, hand_id):
+                    state.last_gesture_time = current_time
+                    state.gesture_name = None
+                    state.hold_start_time = 0
+
+        # Hands still in cooldown are not matched at all
+        pending = []
+        for hand_lms, hand_id, state in zip(hand_landmarks_list, hand_ids, hand_states):
+            # Cooldown check: only allow new gesture execution after cooldown period
+            if current_time - state.last_gesture_time >= self.gesture_cooldown:
+                pending.append((hand_lms, hand_id, state))
+
+        if pending:
+            names = mapper.match_gestures([hand_lms for hand_lms, _, _ in pending])
+            for (_, hand_id, state), detected_gesture_name in zip(pending, names):
+                self._update_gesture_hold(state, detected_gesture_name, current_time, hand_id)
+
+        # Drop state of hands that left the frame a while ago
+        if len(states) > len(hand_ids):
+            for hand_id in [h for h, s in states.items() if current_time - s.last_seen > self.hand_state_timeout]:
+                del states[hand_id]
+
+    def _update_gesture_hold(self, state, detected_gesture_name, current_time, hand_id=None):
         if detected_gesture_name:
-            if detected_gesture_name == Controller.last_detected_gesture_name:
+            if detected_gesture_name == state.gesture_name:
                 # Gesture is being held, check if hold time exceeds threshold
-                if (current_time - Controller.gesture_hold_start_time) >= Controller.gesture_hold_threshold:
-                    if Controller.get_gesture_mapper().execute_gesture_action(detected_gesture_name):
-                        Controller.last_gesture_time = current_time  # Reset cooldown timer
+                if (current_time - state.hold_start_time) >= self.gesture_hold_threshold:
+                    if self.get_gesture_mapper().execute_gesture_action(detected_gesture_name, hand_id):
+                        state.last_gesture_time = current_time  # Reset cooldown timer
                         # Reset hold state as action is executed
-                        Controller.last_detected_gesture_name = None 
-                        Controller.gesture_hold_start_time = 0
+                        state.gesture_name = None
+                        state.hold_start_time = 0
             else:
                 # New gesture detected, start tracking its hold time
-                Controller.last_detected_gesture_name = detected_gesture_name
-                Controller.gesture_hold_start_time = current_time
+                state.gesture_name = detected_gesture_name
+                state.hold_start_time = current_time
         else:
             # No gesture (or no match), reset hold state
-            Controller.last_detected_gesture_name = None
-            Controller.gesture_hold_start_time = 0
+            state.gesture_name = None
+            state.hold_start_time = 0
             
     # --- Methods to interact with GestureMapper (called from GUI or main app) ---
-    @staticmethod
-    def start_gesture_recording(gesture_name: str):
-        Controller.get_gesture_mapper().start_recording_gesture(gesture_name)
+    def start_gesture_recording(self, gesture_name: str, dynamic: bool = False) -> bool:
+        return self.get_gesture_mapper().start_recording_gesture(gesture_name, dynamic)
+
+    def stop_gesture_recording(self) -> bool:
+        return self.get_gesture_mapper().stop_recording_gesture()
+
+    def map_gesture_to_action(self, gesture_name: str, action_name: str) -> bool:
+        return self.get_gesture_mapper().map_gesture_to_action(gesture_name, action_name)
+
+    def get_available_actions(self) -> list:
+        return self.get_gesture_mapper().get_available_actions()
 
-    @staticmethod
-    def stop_gesture_recording() -> bool:
-        return Controller.get_gesture_mapper().stop_recording_gesture()
+    def get_mapped_gestures(self) -> dict:
+        return self.get_gesture_mapper().get_mapped_gestures()
 
-    @staticmethod
-    def map_gesture_to_action(gesture_name: str, action_name: str) -> bool:
-        return Controller.get_gesture_mapper().map_gesture_to_action(gesture_name, action_name)
+    def remove_gesture_mapping(self, gesture_name: str) -> bool:
+        return self.get_gesture_mapper().remove_gesture_mapping(gesture_name)
 
-    @staticmethod
-    def get_available_actions() -> list:
-        return Controller.get_gesture_mapper().get_available_actions()
 
-    @staticmethod
-    def get_mapped_gestures() -> dict:
-        return Controller.get_gesture_mapper().get_mapped_gestures()
+class _ControllerFacade(type):
+    """Forwards Controller.<name> reads and writes to the default ControllerEngine."""
 
-    @staticmethod
-    def remove_gesture_mapping(gesture_name: str) -> bool:
-        return Controller.get_gesture_mapper().remove_gesture_mapping(gesture_name)
\ No newline at end of file
+    def __getattr__(cls, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(cls.default(), name)
+
+    def __setattr__(cls, name, value):
+        if name in ControllerEngine.__slots__:
+            setattr(cls.default(), name, value)
+        else:
+            super().__setattr__(name, value)
+
+
+class Controller(metaclass=_ControllerFacade):
+    """Static API over a process-wide default ControllerEngine.
+
+    Controller.cursor_moving(), Controller.dragging, Controller.clock = ... and so on go to
+    Controller.default(), so app.py, the GUI and existing scripts keep working unchanged.
+    """
+    _default = None
+
+    @classmethod
+    def default(cls) -> ControllerEngine:
+        if cls._default is None:
+            cls._default = ControllerEngine()
+        return cls._default
+
+    @classmethod
+    def set_default(cls, engine: ControllerEngine):
+        """Make engine the one behind the static API."""
+        cls._default = engine
@@ -0,0 +1,168 @@
+"""Cursor smoothing filters: One Euro, constant-velocity Kalman, and the old fixed lerp.
+
+The cursor used to move a fixed 0.3 of the way from the backend's cursor position towards
+the hand every frame: several frames of lag on fast motion, yet still visible jitter when
+the hand is held still, and tied to wherever the OS cursor happened to be. These filters
+keep their own state and smooth the hand position itself (normalized 0-1 coordinates,
+before mapping to the screen), using the frame timestamps:
+
+    OneEuroFilter  cutoff frequency rises with speed: heavy smoothing when still, little lag
+                   when moving (Casiez et al., CHI 2012). min_cutoff sets still-hand jitter,
+                   beta the lag on fast motion.
+    KalmanFilter   constant-velocity model per axis; measurement_noise / process_noise sets
+                   the trade-off (more process noise: follows faster, smooths less)
+    LerpFilter     the previous behaviour (fixed fraction per frame), as a baseline
+
+Every filter restarts from the measurement after a gap longer than max_gap (hand lost)
+or after reset(). benchmarks/cursor_filters.py compares them on replayed hand motion.
+"""
+import math
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+
+class CursorFilter(ABC):
+    """Base class: __call__(x, y, t) -> smoothed (x, y); t in seconds."""
+
+    def __init__(self, max_gap: float = 0.5):
+        self.max_gap = max_gap  # Seconds without input after which the filter restarts
+        self._t = None
+
+    def reset(self):
+        self._t = None
+
+    def __call__(self, x: float, y: float, t: float) -> Tuple[float, float]:
+        if self._t is None or t - self._t > self.max_gap:
+            self._t = t
+            self._start(x, y)
+            return x, y
+        dt = t - self._t
+        if dt <= 0.0:
+            return self._output()  # Same timestamp again: nothing new to filter
+        self._t = t
+        return self._update(x, y, dt)
+
+    @abstractmethod
+    def _start(self, x: float, y: float):
+        """Restart the filter state at this measurement."""
+
+    @abstractmethod
+    def _update(self, x: float, y: float, dt: float) -> Tuple[float, float]:
+        """Filter a measurement dt seconds after the previous one."""
+
+    @abstractmethod
+    def _output(self) -> Tuple[float, float]:
+        """The current smoothed position."""
+
+
+class LerpFilter(CursorFilter):
+    """Moves a fixed fraction of the way to the measurement each frame (frame-rate dependent)."""
+
+    def __init__(self, alpha: float = 0.3, max_gap: float = 0.5):
+        super().__init__(max_gap)
+        self.alpha = alpha
+
+    def _start(self, x, y):
+        self._x, self._y = x, y
+
+    def _update(self, x, y, dt):
+        self._x += (x - self._x) * self.alpha
+        self._y += (y - self._y) * self.alpha
+        return self._x, self._y
+
+    def _output(self):
+        return self._x, self._y
+
+
+def _smoothing(cutoff: float, dt: float) -> float:
+    """Exponential smoothing factor of a first-order low-pass filter at this cutoff (Hz)."""
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter(CursorFilter):
+    """Low-pass filter whose cutoff grows with the (smoothed) speed of the hand.
+
+    min_cutoff: cutoff (Hz) while the hand is still; lower = less jitter, more lag when starting
+    beta:       cutoff increase per unit of speed (normalized units/s); higher = less lag when fast
+    d_cutoff:   cutoff (Hz) for the speed estimate
+    """
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 20.0, d_cutoff: float = 1.0, max_gap: float = 0.5):
+        super().__init__(max_gap)
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+
+    def _start(self, x, y):
+        self._x, self._y = x, y
+        self._dx = self._dy = 0.0
+
+    def _update(self, x, y, dt):
+        a_d = _smoothing(self.d_cutoff, dt)
+        self._dx += ((x - self._x) / dt - self._dx) * a_d
+        self._dy += ((y - self._y) / dt - self._dy) * a_d
+        cutoff = self.min_cutoff + self.beta * math.hypot(self._dx, self._dy)  # Speed of both axes together
+        a = _smoothing(cutoff, dt)
+        self._x += (x - self._x) * a
+        self._y += (y - self._y) * a
+        return self._x, self._y
+
+    def _output(self):
+        return self._x, self._y
+
+
+class KalmanFilter(CursorFilter):
+    """Constant-velocity Kalman filter on each axis (both axes share one covariance).
+
+    measurement_noise: standard deviation of the landmark noise (normalized units)
+    process_noise:     spectral density of the (white) acceleration; higher = follows
+                       direction changes faster, smooths less
+    """
+
+    def __init__(self, measurement_noise: float = 0.003, process_noise: float = 0.05, max_gap: float = 0.5):
+        super().__init__(max_gap)
+        self.measurement_noise = measurement_noise
+        self.process_noise = process_noise
+
+    def _start(self, x, y):
+        self._x, self._y = x, y
+        self._vx = self._vy = 0.0
+        r = self.measurement_noise ** 2
+        self._p = [r, 0.0, 1.0]  # Covariance [pos-pos, pos-vel, vel-vel]; velocity unknown
+
+    def _update(self, x, y, dt):
+        # Predict: position moves with velocity; covariance grows by the white-acceleration noise
+        p00, p01, p11 = self._p
+        q = self.process_noise
+        p00 = p00 + dt * (2.0 * p01 + dt * p11) + q * dt ** 3 / 3.0
+        p01 = p01 + dt * p11 + q * dt ** 2 / 2.0
+        p11 = p11 + q * dt
+        px, py = self._x + self._vx * dt, self._y + self._vy * dt
+
+        # Update with the measured position
+        s = p00 + self.measurement_noise ** 2
+        k0, k1 = p00 / s, p01 / s
+        ex, ey = x - px, y - py
+        self._x, self._y = px + k0 * ex, py + k0 * ey
+        self._vx += k1 * ex
+        self._vy += k1 * ey
+        self._p = [(1.0 - k0) * p00, (1.0 - k0) * p01, p11 - k1 * p01]
+        return self._x, self._y
+
+    def _output(self):
+        return self._x, self._y
+
+
+FILTERS = {
+    'one_euro': OneEuroFilter,
+    'kalman': KalmanFilter,
+    'lerp': LerpFilter,
+}
+
+
+def make_filter(name: str, params: Optional[Dict[str, float]] = None) -> CursorFilter:
+    """Filter by name ('one_euro', 'kalman' or 'lerp'), with optional constructor parameters."""
+    if name not in FILTERS:
+        raise ValueError(f"Unknown cursor filter '{name}' (choose from {', '.join(FILTERS)})")
+    return FILTERS[name](**(params or {}))
@@ -0,0 +1,224 @@
+"""Dynamic (moving) gestures: swipes, circles and waves matched with streaming DTW.
+
+Static templates describe a single pose. A dynamic template is the recorded sequence of
+per-frame motion features: the direction the palm moves in (see motion_feature) and how
+open the hand is. The live stream is matched against every template with a streaming
+subsequence DTW (SPRING-style: a match may start at any frame), advanced by one column
+per frame:
+
+- steps: each frame either stays on the same template frame, advances one, or skips one,
+  so the path slope lies between 0 and 2, and a band limits how long a match may take
+  (max_stretch x the template frames covered)
+- costs are relative to the template's total motion, so one threshold suits short and
+  long gestures alike and a hand held still never matches
+- early abandoning: accumulated costs only grow, so a cell whose cost already exceeds the
+  template's limit can never finish as a match and is dropped
+- a match is reported once no overlapping path can still beat it (or after max_delay
+  frames), and everything that overlaps it is then dropped, so one motion fires once,
+  with its best template
+
+All templates are packed end to end into one array, so a frame is a fixed number of
+vectorized operations over the total template length: the per-frame cost is bounded and
+does not grow with how long the hand has been moving. One stream is kept per hand id.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from hand_tracker import palm_centroid
+from landmark_array import analyze_hand
+
+NUM_FEATURES = 3  # Motion direction x, y and hand openness
+FULL_SPEED = 0.05  # Palm sizes per frame from which the direction vector has unit length
+OPENNESS_WEIGHT = 0.5  # Weight of hand openness against motion direction in the frame distance
+MIN_PALM_SIZE = 1e-3
+MIN_SPEED = 0.1  # Floor (direction vector length) for the cost normalization of slow templates
+
+
+def motion_feature(hand_landmarks, previous: Optional[Tuple[float, float]]):
+    """(feature or None, centroid) for one frame; the feature needs the previous frame's centroid.
+
+    The palm velocity (in palm sizes, so the distance to the camera does not matter) is
+    scaled to unit length once it reaches FULL_SPEED: DTW absorbs differences in timing
+    but not in amplitude, so a gesture performed faster or slower must give the same
+    vectors. Slower motion (and sensor noise) shrinks towards zero.
+    """
+    x, y, size = palm_centroid(hand_landmarks)
+    if previous is None:
+        return None, (x, y)
+    size = max(size, MIN_PALM_SIZE)
+    dx, dy = (x - previous[0]) / size, (y - previous[1]) / size
+    scale = 1.0 / max((dx * dx + dy * dy) ** 0.5, FULL_SPEED)
+    openness = sum(analyze_hand(hand_landmarks).fingers_extended) / 5.0
+    return np.array([dx * scale, dy * scale, openness * OPENNESS_WEIGHT]), (x, y)
+
+
+def trim_idle(sequence: np.ndarray, min_speed: float = 0.4) -> np.ndarray:
+    """Drop the frames before the hand starts moving and after it stops."""
+    speed = np.hypot(sequence[:, 0], sequence[:, 1])
+    moving = np.flatnonzero(speed >= min_speed)
+    if not len(moving):
+        return sequence[:0]
+    return sequence[moving[0]:moving[-1] + 1]
+
+
+class _Stream:
+    """Matching state of one hand: the current DTW column of all templates."""
+    __slots__ = ('cost', 'start', 'frame', 'previous', 'pending')
+
+    def __init__(self, size):
+        self.cost = np.full(size, np.inf)  # Accumulated cost per template frame
+        self.start = np.zeros(size, dtype=np.int64)  # Frame at which each cell's path started
+        self.frame = 0
+        self.previous = None  # Palm centroid of the previous frame
+        self.pending = None  # Best match not reported yet: (relative cost, template, end frame)
+
+
+class DynamicGestureMatcher:
+    """Streaming DTW over all dynamic templates, one stream per hand.
+
+    threshold:     largest match cost, relative to the template's total motion (frames x
+                   mean direction vector length); a hand that does not move scores about 1
+    max_stretch:   a match may take at most this many times the template frames it covers
+    max_length:    longer templates are cut to this many frames
+    max_delay:     frames a match may wait for an overlapping path that could still beat it
+    early_abandon: drop paths that can no longer end below threshold (off: keep them until
+                   the band ends them; same matches, more live paths)
+    """
+
+    def __init__(self, threshold: float = 0.5, max_stretch: float = 2.0, max_length: int = 90,
+                 max_delay: int = 10, early_abandon: bool = True):
+        self.threshold = threshold
+        self.max_stretch = max_stretch
+        self.max_length = max_length
+        self.max_delay = max_delay
+        self.early_abandon = early_abandon
+        self.names: List[str] = []
+        self.dirty = True
+        self._streams: Dict = {}
+
+        # Statistics
+        self.frames = 0
+        self.cells_active = 0  # Live DTW cells after each frame, summed
+        self.cells_total = 0   # Template frames x frames
+        self.matches = 0
+
+    def compile(self, templates: Dict[str, Sequence]):
+        """Pack templates (name -> (frames, NUM_FEATURES) sequence) and reset all streams."""
+        sequences = []
+        self.names = []
+        for name, sequence in templates.items():
+            sequence = np.asarray(sequence, dtype=np.float64).reshape(-1, NUM_FEATURES)[:self.max_length]
+            if len(sequence):
+                self.names.append(name)
+                sequences.append(sequence)
+        lengths = np.array([len(s) for s in sequences], dtype=np.int64)
+        self.size = int(lengths.sum())
+        self.templates = np.concatenate(sequences) if sequences else np.zeros((0, NUM_FEATURES))
+        self.squared_norms = (self.templates * self.templates).sum(axis=1)
+
+        ends = np.cumsum(lengths)
+        self.firsts = ends - lengths                      # Position of each template's first frame
+        self.seconds = self.firsts[lengths > 1] + 1       # ... and second frame (reachable by a skip)
+        self.lasts = ends - 1                             # ... and last frame (a match ends there)
+        rows = np.repeat(np.arange(len(sequences)), lengths)
+        columns = np.arange(self.size) - self.firsts[rows]
+        self.band = self.max_stretch * (columns + 1)  # Frames a path may take up to each template frame
+
+        # Costs are relative to the template's own motion: a still hand scores about 1 against any template
+        speeds = np.hypot(self.templates[:, 0], self.templates[:, 1])
+        self.norms = np.maximum(np.add.reduceat(speeds, self.firsts) if len(sequences) else speeds,
+                                MIN_SPEED * lengths)  # Template frames x mean speed
+        self.limits = (self.threshold * self.norms)[rows]  # Accumulated cost beyond which a cell is hopeless
+        self.inverse_norms = (1.0 / self.norms)[rows]
+        self._streams = {}
+        self.dirty = False
+
+    def invalidate(self):
+        self.dirty = True
+
+    def reset(self, stream_id=None):
+        """Forget the motion seen so far (one stream, or all)."""
+        if stream_id is None:
+            self._streams = {}
+        else:
+            self._streams.pop(stream_id, None)
+
+    def update(self, stream_id, hand_landmarks) -> Optional[Tuple[str, float]]:
+        """Feed one frame of a hand. Returns (name, relative cost) when a dynamic gesture completes."""
+        if not self.names:
+            return None
+        stream = self._streams.get(stream_id)
+        if stream is None:
+            stream = self._streams[stream_id] = _Stream(self.size)
+        feature, stream.previous = motion_feature(hand_landmarks, stream.previous)
+        if feature is None:
+            return None
+        return self._step(stream, feature)
+
+    def update_streams(self, hands: Sequence, stream_ids: Sequence) -> List[Optional[Tuple[str, float]]]:
+        """update() for every hand of a frame; streams of hands that are gone are dropped."""
+        if len(self._streams) > len(stream_ids):
+            for stream_id in [s for s in self._streams if s not in stream_ids]:
+                del self._streams[stream_id]
+        return [self.update(stream_id, hand) for hand, stream_id in zip(hands, stream_ids)]
+
+    def _step(self, stream: _Stream, feature: np.ndarray) -> Optional[Tuple[str, float]]:
+        stream.frame += 1
+        frame, cost, start = stream.frame, stream.cost, stream.start
+
+        # Distance of this frame to every template frame: |t|^2 - 2 t.f + |f|^2
+        distance = np.sqrt(np.maximum(self.squared_norms - 2.0 * (self.templates @ feature) + feature @ feature, 0.0))
+
+        # Predecessors: stay (same cell), advance (previous cell) or skip (two cells back); a path
+        # may enter a template at its first frame (advance) or second frame (skip) at no cost
+        advance = np.empty_like(cost)
+        advance[1:] = cost[:-1]
+        advance[self.firsts] = 0.0
+        advance_start = np.empty_like(start)
+        advance_start[1:] = start[:-1]
+        advance_start[self.firsts] = frame
+        skip = np.empty_like(cost)
+        skip[2:] = cost[:-2]
+        skip[self.firsts] = np.inf
+        skip[self.seconds] = 0.0
+        skip_start = np.empty_like(start)
+        skip_start[2:] = start[:-2]
+        skip_start[self.seconds] = frame
+
+        # A skip covers two template frames with one live frame, so its distance counts twice:
+        # every complete path then weighs at least the template length
+        new_cost = cost + distance
+        advance += distance
+        skip += distance + distance
+        new_start = np.where(advance < new_cost, advance_start, start)
+        np.minimum(new_cost, advance, out=new_cost)
+        new_start = np.where(skip < new_cost, skip_start, new_start)
+        np.minimum(new_cost, skip, out=new_cost)
+
+        # Band: a path may not take longer than max_stretch x the template frames it covers
+        new_cost[frame - new_start >= self.band] = np.inf
+        if self.early_abandon:
+            new_cost[new_cost > self.limits] = np.inf
+        stream.cost, stream.start = new_cost, new_start
+        self.frames += 1
+        self.cells_active += int(np.count_nonzero(new_cost < np.inf))
+        self.cells_total += self.size
+
+        # A template whose last frame is reached below threshold is a candidate match
+        final = new_cost[self.lasts] * self.inverse_norms[self.lasts]
+        row = int(final.argmin())
+        if final[row] < self.threshold and (stream.pending is None or final[row] < stream.pending[0]):
+            stream.pending = (final[row], row, frame)
+        if stream.pending is None:
+            return None
+
+        # Report it once no path that overlaps it can still end with a lower relative cost
+        best, row, end = stream.pending
+        overlapping = new_start <= end
+        if frame - end < self.max_delay and np.any(overlapping & (new_cost * self.inverse_norms < best)):
+            return None
+        new_cost[overlapping] = np.inf  # The motion is used up
+        stream.pending = None
+        self.matches += 1
+        return self.names[row], float(best)
@@ -0,0 +1,158 @@
+"""Structured, rate-limited logging written on a background thread.
+
+Detectors and actions used to print() from the frame loop, so a held scroll gesture cost
+a blocking console write per tick. They now call event_log.log(), which only checks a
+per-key rate limit and appends a LogRecord to a queue; a worker thread hands each record
+to every sink (console, a JSON-lines file, the GUI's status log), so they all see the
+same stream.
+
+A record repeated within `min_interval` of the last one with the same key is not queued
+but counted; the next record with that key carries the count (`suppressed`), and the
+per-key totals are kept in `suppressed_counts`. The key defaults to event + gesture.
+Pending records are flushed by flush() and at interpreter exit.
+"""
+import atexit
+import json
+import threading
+import time
+from collections import deque, namedtuple
+from typing import Callable, Dict, List, Optional
+
+LogRecord = namedtuple('LogRecord', [
+    'timestamp',   # time.time() when logged
+    'level',       # 'info', 'warning' or 'error'
+    'event',       # What happened: 'scroll_up', 'gesture_action', 'recording_stopped', ...
+    'message',     # Human-readable text
+    'gesture',     # Gesture name, if any
+    'hand_id',     # Hand track id, if any
+    'latency',     # Seconds, if the event measures one
+    'suppressed',  # Records with this key dropped by the rate limit since the previous one
+])
+
+
+def format_record(record: LogRecord, timestamp: bool = False) -> str:
+    """One line of text for a record: the message plus the fields that are set."""
+    details = []
+    if record.hand_id is not None:
+        details.append(f"hand {record.hand_id}")
+    if record.latency is not None:
+        details.append(f"{record.latency * 1000:.1f} ms")
+    if record.suppressed:
+        details.append(f"+{record.suppressed} similar")
+    text = f"{record.message} ({', '.join(details)})" if details else record.message
+    if timestamp:
+        text = f"[{time.strftime('%H:%M:%S', time.localtime(record.timestamp))}] {text}"
+    return text
+
+
+def console_sink(record: LogRecord):
+    print(format_record(record))
+
+
+class FileSink:
+    """Appends records to a file as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'a', buffering=1)  # Line buffered
+
+    def __call__(self, record: LogRecord):
+        self._file.write(json.dumps(record._asdict()) + '\n')
+
+    def close(self):
+        self._file.close()
+
+
+class EventLog:
+    """Queues records from any thread and writes them to the sinks on one worker thread."""
+
+    def __init__(self, min_interval: float = 1.0, max_queue: int = 1024, sinks: Optional[List[Callable]] = None,
+                 name: str = "EventLog", clock: Callable[[], float] = time.monotonic):
+        self.min_interval = min_interval  # Default per-key rate limit (seconds)
+        self.max_queue = max_queue
+        self.sinks = list(sinks) if sinks is not None else [console_sink]
+        self.name = name
+        self.clock = clock
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._thread = None
+        self._last: Dict[str, float] = {}  # Per-key time of the last queued record
+        self._pending_suppressed: Dict[str, int] = {}  # Per-key records dropped since the last queued one
+
+        # Statistics
+        self.logged = 0
+        self.written = 0
+        self.dropped = 0  # Rejected because the queue was full
+        self.suppressed_counts: Dict[str, int] = {}  # Per-key total of rate-limited records
+        atexit.register(self.flush, 2.0)
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._worker, name=self.name, daemon=True)
+        self._thread.start()
+
+    def log(self, event: str, message: str, gesture: Optional[str] = None, hand_id=None,
+            latency: Optional[float] = None, level: str = 'info', key: Optional[str] = None,
+            min_interval: Optional[float] = None) -> bool:
+        """Queue a record without blocking. Returns False if it was rate-limited or dropped."""
+        if key is None:
+            key = event if gesture is None else f"{event}:{gesture}"
+        interval = self.min_interval if min_interval is None else min_interval
+        now = self.clock()
+        with self._cond:
+            if interval and now - self._last.get(key, -interval) < interval:
+                self._pending_suppressed[key] = self._pending_suppressed.get(key, 0) + 1
+                self.suppressed_counts[key] = self.suppressed_counts.get(key, 0) + 1
+                return False
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                return False
+            self._last[key] = now
+            suppressed = self._pending_suppressed.pop(key, 0)
+            self._queue.append(LogRecord(time.time(), level, event, message, gesture, hand_id, latency, suppressed))
+            self.logged += 1
+            if self._thread is None:
+                self._start()
+            self._cond.notify()
+        return True
+
+    def error(self, event: str, message: str, **fields) -> bool:
+        """log() at level 'error'; errors are rate-limited like everything else."""
+        return self.log(event, message, level='error', **fields)
+
+    def add_sink(self, sink: Callable[[LogRecord], None]):
+        self.sinks = self.sinks + [sink]  # Copy on write: the worker iterates without a lock
+
+    def remove_sink(self, sink: Callable[[LogRecord], None]):
+        self.sinks = [s for s in self.sinks if s is not sink]
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                record = self._queue.popleft()
+                self._busy = True
+            for sink in self.sinks:
+                try:
+                    sink(record)
+                except Exception as e:  # A failing sink must not take the others down
+                    print(f"Log sink error: {e}")
+            with self._cond:
+                self.written += 1
+                self._busy = False
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued record has been written. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+
+event_log = EventLog()  # Process-wide log used by the detectors, the mapper and the GUI
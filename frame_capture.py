@@ -0,0 +1,167 @@
+import threading
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+class FrameGrabber:
+    """Reads frames on a background thread into a small latest-frame-wins ring buffer.
+
+    The vision loop calls read() exactly like cv2.VideoCapture.read(), but always gets
+    the freshest frame. Frames the loop was too slow to consume are dropped, never queued.
+    """
+
+    def __init__(self, source, buffer_size: int = 2, max_fps: Optional[float] = None):
+        # source can be a device index / video path (opened with cv2), anything with a
+        # cv2-style read() -> (success, frame), or an iterable/generator of frames.
+        self._owns_source = False
+        if isinstance(source, (int, str)):
+            import cv2  # Only needed when we open the device ourselves
+            source = cv2.VideoCapture(source)
+            self._owns_source = True
+
+        if hasattr(source, 'set'):
+            try:
+                import cv2
+                source.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Keep the driver-side queue short too
+            except Exception:
+                pass  # Not every backend supports it
+
+        self.source = source
+        self.buffer_size = max(1, int(buffer_size))
+        self.max_fps = max_fps  # Optional pacing, useful for replaying video files at real time
+
+        self._slots = [None] * self.buffer_size      # Frame ring
+        self._slot_times = [0.0] * self.buffer_size  # Capture timestamps (time.perf_counter)
+        self._write_seq = 0   # Number of frames written so far
+        self._read_seq = 0    # Sequence number of the last frame handed out
+        self._exhausted = False
+        self._running = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+        # Statistics
+        self.frames_captured = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self.last_timestamp = 0.0  # Capture time of the frame returned by the last read()
+        self.last_index = -1       # Capture index of the frame returned by the last read()
+
+    def start(self):
+        """Start the capture thread. Returns self so it can be chained."""
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="FrameGrabber", daemon=True)
+        self._thread.start()
+        return self
+
+    def _next_frame(self, frame_iter):
+        if frame_iter is not None:
+            try:
+                return True, next(frame_iter)
+            except StopIteration:
+                return False, None
+        return self.source.read()
+
+    def _capture_loop(self):
+        frame_iter = None
+        if not hasattr(self.source, 'read'):
+            frame_iter = iter(self.source)
+
+        frame_interval = 1.0 / self.max_fps if self.max_fps else 0.0
+        next_due = time.perf_counter()
+
+        while self._running:
+            success, frame = self._next_frame(frame_iter)
+            if not success or frame is None:
+                break
+
+            now = time.perf_counter()
+            with self._cond:
+                slot = self._write_seq % self.buffer_size
+                self._slots[slot] = frame
+                self._slot_times[slot] = now
+                self._write_seq += 1
+                self.frames_captured += 1
+                self._cond.notify_all()
+
+            if frame_interval:
+                next_due += frame_interval
+                delay = next_due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_due = time.perf_counter()  # Fell behind, don't try to catch up
+
+        with self._cond:
+            self._exhausted = True
+            self._cond.notify_all()
+
+    def read(self, timeout: Optional[float] = None):
+        """Return (success, frame) for the newest frame not yet returned.
+
+        Blocks until a new frame arrives. success is False once the source is exhausted
+        (or when timeout expires without a new frame).
+        """
+        with self._cond:
+            deadline = None if timeout is None else time.perf_counter() + timeout
+            while self._write_seq == self._read_seq:
+                if self._exhausted or not self._running:
+                    return False, None
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return False, None
+                self._cond.wait(remaining)
+
+            latest = self._write_seq - 1
+            self.frames_dropped += latest - self._read_seq  # Frames overwritten/skipped since last read
+            self._read_seq = self._write_seq
+            slot = latest % self.buffer_size
+            frame = self._slots[slot]
+            self.last_timestamp = self._slot_times[slot]
+            self.last_index = latest
+            self.frames_delivered += 1
+            return True, frame
+
+    def isOpened(self) -> bool:
+        """cv2.VideoCapture-compatible check used by the apps."""
+        if hasattr(self.source, 'isOpened') and not self.source.isOpened():
+            return False
+        return not self._exhausted
+
+    def stop(self):
+        """Stop the capture thread (and release the source if we opened it)."""
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        if self._owns_source and hasattr(self.source, 'release'):
+            self.source.release()
+
+    def release(self):
+        """Alias for stop() so the grabber can stand in for cv2.VideoCapture."""
+        self.stop()
+
+
+def synthetic_frames(width: int = 640, height: int = 480, count: Optional[int] = None,
+                     fps: Optional[float] = None) -> Iterable[np.ndarray]:
+    """Generate moving-gradient BGR frames, for benchmarking capture without a camera."""
+    base = np.tile(np.arange(width, dtype=np.uint8), (height, 1))
+    frame_interval = 1.0 / fps if fps else 0.0
+    next_due = time.perf_counter()
+    i = 0
+    while count is None or i < count:
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[:, :, 0] = base + np.uint8(i % 256)  # uint8 arithmetic wraps, which is what we want here
+        frame[:, :, 1] = base
+        frame[:, :, 2] = i % 256
+        yield frame
+        i += 1
+        if frame_interval:
+            next_due += frame_interval
+            delay = next_due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
@@ -2,9 +2,14 @@ import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import threading
 import time
+import queue
 from controller import Controller
+from event_log import event_log, format_record
 
 class GestureMapperGUI:
+    CHANGE_POLL_MS = 100 # How often the mapper's change queue is checked; an empty check costs next to nothing
+    METRICS_POLL_MS = 500 # Performance tab refresh: each refresh summarizes the frames since the last one
+
     def __init__(self, root):
         self.root = root
         self.root.title("Hand Gesture Mapper")
@@ -22,8 +27,25 @@ class GestureMapperGUI:
         self.recording_gesture_name = ""
         self.recording_start_time = 0
         
+        # The widgets follow the mapper through its change queue: only what changed is redrawn,
+        # and the mapper's dicts are never iterated here while the vision thread edits them
+        self.mapper = Controller.get_gesture_mapper()
+        self.changes = self.mapper.subscribe()
+        self.seen_version = -1
+        self.gesture_names = [] # Gesture combo values
+        self.action_names = [] # Action combo values, in actions text order
+        self.mapping_rows = [] # Gesture of each mappings listbox row
+        self.mapping_actions = {} # Action of each mapped gesture
+        self.outdated_gestures = set() # Templates recorded with an older signature (see GestureMapper.outdated_templates)
+        # The status log shows the same record stream as the console and the log file
+        self.log_records = queue.SimpleQueue()
+        self.log_sink = self.log_records.put # Kept so the same object can be removed again
+        event_log.add_sink(self.log_sink)
+        
         self.create_widgets()
         self.update_displays()
+        self.root.after(self.CHANGE_POLL_MS, self.poll_changes)
+        self.root.after(self.METRICS_POLL_MS, self.poll_metrics)
     
     def create_widgets(self):
         # Main title
@@ -47,6 +69,9 @@ class GestureMapperGUI:
         
         # Status Tab
         self.create_status_tab(notebook)
+        
+        # Performance Tab
+        self.create_performance_tab(notebook)
     
     def create_recording_tab(self, notebook):
         recording_frame = ttk.Frame(notebook, style='TFrame')
@@ -68,6 +93,12 @@ class GestureMapperGUI:
         self.gesture_name_entry = tk.Entry(name_frame, width=20, font=('Arial', 12))
         self.gesture_name_entry.pack(side=tk.LEFT, padx=5)
         
+        # Moving gestures (swipe, circle, wave) are recorded as a motion instead of a held pose
+        self.dynamic_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(recording_frame, text="Moving gesture (swipe, circle, wave)", variable=self.dynamic_var,
+                       bg='#2b2b2b', fg='white', selectcolor='#2b2b2b',
+                       activebackground='#2b2b2b', activeforeground='white').pack(pady=2)
+        
         # Recording buttons
         button_frame = tk.Frame(recording_frame, bg='#2b2b2b')
         button_frame.pack(pady=10)
@@ -100,6 +131,7 @@ Recording Instructions:
 3. Hold your hand in the desired gesture position
 4. Keep the gesture steady for 2-3 seconds
 5. Click 'Stop Recording' when done
+   (Moving gesture: perform the motion once, then stop)
 
 Tips:
 - Make sure your hand is clearly visible
@@ -227,24 +259,57 @@ Tips:
         
         self.log_message("Gesture Mapper GUI initialized")
     
+    def create_performance_tab(self, notebook):
+        performance_frame = ttk.Frame(notebook, style='TFrame')
+        notebook.add(performance_frame, text="Performance")
+        
+        performance_label = tk.Label(performance_frame, text="Live Performance", 
+                                    font=('Arial', 14, 'bold'), 
+                                    bg='#2b2b2b', fg='white')
+        performance_label.pack(pady=10)
+        
+        # One row per metric: name on the left, value on the right
+        metrics_frame = tk.Frame(performance_frame, bg='#2b2b2b')
+        metrics_frame.pack(pady=5, padx=20, fill=tk.X)
+        self.metric_labels = {}
+        rows = (('fps', "Processed FPS"), ('capture_fps', "Capture FPS"), ('inference', "Inference latency"),
+                ('decision', "Decision latency"), ('queue_depth', "Action queue depth"),
+                ('dropped', "Dropped frames"))
+        for row, (key, text) in enumerate(rows):
+            tk.Label(metrics_frame, text=text, font=('Arial', 11), 
+                     bg='#2b2b2b', fg='white').grid(row=row, column=0, sticky=tk.W, pady=2)
+            self.metric_labels[key] = tk.Label(metrics_frame, text="-", font=('Consolas', 11), 
+                                               bg='#2b2b2b', fg='#00ff00')
+            self.metric_labels[key].grid(row=row, column=1, sticky=tk.W, padx=20, pady=2)
+        
+        scores_label = tk.Label(performance_frame, text="Gesture Match Scores (peak per refresh)", 
+                               font=('Arial', 12, 'bold'), 
+                               bg='#2b2b2b', fg='white')
+        scores_label.pack(pady=(20, 5))
+        
+        self.scores_listbox = tk.Listbox(performance_frame, 
+                                        bg='#3b3b3b', fg='white',
+                                        font=('Consolas', 10))
+        self.scores_listbox.pack(pady=5, padx=20, fill=tk.BOTH, expand=True)
+    
     def start_recording(self):
         gesture_name = self.gesture_name_entry.get().strip()
         if not gesture_name:
             messagebox.showwarning("Warning", "Please enter a gesture name!")
             return
         
+        if not Controller.start_gesture_recording(gesture_name, self.dynamic_var.get()):
+            messagebox.showwarning("Warning", "Gesture name is too long! Please choose a shorter name.")
+            return
+        
         self.recording = True
         self.recording_gesture_name = gesture_name
         self.recording_start_time = time.time()
         
-        Controller.start_gesture_recording(gesture_name)
-        
         self.record_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self.recording_status.config(text=f"Recording '{gesture_name}'...", fg='red')
         
-        self.log_message(f"Started recording gesture: {gesture_name}")
-        
         # Start recording timer
         self.update_recording_timer()
     
@@ -258,15 +323,13 @@ Tips:
             
             if success:
                 self.recording_status.config(text=f"Successfully recorded '{self.recording_gesture_name}'", fg='green')
-                self.log_message(f"Successfully recorded gesture: {self.recording_gesture_name}")
                 messagebox.showinfo("Success", f"Gesture '{self.recording_gesture_name}' recorded successfully!")
             else:
                 self.recording_status.config(text="Recording failed - try again", fg='red')
-                self.log_message(f"Failed to record gesture: {self.recording_gesture_name}")
                 messagebox.showerror("Error", "Recording failed. Please try again.")
             
             self.gesture_name_entry.delete(0, tk.END)
-            self.update_displays()
+            self.apply_changes()
     
     def update_recording_timer(self):
         if self.recording:
@@ -283,11 +346,9 @@ Tips:
             return
         
         if Controller.map_gesture_to_action(gesture, action):
-            self.log_message(f"Mapped gesture '{gesture}' to action '{action}'")
+            self.apply_changes()
             messagebox.showinfo("Success", f"Mapped '{gesture}' to '{action}'")
-            self.update_displays()
         else:
-            self.log_message(f"Failed to map gesture '{gesture}' to action '{action}'")
             messagebox.showerror("Error", "Failed to create mapping!")
     
     def remove_mapping(self):
@@ -300,33 +361,152 @@ Tips:
         gesture_name = mapping_text.split(" -> ")[0]
         
         if Controller.remove_gesture_mapping(gesture_name):
-            self.log_message(f"Removed mapping for gesture '{gesture_name}'")
+            self.apply_changes()
             messagebox.showinfo("Success", f"Removed mapping for '{gesture_name}'")
-            self.update_displays()
         else:
             messagebox.showerror("Error", "Failed to remove mapping!")
     
-    def update_displays(self):
+    def update_displays(self, snapshot=None):
+        """Full refresh of every display (at start and after bulk changes such as a config import)."""
+        if snapshot is None:
+            self.seen_version = self.mapper.version
+            snapshot = self.mapper.snapshot()
+        
         # Update gesture combo
-        gestures = list(Controller.get_gesture_mapper().gesture_templates.keys())
-        self.gesture_combo['values'] = gestures
+        self.gesture_names = snapshot['gestures'] + snapshot['dynamic_gestures']
+        self.gesture_combo['values'] = self.gesture_names
         
         # Update action combo
-        actions = Controller.get_available_actions()
-        self.action_combo['values'] = actions
+        self.action_names = snapshot['actions']
+        self.action_combo['values'] = self.action_names
         
         # Update mappings listbox
         self.mappings_listbox.delete(0, tk.END)
-        mappings = Controller.get_mapped_gestures()
-        for gesture, action in mappings.items():
-            self.mappings_listbox.insert(tk.END, f"{gesture} -> {action}")
+        self.mapping_rows = list(snapshot['mappings'])
+        self.mapping_actions = dict(snapshot['mappings'])
+        self.outdated_gestures = set(snapshot['outdated'])
+        for gesture, action in snapshot['mappings'].items():
+            self.mappings_listbox.insert(tk.END, self.mapping_text(gesture, action))
+        self.show_outdated()
         
         # Update actions text
         self.actions_text.delete(1.0, tk.END)
         self.actions_text.insert(tk.END, "Available Actions:\n\n")
-        for i, action in enumerate(actions, 1):
-            description = self.get_action_description(action)
-            self.actions_text.insert(tk.END, f"{i:2d}. {action}\n    {description}\n\n")
+        for i, action in enumerate(self.action_names, 1):
+            self.append_action_text(i, action)
+    
+    def mapping_text(self, gesture, action):
+        text = f"{gesture} -> {action}"
+        if gesture in self.outdated_gestures:
+            text += "   (old recording: record again)"
+        return text
+    
+    def show_outdated(self):
+        if self.outdated_gestures:
+            self.log_message(f"Recorded with an older version, please record again: {', '.join(sorted(self.outdated_gestures))}")
+    
+    def append_action_text(self, number, action):
+        description = self.get_action_description(action)
+        self.actions_text.insert(tk.END, f"{number:2d}. {action}\n    {description}\n\n")
+    
+    def poll_changes(self):
+        self.apply_changes()
+        self.show_log_records()
+        self.root.after(self.CHANGE_POLL_MS, self.poll_changes)
+    
+    def apply_changes(self):
+        """Apply the mapper changes queued since the last call; nothing is redrawn when there are none."""
+        if self.mapper.version == self.seen_version:
+            return
+        gestures_changed = actions_changed = False
+        while True:
+            try:
+                change = self.changes.get_nowait()
+            except queue.Empty:
+                break
+            self.seen_version = change.version
+            kind, name = change.kind, change.name
+            if kind == 'reset':
+                self.update_displays(change.value)
+                gestures_changed = actions_changed = False
+            elif kind == 'gesture_added':
+                if name not in self.gesture_names:
+                    self.gesture_names.append(name)
+                    gestures_changed = True
+            elif kind == 'mapping_set':
+                self.mapping_actions[name] = change.value
+                text = self.mapping_text(name, change.value)
+                if name in self.mapping_rows:
+                    row = self.mapping_rows.index(name)
+                    self.mappings_listbox.delete(row)
+                    self.mappings_listbox.insert(row, text)
+                else:
+                    self.mapping_rows.append(name)
+                    self.mappings_listbox.insert(tk.END, text)
+            elif kind == 'mapping_removed':
+                if name in self.mapping_rows:
+                    row = self.mapping_rows.index(name)
+                    del self.mapping_rows[row]
+                    self.mapping_actions.pop(name, None)
+                    self.mappings_listbox.delete(row)
+            elif kind == 'outdated':
+                changed = self.outdated_gestures.symmetric_difference(change.value)
+                self.outdated_gestures = set(change.value)
+                for row, gesture in enumerate(self.mapping_rows):
+                    if gesture in changed:
+                        self.mappings_listbox.delete(row)
+                        self.mappings_listbox.insert(row, self.mapping_text(gesture, self.mapping_actions[gesture]))
+                self.show_outdated()
+            elif kind == 'action_added':
+                if name not in self.action_names:
+                    self.action_names.append(name)
+                    self.append_action_text(len(self.action_names), name)
+                    actions_changed = True
+        
+        if gestures_changed:
+            self.gesture_combo['values'] = self.gesture_names
+        if actions_changed:
+            self.action_combo['values'] = self.action_names
+    
+    def poll_metrics(self):
+        self.update_metrics()
+        self.root.after(self.METRICS_POLL_MS, self.poll_metrics)
+    
+    def update_metrics(self):
+        """Show a summary of the frames recorded since the last refresh (nothing to do without a vision loop)."""
+        metrics = Controller.get_metrics()
+        summary = metrics.drain() if metrics is not None else None
+        if summary is None:
+            return
+        labels = self.metric_labels
+        labels['fps'].config(text=f"{summary.fps:.1f}")
+        labels['capture_fps'].config(text=f"{summary.capture_fps:.1f}")
+        if summary.inference_ms == summary.inference_ms: # Not NaN: some frames ran inference
+            labels['inference'].config(text=f"{summary.inference_ms:.1f} ms (p95 {summary.inference_p95_ms:.1f} ms)")
+        labels['decision'].config(text=f"{summary.decision_ms:.2f} ms (p95 {summary.decision_p95_ms:.2f} ms)")
+        labels['queue_depth'].config(text=f"{summary.queue_depth}")
+        labels['dropped'].config(text=f"{summary.dropped} ({summary.dropped_total} total)")
+        
+        self.scores_listbox.delete(0, tk.END)
+        for name, score in sorted(summary.scores.items(), key=lambda item: -item[1]):
+            self.scores_listbox.insert(tk.END, f"{score:6.3f}  {name}")
+    
+    def show_log_records(self):
+        """Append the log records written since the last poll to the status log."""
+        if self.log_records.empty():
+            return
+        while True:
+            try:
+                record = self.log_records.get_nowait()
+            except queue.Empty:
+                break
+            self.status_text.insert(tk.END, format_record(record, timestamp=True) + "\n")
+        self.status_text.see(tk.END)
+    
+    def close(self):
+        """Stop following the mapper and the log (call when the window goes away)."""
+        self.mapper.unsubscribe(self.changes)
+        event_log.remove_sink(self.log_sink)
     
     def get_action_description(self, action):
         descriptions = {
@@ -368,15 +548,11 @@ Tips:
 
 def run_gui():
     root = tk.Tk()
-    app = GestureMapperGUI(root)
-    
-    # Update displays every 2 seconds
-    def periodic_update():
-        app.update_displays()
-        root.after(2000, periodic_update)
-    
-    periodic_update()
-    root.mainloop()
+    app = GestureMapperGUI(root) # Displays follow the mapper's change queue
+    try:
+        root.mainloop()
+    finally:
+        app.close()
 
 if __name__ == "__main__":
     run_gui()
@@ -2,9 +2,31 @@ import json
 import os
 import sys # Added for sys.platform
 from typing import Dict, List, Callable, Any
-import pyautogui
 import subprocess
+import threading
 import time
+import queue
+from collections import namedtuple
+import numpy as np
+from landmark_array import analyze_hand, as_landmark_array, signature_distances
+from hand_features import hand_features, NUM_FEATURES
+from template_matcher import TemplateMatcher, signature_similarity
+from template_store import NAME_BYTES, TemplateStore, store_path_for
+from dynamic_gestures import DynamicGestureMatcher, motion_feature, trim_idle
+from config_persistence import DebouncedWriter, atomic_write_json
+from input_backend import PyAutoGUIBackend
+from tracing import tracer
+from event_log import event_log
+
+# One change to gestures, mappings or actions, as delivered to subscribers (e.g. the GUI):
+#   'gesture_added'                   name: gesture; value: 'static' or 'dynamic'
+#   'mapping_set' / 'mapping_removed' name: gesture; value: action name
+#   'action_added'                    name: action
+#   'outdated'                        value: templates recorded with an older signature (outdated_templates)
+#   'reset'                           value: snapshot() after a bulk change (load, import)
+GestureChange = namedtuple('GestureChange', ['version', 'kind', 'name', 'value'])
+
+LEGACY_NUM_FEATURES = 2 # Distances in a signature recorded before hand_features (see get_legacy_signature)
 
 # Attempt to import pycaw for Windows volume control
 try:
@@ -14,55 +36,117 @@ except ImportError:
     can_control_volume_pycaw = False
 
 class GestureMapper:
-    def __init__(self, config_file="gesture_config.json"):
+    def __init__(self, config_file="gesture_config.json", executor=None, backend=None, save_delay=0.5):
         self.config_file = config_file
+        self.template_store_file = store_path_for(config_file) # Binary template store next to the config
+        # Config saves are written behind on a background thread; save_delay=None saves synchronously
+        self.config_writer = None
+        if save_delay is not None:
+            self.config_writer = DebouncedWriter(config_file, self._config_snapshot, delay=save_delay)
+        self.backend = backend if backend is not None else PyAutoGUIBackend() # InputBackend for all actions
+        self.executor = executor # Optional ActionExecutor; actions run synchronously without one
+        # Per-action rate limits (seconds) applied when dispatching through the executor
+        self.action_min_intervals = {"screenshot": 2.0, "volume_up": 0.3, "volume_down": 0.3}
         self.gesture_mapping = {}
         self.custom_actions = {}
         self.recording_mode = False
         self.recorded_gesture = [] # Stores signatures of the gesture being recorded
         self.current_gesture_name = "" # Name of the gesture being recorded
-        self.gesture_templates = {}
+        self.recording_dynamic = False # Recording a moving gesture (motion sequence) instead of a pose
+        self._recording_centroid = None # Palm centroid of the previous recorded frame
+        self.gesture_templates = {} # TemplateStore once the config is loaded; behaves like a dict
+        # Packed copy of gesture_templates for matching; templates with another feature layout are left out
+        self.template_matcher = TemplateMatcher(num_features=NUM_FEATURES)
+        # Templates recorded with the older two-distance signature, matched with that signature until re-recorded
+        self.legacy_matcher = TemplateMatcher(num_features=LEGACY_NUM_FEATURES)
+        self.outdated = [] # Templates the last compile found in an older layout (see outdated_templates)
+        # Change notification: version counts changes; each subscriber gets its own queue of GestureChange
+        self.version = 0
+        self._subscribers = []
+        self._change_lock = threading.Lock()
+        self.dynamic_gestures = {} # Moving gestures: name -> list of motion feature rows (see dynamic_gestures.py)
+        self.dynamic_matcher = DynamicGestureMatcher()
+        self.min_dynamic_frames = 8 # Shortest moving gesture (after trimming idle frames) that is accepted
+        self.metrics = None # Optional metrics.MetricsRing that receives per-gesture match scores
         self.load_config()
         self.setup_default_actions()
 
+    def subscribe(self) -> queue.SimpleQueue:
+        """Queue that receives a GestureChange for every later change (drain it from any thread)."""
+        changes = queue.SimpleQueue()
+        with self._change_lock:
+            self._subscribers = self._subscribers + [changes]
+        return changes
+
+    def unsubscribe(self, changes: queue.SimpleQueue):
+        with self._change_lock:
+            self._subscribers = [q for q in self._subscribers if q is not changes]
+
+    def _notify(self, kind: str, name: str = None, value=None):
+        """Bump the version and queue the change for every subscriber."""
+        with self._change_lock:
+            self.version += 1
+            change = GestureChange(self.version, kind, name, value)
+            for changes in self._subscribers:
+                changes.put(change)
+
+    def _notify_reset(self):
+        if self._subscribers:
+            self._notify('reset', value=self.snapshot())
+        else:
+            self.version += 1
+
+    def snapshot(self) -> Dict:
+        """Copies of the gesture names, mappings and actions, for a full display refresh."""
+        return {
+            'gestures': list(self.gesture_templates.keys()), # Plain copies: safe to read on another thread
+            'dynamic_gestures': list(self.dynamic_gestures.keys()),
+            'mappings': dict(self.gesture_mapping),
+            'actions': list(self.custom_actions.keys()),
+            'outdated': list(self.outdated)
+        }
+
+    def set_input_backend(self, backend):
+        """Switch the InputBackend used by the actions (e.g. RecordingBackend for headless runs)."""
+        self.backend = backend
+
     def setup_default_actions(self):
         """Setup default available actions that can be mapped to gestures"""
+        # Actions look up self.backend when they run, so set_input_backend() applies to all of them
         self.custom_actions = {
-            "left_click": lambda: pyautogui.click(),
-            "right_click": lambda: pyautogui.rightClick(),
-            "double_click": lambda: pyautogui.doubleClick(),
-            "scroll_up": lambda: pyautogui.scroll(120),
-            "scroll_down": lambda: pyautogui.scroll(-120),
+            "left_click": lambda: self.backend.click(),
+            "right_click": lambda: self.backend.right_click(),
+            "double_click": lambda: self.backend.double_click(),
+            "scroll_up": lambda: self.backend.scroll(120),
+            "scroll_down": lambda: self.backend.scroll(-120),
             "zoom_in": lambda: self.zoom_action(True),
             "zoom_out": lambda: self.zoom_action(False),
-            "drag_start": lambda: pyautogui.mouseDown(button="left"), # Note: drag is usually continuous
-            "drag_end": lambda: pyautogui.mouseUp(button="left"),   # So might be better handled by built-in drag
-            "copy": lambda: pyautogui.hotkey('ctrl', 'c'),
-            "paste": lambda: pyautogui.hotkey('ctrl', 'v'),
-            "undo": lambda: pyautogui.hotkey('ctrl', 'z'),
-            "redo": lambda: pyautogui.hotkey('ctrl', 'y'),
-            "select_all": lambda: pyautogui.hotkey('ctrl', 'a'),
-            "new_tab": lambda: pyautogui.hotkey('ctrl', 't'),
-            "close_tab": lambda: pyautogui.hotkey('ctrl', 'w'),
-            "refresh": lambda: pyautogui.hotkey('f5'),
-            "alt_tab": lambda: pyautogui.hotkey('alt', 'tab'),
-            "minimize": lambda: pyautogui.hotkey('win', 'down'), # pyautogui.hotkey('win', 'm') also works
-            "maximize": lambda: pyautogui.hotkey('win', 'up'),
-            "screenshot": lambda: pyautogui.screenshot(f"screenshot_{time.strftime('%Y%m%d_%H%M%S')}.png"), # Saves with timestamp
+            "drag_start": lambda: self.backend.mouse_down(button="left"), # Note: drag is usually continuous
+            "drag_end": lambda: self.backend.mouse_up(button="left"),   # So might be better handled by built-in drag
+            "copy": lambda: self.backend.hotkey('ctrl', 'c'),
+            "paste": lambda: self.backend.hotkey('ctrl', 'v'),
+            "undo": lambda: self.backend.hotkey('ctrl', 'z'),
+            "redo": lambda: self.backend.hotkey('ctrl', 'y'),
+            "select_all": lambda: self.backend.hotkey('ctrl', 'a'),
+            "new_tab": lambda: self.backend.hotkey('ctrl', 't'),
+            "close_tab": lambda: self.backend.hotkey('ctrl', 'w'),
+            "refresh": lambda: self.backend.hotkey('f5'),
+            "alt_tab": lambda: self.backend.hotkey('alt', 'tab'),
+            "minimize": lambda: self.backend.hotkey('win', 'down'), # hotkey('win', 'm') also works
+            "maximize": lambda: self.backend.hotkey('win', 'up'),
+            "screenshot": lambda: self.backend.screenshot(f"screenshot_{time.strftime('%Y%m%d_%H%M%S')}.png"), # Saves with timestamp
             "volume_up": lambda: self.volume_control(True),
             "volume_down": lambda: self.volume_control(False),
-            "play_pause": lambda: pyautogui.hotkey('space'), # General media key
-            "next_track": lambda: pyautogui.hotkey('nexttrack'),
-            "prev_track": lambda: pyautogui.hotkey('prevtrack'),
-            # You can add more pyautogui.press('...') or pyautogui.hotkey('...') commands
+            "play_pause": lambda: self.backend.hotkey('space'), # General media key
+            "next_track": lambda: self.backend.hotkey('nexttrack'),
+            "prev_track": lambda: self.backend.hotkey('prevtrack'),
+            # You can add more self.backend.press('...') or self.backend.hotkey('...') commands
         }
 
     def zoom_action(self, zoom_in: bool):
         """Helper method for zoom actions"""
-        pyautogui.keyDown('ctrl')
-        pyautogui.scroll(200 if zoom_in else -200) # Increased scroll amount for noticeable zoom
-        pyautogui.keyUp('ctrl')
-        print(f"Zoom {'In' if zoom_in else 'Out'} executed")
+        self.backend.ctrl_scroll(200 if zoom_in else -200) # Increased scroll amount for noticeable zoom
+        event_log.log('zoom', f"Zoom {'In' if zoom_in else 'Out'} executed")
 
     def volume_control(self, increase: bool):
         """Helper method for cross-platform volume control."""
@@ -71,8 +155,8 @@ class GestureMapper:
                 if can_control_volume_pycaw:
                     sessions = AudioUtilities.GetAllSessions()
                     if not sessions:
-                        print("No audio sessions found to control volume.")
-                        pyautogui.press('volumeup' if increase else 'volumedown') # Fallback
+                        event_log.log('volume', "No audio sessions found to control volume.", level='warning')
+                        self.backend.press('volumeup' if increase else 'volumedown') # Fallback
                         return
                     for session in sessions:
                         if session.Process: # Check if session is valid
@@ -82,58 +166,159 @@ class GestureMapper:
                             new_volume = current_volume + (0.02 if increase else -0.02)
                             new_volume = max(0.0, min(1.0, new_volume)) # Clamp
                             volume.SetMasterVolume(new_volume, None)
-                    print(f"Volume {'increased' if increase else 'decreased'} by 2% using pycaw.")
+                    event_log.log('volume', f"Volume {'increased' if increase else 'decreased'} by 2% using pycaw.")
                 else:
-                    print("pycaw not found. Attempting pyautogui key press for volume.")
-                    pyautogui.press('volumeup' if increase else 'volumedown')
+                    event_log.log('volume', "pycaw not found. Attempting key press for volume.", level='warning')
+                    self.backend.press('volumeup' if increase else 'volumedown')
 
             elif sys.platform == "darwin":  # macOS
                 increment = 5 if increase else -5
                 subprocess.run(['osascript', '-e', f'set volume output volume (output volume of (get volume settings) + {increment})'])
-                print(f"Volume {'increased' if increase else 'decreased'} using osascript.")
+                event_log.log('volume', f"Volume {'increased' if increase else 'decreased'} using osascript.")
             else:  # Linux (assuming ALSA or PulseAudio common setups)
                 subprocess.run(['amixer', '-q', '-D', 'pulse', 'sset', 'Master', '2%+' if increase else '2%-'])
                 # Fallback or alternative for systems without 'pulse' as default for amixer:
                 # subprocess.run(['pactl', 'set-sink-volume', '@DEFAULT_SINK@', f'{"+" if increase else "-"}2%'])
-                print(f"Volume {'increased' if increase else 'decreased'} by 2% using amixer/pactl.")
+                event_log.log('volume', f"Volume {'increased' if increase else 'decreased'} by 2% using amixer/pactl.")
         except Exception as e:
-            print(f"Error controlling volume: {e}. Falling back to key presses.")
+            event_log.error('volume_error', f"Error controlling volume: {e}. Falling back to key presses.")
             try:
-                pyautogui.press('volumeup' if increase else 'volumedown')
+                self.backend.press('volumeup' if increase else 'volumedown')
             except Exception as e2:
-                print(f"Fallback volume key press also failed: {e2}")
+                event_log.error('volume_error', f"Fallback volume key press also failed: {e2}", key='volume_fallback')
 
     def load_config(self):
-        """Load gesture configuration from file"""
+        """Load gesture mappings from the config file and memory-map the template store"""
+        try:
+            self.gesture_templates = TemplateStore(self.template_store_file)
+        except Exception as e:
+            print(f"Error opening template store '{self.template_store_file}': {e}. Using an in-memory store.")
+            self.gesture_templates = {}
+        self.template_matcher.invalidate()
+        self.dynamic_gestures = {}
+        self.dynamic_matcher.invalidate()
+
         if os.path.exists(self.config_file):
             try:
                 with open(self.config_file, 'r') as f:
                     data = json.load(f)
                     self.gesture_mapping = data.get('gesture_mapping', {})
-                    self.gesture_templates = data.get('gesture_templates', {})
-                print(f"Loaded {len(self.gesture_mapping)} custom gesture mappings and {len(self.gesture_templates)} templates.")
+                    json_templates = data.get('gesture_templates', {})
+                    self.dynamic_gestures = data.get('dynamic_gestures', {})
+                if json_templates and not os.path.exists(self.template_store_file):
+                    # Older configs kept templates in the JSON; move them into the binary store once
+                    self.import_templates(json_templates)
+                    print(f"Imported {len(json_templates)} templates from '{self.config_file}' into '{self.template_store_file}'")
+                print(f"Loaded {len(self.gesture_mapping)} custom gesture mappings, {len(self.gesture_templates)} templates "
+                      f"and {len(self.dynamic_gestures)} moving gestures.")
+                self.report_outdated_templates()
             except Exception as e:
                 print(f"Error loading config '{self.config_file}': {e}. Using defaults.")
                 self.gesture_mapping = {}
-                self.gesture_templates = {}
                 self.create_default_config_if_empty() # Ensure some defaults if load fails
         else:
             print(f"Config file '{self.config_file}' not found. Creating default configuration.")
             self.create_default_config_if_empty()
+        self._notify_reset()
 
     def save_config(self):
-        """Save current gesture configuration to file"""
+        """Save gesture mappings to the config file (templates are saved by the template store as they change).
+
+        Only schedules the write when a config writer is in use; call flush_config() to force it.
+        """
+        if self.config_writer is not None:
+            self.config_writer.mark_dirty()
+            return
         try:
-            data = {
-                'gesture_mapping': self.gesture_mapping,
-                'gesture_templates': self.gesture_templates
-            }
-            with open(self.config_file, 'w') as f:
-                json.dump(data, f, indent=4)
+            atomic_write_json(self.config_file, self._config_snapshot())
             print(f"Gesture configuration saved to '{self.config_file}'")
         except Exception as e:
             print(f"Error saving config: {e}")
 
+    def flush_config(self):
+        """Write any pending config changes now."""
+        if self.config_writer is not None:
+            self.config_writer.flush()
+
+    def _config_snapshot(self) -> Dict:
+        return {
+            'gesture_mapping': dict(self.gesture_mapping), # Copy: the GUI thread may be editing it
+            'template_store': os.path.basename(self.template_store_file),
+            'dynamic_gestures': dict(self.dynamic_gestures)
+        }
+
+    def _compile_templates(self):
+        """Repack the templates after a change, and tell subscribers when the outdated ones change."""
+        if not self.template_matcher.dirty:
+            return
+        self.template_matcher.compile(self.gesture_templates)
+        self.legacy_matcher.compile(self.gesture_templates)
+        outdated = list(self.template_matcher.skipped)
+        if outdated != self.outdated:
+            self.outdated = outdated
+            self._notify('outdated', value=list(outdated))
+
+    def outdated_templates(self) -> List[str]:
+        """Templates recorded with an older signature layout.
+
+        Those with the two-distance layout are still matched (legacy_matcher), but only near
+        the camera distance they were recorded at; any other layout is not matched at all.
+        Recording them again fixes both.
+        """
+        self._compile_templates()
+        return list(self.outdated)
+
+    def report_outdated_templates(self):
+        outdated = self.outdated_templates()
+        legacy = set(self.legacy_matcher.names)
+        matched = [name for name in outdated if name in legacy]
+        unmatched = [name for name in outdated if name not in legacy]
+        if matched:
+            event_log.log('templates_outdated', f"{len(matched)} gesture templates were recorded with an older signature format "
+                          f"and only match near the camera distance they were recorded at. Record them again: "
+                          f"{', '.join(matched)}", level='warning', min_interval=0)
+        if unmatched:
+            event_log.log('templates_unreadable', f"{len(unmatched)} gesture templates have an unknown signature format and "
+                          f"are not matched until recorded again: {', '.join(unmatched)}", level='warning', min_interval=0)
+
+    def import_templates(self, templates: Dict[str, Dict]):
+        """Add or replace templates (gesture_templates-style dict)."""
+        if isinstance(self.gesture_templates, TemplateStore):
+            self.gesture_templates.import_templates(templates)
+        else:
+            self.gesture_templates.update(templates)
+        self.template_matcher.invalidate()
+        self._notify_reset()
+
+    def import_config(self, path: str):
+        """Import mappings and templates from a JSON config (gesture_config.json format)."""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        self.import_templates(data.get('gesture_templates', {}))
+        self.import_dynamic_gestures(data.get('dynamic_gestures', {}))
+        self.gesture_mapping.update(data.get('gesture_mapping', {}))
+        self.save_config()
+        self._notify_reset()
+        print(f"Imported {len(data.get('gesture_templates', {}))} templates, {len(data.get('dynamic_gestures', {}))} moving "
+              f"gestures and {len(data.get('gesture_mapping', {}))} mappings from '{path}'")
+
+    def export_config(self, path: str):
+        """Export mappings and all templates as one JSON file (gesture_config.json format)."""
+        data = {
+            'gesture_mapping': self.gesture_mapping,
+            'gesture_templates': dict(self.gesture_templates.items()),
+            'dynamic_gestures': self.dynamic_gestures
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=4)
+        print(f"Exported {len(self.gesture_templates)} templates and {len(self.dynamic_gestures)} moving gestures to '{path}'")
+
+    def import_dynamic_gestures(self, gestures: Dict[str, List]):
+        """Add or replace moving gestures (name -> list of motion feature rows)."""
+        self.dynamic_gestures.update({name: [list(map(float, row)) for row in rows] for name, rows in gestures.items()})
+        self.dynamic_matcher.invalidate()
+        self._notify_reset()
+
     def create_default_config_if_empty(self):
         """Create default gesture mappings if current config is empty or file not found."""
         if not self.gesture_mapping and not self.gesture_templates: # Only if both are empty
@@ -153,83 +338,125 @@ class GestureMapper:
 
     def get_gesture_signature(self, hand_landmarks):
         """Generate a signature for the current hand gesture based on landmark data."""
-        if not hand_landmarks:
+        if hand_landmarks is None:
             return None
 
-        landmarks = hand_landmarks.landmark
-        signature = {'fingers_up': [False] * 5, 'finger_distances': []}
-
-        # Finger tip indices and their corresponding PIP (Proximal Interphalangeal) joint indices
-        # For thumb, use TIP and IP (Interphalangeal)
-        tip_indices = [4, 8, 12, 16, 20]  # Thumb, Index, Middle, Ring, Little
-        pip_indices = [3, 6, 10, 14, 18]  # Thumb IP, Index PIP, Middle PIP, Ring PIP, Little PIP
-        mcp_indices = [2, 5, 9, 13, 17]  # MCP joints (base of fingers)
-
-        # Determine which fingers are "up"
-        # Thumb: Compare Y-coordinate of tip to IP and MCP
-        if landmarks[tip_indices[0]].y < landmarks[pip_indices[0]].y and \
-           landmarks[tip_indices[0]].y < landmarks[mcp_indices[0]].y:
-            signature['fingers_up'][0] = True # Thumb up
-
-        # Other fingers: Compare Y-coordinate of tip to PIP
-        for i in range(1, 5):
-            if landmarks[tip_indices[i]].y < landmarks[pip_indices[i]].y and \
-               landmarks[tip_indices[i]].y < landmarks[mcp_indices[i]].y:
-                signature['fingers_up'][i] = True
-
-        # Calculate normalized distances between key points (e.g., finger tips)
-        # Example: Distance between thumb tip and index finger tip
-        dist_thumb_index = ((landmarks[4].x - landmarks[8].x)**2 +
-                            (landmarks[4].y - landmarks[8].y)**2 +
-                            (landmarks[4].z - landmarks[8].z)**2)**0.5
-        signature['finger_distances'].append(dist_thumb_index)
-
-        # Example: Distance between index finger tip and middle finger tip
-        dist_index_middle = ((landmarks[8].x - landmarks[12].x)**2 +
-                             (landmarks[8].y - landmarks[12].y)**2 +
-                             (landmarks[8].z - landmarks[12].z)**2)**0.5
-        signature['finger_distances'].append(dist_index_middle)
-        
-        # Add more features as needed for robust gesture differentiation.
-        # e.g., distances to palm center, angles between fingers.
+        # Shared per-frame analysis; Controller.update_fingers_status usually computed it already
+        analysis = analyze_hand(hand_landmarks)
 
-        return signature
+        # Which fingers are "up": tip above both its PIP (IP for thumb) and MCP joints
+        # Distances: the scale- and rotation-invariant feature vector (tip-to-tip and tip-to-wrist
+        # distances in palm sizes, joint straightness; see hand_features.py)
+        return {
+            'fingers_up': list(analysis.fingers_extended),
+            'finger_distances': hand_features(hand_landmarks).vector.tolist()
+        }
 
-    def start_recording_gesture(self, gesture_name: str):
-        """Start recording a new gesture"""
+    def get_legacy_signature(self, hand_landmarks):
+        """Signature in the older layout (finger states, raw 3D thumb-index and index-middle tip distances),
+        for templates recorded before hand_features."""
+        return {
+            'fingers_up': list(analyze_hand(hand_landmarks).fingers_extended),
+            'finger_distances': signature_distances(as_landmark_array(hand_landmarks)).tolist()
+        }
+
+    def start_recording_gesture(self, gesture_name: str, dynamic: bool = False) -> bool:
+        """Start recording a new gesture; dynamic=True records a moving gesture (swipe, circle, wave).
+
+        Returns False (and records nothing) if the name does not fit the template store.
+        """
+        if not dynamic and len(gesture_name.encode('utf-8')) > NAME_BYTES:
+            event_log.log('recording_failed', f"Cannot record '{gesture_name}': gesture names are limited to {NAME_BYTES} "
+                          f"bytes. Choose a shorter name.", gesture=gesture_name, level='warning', min_interval=0)
+            return False
         self.recording_mode = True
+        self.recording_dynamic = dynamic
         self.recorded_gesture = [] # Clear previous recording data
+        self._recording_centroid = None
         self.current_gesture_name = gesture_name
-        print(f"Recording gesture: '{gesture_name}'. Hold gesture steady.")
+        if dynamic:
+            event_log.log('recording_started', f"Recording moving gesture: '{gesture_name}'. Perform the motion once, then stop.",
+                          gesture=gesture_name, min_interval=0)
+        else:
+            event_log.log('recording_started', f"Recording gesture: '{gesture_name}'. Hold gesture steady.",
+                          gesture=gesture_name, min_interval=0)
+        return True
 
     def record_gesture_frame(self, hand_landmarks):
-        """Record a frame (signature) of the gesture being recorded"""
-        if self.recording_mode and hand_landmarks:
+        """Record a frame (signature, or motion features for a moving gesture) of the gesture being recorded"""
+        if self.recording_mode and hand_landmarks is not None:
+            if self.recording_dynamic:
+                feature, self._recording_centroid = motion_feature(hand_landmarks, self._recording_centroid)
+                if feature is not None:
+                    self.recorded_gesture.append(feature.tolist())
+                return
             signature = self.get_gesture_signature(hand_landmarks)
             if signature:
                 self.recorded_gesture.append(signature)
 
     def stop_recording_gesture(self):
-        """Stop recording and save the gesture template if enough data is collected."""
-        self.recording_mode = False
+        """Stop recording and save the gesture template if enough data is collected.
+
+        recording_mode stays set until the template is stored: while it is, the vision
+        thread records instead of matching, so it never matches against a half-updated store.
+        """
+        try:
+            return self._store_recording()
+        finally:
+            self.recording_mode = False
+
+    def _store_recording(self) -> bool:
         if not self.current_gesture_name:
-            print("Recording stopped. No gesture name was set.")
+            event_log.log('recording_failed', "Recording stopped. No gesture name was set.", level='warning', min_interval=0)
             return False
+        if self.recording_dynamic:
+            return self._store_dynamic_recording()
 
-        if len(self.recorded_gesture) > 10:  # Need at least ~10 frames for a decent average
-            template = self.create_gesture_template(self.recorded_gesture)
+        frames = list(self.recorded_gesture) # The vision thread keeps appending until recording_mode is cleared
+        if len(frames) > 10:  # Need at least ~10 frames for a decent average
+            template = self.create_gesture_template(frames)
             self.gesture_templates[self.current_gesture_name] = template
+            self.template_matcher.invalidate()
             self.save_config()
-            print(f"Gesture '{self.current_gesture_name}' recorded successfully with {len(self.recorded_gesture)} frames.")
+            self._notify('gesture_added', self.current_gesture_name, 'static')
+            event_log.log('gesture_recorded', f"Gesture '{self.current_gesture_name}' recorded successfully with "
+                          f"{len(frames)} frames.", gesture=self.current_gesture_name, min_interval=0)
             self.recorded_gesture = []
             self.current_gesture_name = ""
             return True
         else:
-            print(f"Recording failed for '{self.current_gesture_name}'. Not enough data captured ({len(self.recorded_gesture)} frames). Try holding longer.")
+            event_log.log('recording_failed', f"Recording failed for '{self.current_gesture_name}'. Not enough data captured "
+                          f"({len(frames)} frames). Try holding longer.",
+                          gesture=self.current_gesture_name, level='warning', min_interval=0)
             self.recorded_gesture = []
             self.current_gesture_name = ""
             return False
 
+    def _store_dynamic_recording(self) -> bool:
+        """Trim the idle frames off a moving gesture recording and store it."""
+        recorded = list(self.recorded_gesture)
+        name, frames = self.current_gesture_name, len(recorded)
+        sequence = trim_idle(np.array(recorded).reshape(-1, 3))
+        self.recorded_gesture = []
+        self.current_gesture_name = ""
+        self.recording_dynamic = False
+        if len(sequence) < self.min_dynamic_frames:
+            event_log.log('recording_failed', f"Recording failed for '{name}'. Not enough motion captured "
+                          f"({len(sequence)} moving frames). Try a larger motion.", gesture=name, level='warning', min_interval=0)
+            return False
+        if len(sequence) > self.dynamic_matcher.max_length:
+            event_log.log('recording_failed', f"Recording failed for '{name}'. The motion is too long ({len(sequence)} frames, "
+                          f"at most {self.dynamic_matcher.max_length}). Try a shorter motion.",
+                          gesture=name, level='warning', min_interval=0)
+            return False
+        self.dynamic_gestures[name] = sequence.tolist()
+        self.dynamic_matcher.invalidate()
+        self.save_config()
+        self._notify('gesture_added', name, 'dynamic')
+        event_log.log('gesture_recorded', f"Moving gesture '{name}' recorded successfully with {len(sequence)} of {frames} frames.",
+                      gesture=name, min_interval=0)
+        return True
+
     def create_gesture_template(self, recorded_frames: List[Dict]) -> Dict:
         """Create an average gesture template from multiple recorded frames."""
         if not recorded_frames:
@@ -263,85 +490,118 @@ class GestureMapper:
 
     def match_gesture(self, hand_landmarks, tolerance=0.25): # Adjusted tolerance
         """Match current hand pose against recorded gesture templates."""
-        if not hand_landmarks or not self.gesture_templates:
+        if hand_landmarks is None or not self.gesture_templates:
             return None
 
+        t = tracer.now() if tracer.enabled else 0
         current_signature = self.get_gesture_signature(hand_landmarks)
         if not current_signature:
             return None
 
-        best_match = None
-        best_similarity = -1.0
-
-        for gesture_name, template in self.gesture_templates.items():
-            similarity = self.calculate_gesture_similarity(current_signature, template)
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_match = gesture_name
+        # Templates are scored against the packed matrix (rebuilt only on change). Only finger-mask
+        # buckets that can still beat the threshold are visited; same result as a full scan.
+        self._compile_templates()
+        best_match, best_similarity = self.template_matcher.best_match(current_signature, 1.0 - tolerance)
+        if self.legacy_matcher.names: # Outdated templates, scored on the signature they were recorded with
+            legacy_match, legacy_similarity = self.legacy_matcher.best_match(
+                self.get_legacy_signature(hand_landmarks), 1.0 - tolerance)
+            if legacy_similarity > best_similarity:
+                best_match, best_similarity = legacy_match, legacy_similarity
+        if t: tracer.lap('match_gesture', t)
 
         # Only return a match if similarity exceeds threshold
         return best_match if best_similarity > (1.0 - tolerance) else None
 
+    def match_gestures(self, hand_landmarks_list, tolerance=0.25) -> List:
+        """match_gesture() for every hand of a frame, scored in one batched matcher call."""
+        if not hand_landmarks_list:
+            return []
+        if not self.gesture_templates:
+            return [None] * len(hand_landmarks_list)
+        t = tracer.now() if tracer.enabled else 0
+        signatures = [self.get_gesture_signature(hand) for hand in hand_landmarks_list]
+        self._compile_templates()
+        present = [signature for signature in signatures if signature]
+        results = self.template_matcher.best_matches(present, 1.0 - tolerance)
+        if self.legacy_matcher.names: # Outdated templates, scored on the signature they were recorded with
+            legacy = self.legacy_matcher.best_matches(
+                [self.get_legacy_signature(hand) for hand, signature in zip(hand_landmarks_list, signatures) if signature],
+                1.0 - tolerance)
+            results = [old if old[1] > new[1] else new for new, old in zip(results, legacy)]
+        if t: tracer.lap('match_gestures', t)
+        if self.metrics is not None:
+            for name, similarity in results:
+                self.metrics.record_score(name, similarity)
+        matches = iter(results)
+        return [next(matches)[0] if signature else None for signature in signatures]
+
+    def match_dynamic_gestures(self, hand_landmarks_list, hand_ids) -> List:
+        """Feed one frame of every hand to the moving gesture matcher; per hand, the gesture that just completed or None."""
+        if not self.dynamic_gestures:
+            return [None] * len(hand_landmarks_list)
+        t = tracer.now() if tracer.enabled else 0
+        if self.dynamic_matcher.dirty:
+            self.dynamic_matcher.compile(self.dynamic_gestures)
+        matches = self.dynamic_matcher.update_streams(hand_landmarks_list, hand_ids)
+        if t: tracer.lap('match_dynamic_gestures', t)
+        if self.metrics is not None:
+            for match in matches:
+                if match:
+                    self.metrics.record_score(match[0], 1.0 - match[1]) # Relative DTW cost as a similarity
+        return [match[0] if match else None for match in matches]
+
     def calculate_gesture_similarity(self, signature1: Dict, signature2: Dict) -> float:
         """Calculate similarity between two gesture signatures."""
-        if not signature1 or not signature2:
-            return 0.0
-
-        # Compare finger states (up/down)
-        finger_match_score = sum(1 for a, b in zip(signature1['fingers_up'], signature2['fingers_up']) if a == b)
-        finger_score = finger_match_score / len(signature1['fingers_up'])
-
-        # Compare finger distances
-        distance_diffs = []
-        for d1, d2 in zip(signature1['finger_distances'], signature2['finger_distances']):
-            # Normalize difference relative to the distances
-            avg_dist = (d1 + d2) / 2
-            if avg_dist > 0:
-                diff = abs(d1 - d2) / avg_dist
-                distance_diffs.append(max(0, 1 - diff))
-            else:
-                distance_diffs.append(1.0 if d1 == d2 else 0.0)
-
-        distance_score = sum(distance_diffs) / len(distance_diffs) if distance_diffs else 1.0
-
-        # Weighted combination (can adjust weights based on importance)
-        finger_weight = 0.7  # Finger state is more important
-        distance_weight = 0.3 # Distances help differentiate similar poses
-        
-        return (finger_score * finger_weight) + (distance_score * distance_weight)
+        return signature_similarity(signature1, signature2)
 
     def map_gesture_to_action(self, gesture_name: str, action_name: str):
         """Map a gesture to an action."""
-        if gesture_name not in self.gesture_templates:
-            print(f"Error: Gesture '{gesture_name}' not found in templates. Record it first.")
+        if gesture_name not in self.gesture_templates and gesture_name not in self.dynamic_gestures:
+            event_log.error('mapping_failed', f"Error: Gesture '{gesture_name}' not found in templates. Record it first.",
+                            gesture=gesture_name, min_interval=0)
             return False
         
         if action_name not in self.custom_actions:
-            print(f"Error: Action '{action_name}' not found in available actions.")
+            event_log.error('mapping_failed', f"Error: Action '{action_name}' not found in available actions.",
+                            gesture=gesture_name, min_interval=0)
             return False
         
         self.gesture_mapping[gesture_name] = action_name
         self.save_config()
-        print(f"Mapped gesture '{gesture_name}' to action '{action_name}'")
+        self._notify('mapping_set', gesture_name, action_name)
+        event_log.log('mapping_set', f"Mapped gesture '{gesture_name}' to action '{action_name}'",
+                      gesture=gesture_name, min_interval=0)
         return True
 
-    def execute_gesture_action(self, gesture_name: str) -> bool:
-        """Execute the action mapped to a gesture."""
+    def execute_gesture_action(self, gesture_name: str, hand_id=None) -> bool:
+        """Execute the action mapped to a gesture (hand_id only goes into the log)."""
         if gesture_name not in self.gesture_mapping:
-            # print(f"No action mapped to gesture: {gesture_name}")
             return False
         
         action_name = self.gesture_mapping[gesture_name]
         if action_name not in self.custom_actions:
-            print(f"Error: Mapped action '{action_name}' not found!")
+            event_log.error('gesture_action_error', f"Error: Mapped action '{action_name}' not found!",
+                            gesture=gesture_name, hand_id=hand_id)
             return False
         
+        if self.executor is not None:
+            # Runs on the executor's worker thread (subprocess/screenshot calls never block tracking)
+            if self.executor.submit(action_name, self.custom_actions[action_name],
+                                    min_interval=self.action_min_intervals.get(action_name, 0.0)):
+                event_log.log('gesture_action', f"Dispatched action '{action_name}' for gesture '{gesture_name}'",
+                              gesture=gesture_name, hand_id=hand_id)
+                return True
+            return False
+
+        start = time.perf_counter()
         try:
             self.custom_actions[action_name]()
-            print(f"Executed action '{action_name}' for gesture '{gesture_name}'")
+            event_log.log('gesture_action', f"Executed action '{action_name}' for gesture '{gesture_name}'",
+                          gesture=gesture_name, hand_id=hand_id, latency=time.perf_counter() - start)
             return True
         except Exception as e:
-            print(f"Error executing action '{action_name}': {e}")
+            event_log.error('gesture_action_error', f"Error executing action '{action_name}': {e}",
+                            gesture=gesture_name, hand_id=hand_id)
             return False
 
     def get_available_actions(self) -> List[str]:
@@ -355,15 +615,19 @@ class GestureMapper:
     def remove_gesture_mapping(self, gesture_name: str) -> bool:
         """Remove a gesture-to-action mapping."""
         if gesture_name in self.gesture_mapping:
-            del self.gesture_mapping[gesture_name]
+            action_name = self.gesture_mapping.pop(gesture_name)
             self.save_config()
-            print(f"Removed mapping for gesture: {gesture_name}")
+            self._notify('mapping_removed', gesture_name, action_name)
+            event_log.log('mapping_removed', f"Removed mapping for gesture: {gesture_name}",
+                          gesture=gesture_name, min_interval=0)
             return True
         return False
 
     def add_custom_action(self, action_name: str, action_function: Callable[[], Any]):
         """Add a new custom action that can be mapped to gestures."""
         if action_name in self.custom_actions:
-            print(f"Warning: Overwriting existing action '{action_name}'")
+            event_log.log('action_added', f"Warning: Overwriting existing action '{action_name}'",
+                          level='warning', min_interval=0)
         self.custom_actions[action_name] = action_function
-        print(f"Added custom action: {action_name}")
\ No newline at end of file
+        self._notify('action_added', action_name)
+        event_log.log('action_added', f"Added custom action: {action_name}", min_interval=0)
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""Per-frame gesture decision logic shared by the live app and the trace replay engine.
+
+Takes whatever the hand tracker produced for one frame (landmarks per hand plus their
+handedness labels) and drives a ControllerEngine's built-in detectors and custom gestures.
+Landmarks may be MediaPipe landmark lists or (21, 3) arrays.
+
+process_hands() optionally takes a stage timer (anything with now() and
+lap(stage, start) -> now, see benchmarks/pipeline.py) to time each detector. Without one,
+the stages are recorded as spans when the process-wide tracer (tracing.py) is enabled.
+
+Frames whose landmarks were predicted rather than detected (inferred=False, see
+inference_scheduler.py) only move the cursor, scroll and zoom; clicks, drags and
+custom gestures wait for a real detection.
+
+Custom gestures of all hands are matched in one batched call, with hold/cooldown state
+kept per hand id, so two hands never reset each other's hold timers. Hand ids and the
+primary hand (which drives the cursor, clicks and drags) come from hand_tracker.py, so
+they stay put when MediaPipe's handedness label flickers.
+"""
+from typing import List, Optional, Sequence
+
+from controller import Controller, ControllerEngine
+from tracing import tracer
+
+
+def handedness_labels(multi_handedness) -> List[str]:
+    """'Left'/'Right' label per hand from MediaPipe's results.multi_handedness."""
+    if not multi_handedness:
+        return []
+    return [info.classification[0].label for info in multi_handedness]
+
+
+def select_primary_hand(num_hands: int, labels: Sequence[str]) -> int:
+    """Index of the primary hand: the first 'Right' hand if any, else the first one."""
+    for i, label in enumerate(labels[:num_hands]):
+        if label == 'Right':
+            return i
+    return 0
+
+
+def process_hands(hand_landmarks_list: Optional[Sequence], labels: Sequence[str] = (), timer=None,
+                  inferred: bool = True, hand_ids: Optional[Sequence] = None,
+                  controller: Optional[ControllerEngine] = None):
+    """Run built-in and custom gesture detection for one frame. Returns the primary hand (or None).
+
+    Drives the given ControllerEngine, or Controller's default one. Hand ids and the
+    primary hand come from its HandTracker unless hand_ids are given, in which case the
+    primary hand is picked from the labels alone.
+    """
+    if controller is None:
+        controller = Controller.default()
+    if timer is None and tracer.enabled:
+        timer = tracer
+    t = timer.now() if timer else 0
+    if hand_ids is None:
+        tracked = controller.get_hand_tracker().update(hand_landmarks_list, labels)
+        hand_ids, primary_index = tracked.ids, tracked.primary
+        if tracked.primary_changed and hand_landmarks_list:
+            # Built-in state belongs to the previous primary hand
+            controller.release_drag("primary hand changed")
+            controller.cursor_filter.reset() # Start from the new hand instead of gliding over from the old one
+    else:
+        primary_index = select_primary_hand(len(hand_landmarks_list or ()), labels)
+    if timer: t = timer.lap('track_hands', t)
+
+    if not hand_landmarks_list:
+        # No hands detected, clear primary hand landmarks for Controller
+        controller.hand_Landmarks = None
+        # Reset states like dragging when no hands are present
+        controller.release_drag("no hands detected")
+        return None
+
+    if primary_index < 0:
+        # The primary hand missed this frame but is still tracked: leave its built-in state
+        # (drag, cursor) alone until it comes back or its track is dropped
+        primary_hand_lms = None
+        controller.hand_Landmarks = None
+    else:
+        primary_hand_lms = hand_landmarks_list[primary_index]
+
+        controller.hand_Landmarks = primary_hand_lms # Set for built-in functions
+        controller.update_fingers_status() # Based on controller.hand_Landmarks (primary)
+        if timer: t = timer.lap('update_fingers_status', t)
+
+        # These built-in actions use the primary hand's landmarks
+        controller.cursor_moving()
+        if timer: t = timer.lap('cursor_moving', t)
+        # Scroll, zoom, clicks and drag: one rule table lookup (see gesture_rules.py)
+        controller.apply_built_in_rules(inferred)
+        if timer: t = timer.lap('built_in_rules', t)
+    if not inferred:
+        return primary_hand_lms # Discrete actions only fire on real inference frames
+
+    # Process ALL detected hands for custom gestures
+    if controller.get_gesture_mapper().recording_mode:
+        # If recording, only use the primary hand for collecting gesture data
+        if primary_hand_lms is not None:
+            controller.detect_custom_gestures(primary_hand_lms)
+    else:
+        controller.detect_custom_gestures_batch(hand_landmarks_list, hand_ids)
+    if timer: timer.lap('detect_custom_gestures', t)
+
+    return primary_hand_lms
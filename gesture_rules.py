@@ -0,0 +1,146 @@
+"""Built-in gestures as a declarative rule table, compiled into a per-frame lookup.
+
+Each frame's primary hand is reduced to a 9-bit state: bits 0-4 are the fingers that are
+up (thumb, index, middle, ring, little, as in template_matcher.finger_mask) and bits 5-8
+are the index, middle, ring and little tips touching the thumb tip. A rule lists the
+fingers that must be up or down and the tips that must or must not touch the thumb, plus
+how it fires:
+
+    level   every frame while the state matches (rate-limited by an interval)
+    edge    once when the state starts matching; re-armed when the `release` touches end
+    hold    start action when the state starts matching, end action when it stops
+
+RuleTable compiles the rules into a 512-entry table keyed by the state, so the per-frame
+work is one lookup that yields, in rule order, the rules to fire and the latched rules
+that may need releasing. Adding a built-in gesture means adding a row to BUILT_IN_RULES.
+"""
+from collections import namedtuple
+from typing import Iterable, List, Sequence, Tuple
+
+FINGERS = ('thumb', 'index', 'middle', 'ring', 'little')
+TOUCH_FINGERS = ('index', 'middle', 'ring', 'little')  # Tips compared with the thumb tip
+NUM_STATE_BITS = len(FINGERS) + len(TOUCH_FINGERS)
+
+LEVEL, EDGE, HOLD = 'level', 'edge', 'hold'
+
+BuiltInRule = namedtuple('BuiltInRule', [
+    'name',            # Executor key and rule id
+    'group',           # 'scroll', 'zoom', 'click' or 'drag' (the old detect_* method it replaces)
+    'trigger',         # LEVEL, EDGE or HOLD
+    'up',              # Fingers that must be up
+    'down',            # Fingers that must be down
+    'touching',        # Tips that must touch the thumb tip
+    'not_touching',    # Tips that must not touch the thumb tip
+    'action',          # Input backend method, or 'engine.<method>' for a ControllerEngine handler
+    'args',            # Positional args for the action
+    'amount',          # Executor amount (summed when coalesced), or None
+    'interval',        # ControllerEngine attribute holding the rate limit (seconds), or None
+    'end_action',      # HOLD: backend method when the state stops matching
+    'release',         # EDGE: touches whose end re-arms the rule (default: `touching`)
+    'latch',           # EDGE/HOLD: ControllerEngine attribute that stores whether it fired
+    'inferred_only',   # Skip on frames with predicted landmarks (see inference_scheduler.py)
+    'message',         # Printed when the rule fires
+    'end_message',     # HOLD: printed when the end action runs
+], defaults=((), (), (), (), None, (), None, None, None, (), None, True, None, None))
+
+
+def up_bit(finger: str) -> int:
+    return 1 << FINGERS.index(finger)
+
+
+def touch_bit(finger: str) -> int:
+    return 1 << (len(FINGERS) + TOUCH_FINGERS.index(finger))
+
+
+def frame_state(fingers_up: Sequence[bool], touching: Sequence[bool]) -> int:
+    """Pack [thumb..little] up flags and [index..little] thumb touches into the rule state."""
+    up, touch = fingers_up, touching
+    return (up[0] | up[1] << 1 | up[2] << 2 | up[3] << 3 | up[4] << 4 |
+            touch[0] << 5 | touch[1] << 6 | touch[2] << 7 | touch[3] << 8)
+
+
+def _bits(names: Iterable[str], bit) -> int:
+    mask = 0
+    for name in names:
+        mask |= bit(name)
+    return mask
+
+
+def rule_masks(rule: BuiltInRule) -> Tuple[int, int]:
+    """(bits that must be set, bits that must be clear) for a rule."""
+    require = _bits(rule.up, up_bit) | _bits(rule.touching, touch_bit)
+    forbid = _bits(rule.down, up_bit) | _bits(rule.not_touching, touch_bit)
+    if require & forbid:
+        raise ValueError(f"Built-in rule '{rule.name}' requires and forbids the same finger state")
+    return require, forbid
+
+
+class RuleTable:
+    """BUILT_IN_RULES compiled for one-lookup evaluation.
+
+    lookup[state] is a tuple of (rule, trigger, latch, release_mask, matched) in rule order:
+    every rule the state matches, and every EDGE/HOLD rule it does not match (those only act
+    when latched). The rule's fields are unpacked up front to keep the per-frame loop cheap.
+    """
+
+    def __init__(self, rules: Sequence[BuiltInRule]):
+        self.rules = list(rules)
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Built-in rule names must be unique")
+        masks = []
+        for rule in self.rules:
+            if rule.trigger not in (LEVEL, EDGE, HOLD):
+                raise ValueError(f"Built-in rule '{rule.name}' has unknown trigger '{rule.trigger}'")
+            if rule.trigger != LEVEL and not rule.latch:
+                raise ValueError(f"Built-in rule '{rule.name}' needs a latch attribute")
+            require, forbid = rule_masks(rule)
+            release = _bits(rule.release or rule.touching, touch_bit)
+            masks.append((rule, require, forbid, release))
+
+        self.lookup: List[tuple] = []
+        for state in range(1 << NUM_STATE_BITS):
+            entry = []
+            for rule, require, forbid, release in masks:
+                matched = state & require == require and not state & forbid
+                if matched or rule.trigger != LEVEL:
+                    entry.append((rule, rule.trigger, rule.latch, release, matched))
+            self.lookup.append(tuple(entry))
+
+    def matching(self, state: int) -> List[BuiltInRule]:
+        """Rules whose finger conditions hold in this state."""
+        return [entry[0] for entry in self.lookup[state] if entry[-1]]
+
+
+# The built-in gestures, in the order they are evaluated each frame
+BUILT_IN_RULES = [
+    # Scroll Up: Little finger up, others down (Index, Middle, Ring)
+    BuiltInRule('scroll_up', 'scroll', LEVEL, up=('little',), down=('index', 'middle', 'ring'),
+                action='scroll', amount=120, interval='scroll_interval', inferred_only=False,
+                message="Scrolling UP (built-in)"),
+    # Scroll Down: Index finger up, others down (Middle, Ring, Little)
+    BuiltInRule('scroll_down', 'scroll', LEVEL, up=('index',), down=('middle', 'ring', 'little'),
+                action='scroll', amount=-120, interval='scroll_interval', inferred_only=False,
+                message="Scrolling DOWN (built-in)"),
+    # Zoom: Index and Middle up, Ring and Little down; direction from the index-middle spread
+    BuiltInRule('zoom', 'zoom', LEVEL, up=('index', 'middle'), down=('ring', 'little'),
+                action='engine.zoom_step', inferred_only=False),
+    # Left Click: Index finger touches thumb, other main fingers (Middle, Ring, Little) are up
+    BuiltInRule('left_click', 'click', EDGE, up=('middle', 'ring', 'little'), touching=('index',),
+                not_touching=('middle', 'ring'), action='click', latch='left_clicked',
+                message="Left Clicking (built-in)"),
+    # Right Click: Middle finger touches thumb, other main fingers (Index, Ring, Little) are up
+    BuiltInRule('right_click', 'click', EDGE, up=('index', 'ring', 'little'), touching=('middle',),
+                not_touching=('index', 'ring'), action='right_click', latch='right_clicked',
+                message="Right Clicking (built-in)"),
+    # Double Click: Ring finger touches thumb (example, can be changed)
+    BuiltInRule('double_click', 'click', EDGE, up=('index', 'middle', 'little'), touching=('ring',),
+                not_touching=('index', 'middle'), action='double_click', latch='double_clicked',
+                message="Double Clicking (built-in)"),
+    # Drag: All fingers (Index, Middle, Ring, Little) are down (fist-like); thumb doesn't matter
+    BuiltInRule('drag', 'drag', HOLD, down=('index', 'middle', 'ring', 'little'), action='mouse_down',
+                args=("left",), end_action='mouse_up', latch='dragging', message="Dragging STARTED (built-in)",
+                end_message="Dragging STOPPED (built-in)"),
+]
+
+DEFAULT_RULE_TABLE = RuleTable(BUILT_IN_RULES)
@@ -0,0 +1,128 @@
+"""Scale- and rotation-invariant hand features, computed once per frame.
+
+Gesture signatures used to carry two raw 3D tip distances in normalized image
+coordinates, which shrink and grow with the distance to the camera, so a template only
+matched near the distance it was recorded at. hand_features() measures the hand in palm
+sizes (wrist to middle MCP) and derives a fixed-length vector:
+
+    0-9    tip-to-tip distances (thumb-index, thumb-middle, ..., ring-little)
+    10-14  tip-to-wrist distances (thumb..little)
+    15-29  joint straightness, (1 + cos(bend)) / 2, at the three joints of each finger
+           (thumb CMC, MCP, IP; other fingers MCP, PIP, DIP): 1 straight, 0.5 at 90 degrees
+
+None of these depend on scale or orientation. HandFeatures.points gives the landmarks in
+the palm frame itself (origin at the wrist, y along wrist -> middle MCP, x towards the
+index MCP, one unit = palm size) for consumers that need coordinates. The finger
+up/down booleans (landmark_array.analyze_hand) stay in image orientation on purpose:
+thumbs up and thumbs down differ only by which way the hand points. The built-in click and
+zoom tests use analyze_hand's 2D distances in palm sizes instead: MediaPipe's z is too noisy
+for a hard touch threshold.
+
+The result is cached by identity like analyze_hand, so the template matcher and the
+gesture recorder share one computation per hand per frame.
+"""
+from itertools import combinations
+
+import numpy as np
+
+from landmark_array import as_landmark_array
+
+WRIST, INDEX_MCP, MIDDLE_MCP, LITTLE_MCP = 0, 5, 9, 17
+TIPS = (4, 8, 12, 16, 20)
+TIP_PAIRS = tuple(combinations(range(len(TIPS)), 2))  # (thumb, index), (thumb, middle), ...
+NUM_FEATURES = len(TIP_PAIRS) + len(TIPS) + 15
+MIN_PALM_SIZE = 1e-6
+
+# Feature offsets
+TIP_DISTANCES = 0
+WRIST_DISTANCES = len(TIP_PAIRS)
+STRAIGHTNESS = WRIST_DISTANCES + len(TIPS)
+
+# One gather for every vector the features need: tip pairs and tips to the wrist (distances),
+# the finger segments before and after each measured joint (angles), and wrist -> middle MCP
+_JOINTS = [1, 2, 3, 5, 6, 7, 9, 10, 11, 13, 14, 15, 17, 18, 19]  # Thumb CMC, MCP, IP; then MCP, PIP, DIP
+_BEFORE = [0, 1, 2, 0, 5, 6, 0, 9, 10, 0, 13, 14, 0, 17, 18]
+_AFTER = [j + 1 for j in _JOINTS]
+_FROM = [TIPS[a] for a, _ in TIP_PAIRS] + list(TIPS) + _JOINTS + _AFTER + [MIDDLE_MCP]
+_TO = [TIPS[b] for _, b in TIP_PAIRS] + [WRIST] * len(TIPS) + _BEFORE + _JOINTS + [WRIST]
+# As a (vectors, 21) +1/-1 matrix: one matmul does the whole gather (cheaper than fancy indexing)
+_DIFFERENCES = np.zeros((len(_FROM), 21), dtype=np.float32)
+_DIFFERENCES[np.arange(len(_FROM)), _FROM] = 1.0
+_DIFFERENCES[np.arange(len(_TO)), _TO] = -1.0
+_ONES = np.ones(3, dtype=np.float32)
+_NUM_DISTANCES = len(TIP_PAIRS) + len(TIPS)
+_SEGMENTS_IN = slice(_NUM_DISTANCES, _NUM_DISTANCES + len(_JOINTS))
+_SEGMENTS_OUT = slice(_NUM_DISTANCES + len(_JOINTS), _NUM_DISTANCES + 2 * len(_JOINTS))
+
+
+class HandFeatures:
+    """Invariant features of one hand: the vector, the palm size and (lazily) the palm-frame points."""
+    __slots__ = ('vector', 'palm_size', '_landmarks', '_points')
+
+    def __init__(self, vector: np.ndarray, palm_size: float, landmarks: np.ndarray):
+        self.vector = vector        # (NUM_FEATURES,) float64, layout above
+        self.palm_size = palm_size  # Wrist to middle MCP distance in normalized image coordinates (3D)
+        self._landmarks = landmarks
+        self._points = None
+
+    @property
+    def points(self) -> np.ndarray:
+        """(21, 3) landmarks in the palm frame, in palm sizes (computed on first use)."""
+        if self._points is None:
+            rotation = palm_frame(self._landmarks)
+            self._points = (self._landmarks - self._landmarks[WRIST]) @ (rotation.T / self.palm_size)
+        return self._points
+
+
+def palm_frame(points: np.ndarray) -> np.ndarray:
+    """(3, 3) rotation whose rows are the palm frame axes: across, up (wrist -> middle MCP), normal."""
+    points = np.asarray(points, dtype=np.float64)
+    up = points[MIDDLE_MCP] - points[WRIST]
+    up = up / max(float(np.sqrt(up @ up)), MIN_PALM_SIZE)
+    across = points[INDEX_MCP] - points[LITTLE_MCP]
+    across = across - (across @ up) * up  # Orthogonal to the palm axis
+    norm = float(np.sqrt(across @ across))
+    if norm < MIN_PALM_SIZE:  # Side-on hand: any axis orthogonal to `up` will do
+        across = np.array([up[1], -up[0], 0.0]) if abs(up[2]) < 0.9 else np.array([1.0, 0.0, 0.0])
+        across = across - (across @ up) * up
+        norm = float(np.sqrt(across @ across))
+    across = across / norm
+    return np.stack([across, up, np.cross(across, up)])
+
+
+def extract_features(points: np.ndarray) -> HandFeatures:
+    """HandFeatures for a (21, 3) landmark array (no caching; see hand_features).
+
+    Distances and angles do not change under rotation, so the vector is computed from the
+    raw points in one gather and only divided by the palm size.
+    """
+    vectors = _DIFFERENCES @ points
+    squared = (vectors * vectors) @ _ONES
+    palm_size = max(float(squared[-1]) ** 0.5, MIN_PALM_SIZE)
+
+    dots = (vectors[_SEGMENTS_IN] * vectors[_SEGMENTS_OUT]) @ _ONES
+    lengths = np.sqrt(squared[_SEGMENTS_IN] * squared[_SEGMENTS_OUT])
+    lengths += MIN_PALM_SIZE * MIN_PALM_SIZE  # Zero-length segments: straightness 0.5
+
+    vector = np.empty(NUM_FEATURES)
+    vector[:_NUM_DISTANCES] = squared[:_NUM_DISTANCES]
+    np.sqrt(vector[:_NUM_DISTANCES], out=vector[:_NUM_DISTANCES])
+    vector[:_NUM_DISTANCES] *= 1.0 / palm_size
+    vector[STRAIGHTNESS:] = dots / lengths
+    vector[STRAIGHTNESS:] += 1.0
+    vector[STRAIGHTNESS:] *= 0.5
+    return HandFeatures(vector, palm_size, points)
+
+
+_features_source = None
+_cached_features = None
+
+
+def hand_features(hand_landmarks) -> HandFeatures:
+    """Invariant features of one hand, computed once per landmarks object and cached."""
+    global _features_source, _cached_features
+    if hand_landmarks is _features_source:
+        return _cached_features
+    features = extract_features(as_landmark_array(hand_landmarks))
+    _features_source, _cached_features = hand_landmarks, features
+    return features
@@ -0,0 +1,186 @@
+"""Persistent hand ids across frames and a stable primary hand.
+
+MediaPipe reports hands in no particular order and its handedness label flickers between
+'Left' and 'Right' from frame to frame, so re-deriving the primary hand from the labels
+every frame could swap it mid-click or mid-drag. HandTracker associates each frame's
+hands with the existing tracks by palm centroid (greedy nearest pairs within
+max_distance) and keeps a smoothed handedness score per track. The primary role only
+moves to another track once the policy has preferred that track for switch_frames
+consecutive frames, or right away once the primary track has been dropped.
+
+Tracks survive max_missing frames without a detection, so a hand that drops out for a
+frame or two keeps its id (and its custom gesture hold state). The primary role waits
+for it too: while the primary track is missing but alive, frames have no primary hand
+(primary == -1) instead of handing the role, and any drag it holds, to the other hand.
+"""
+from collections import namedtuple
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+PALM_INDICES = (0, 5, 9, 13, 17)  # Wrist and the finger MCP joints: steadier than the fingertips
+POLICIES = ('right', 'left', 'oldest', 'largest')
+
+TrackedHands = namedtuple('TrackedHands', [
+    'ids',              # Track id per hand, in the frame's order
+    'primary',          # Index of the primary hand in the frame (-1 when it is not in this frame)
+    'primary_changed',  # True if the primary track differs from the previous frame's
+])
+
+
+def palm_centroid(hand_landmarks):
+    """(x, y, size) of a hand: palm centroid and wrist-to-middle-MCP distance.
+
+    Reads only the palm landmarks, so MediaPipe landmark lists are not converted in full.
+    """
+    if isinstance(hand_landmarks, np.ndarray):
+        palm = hand_landmarks[PALM_INDICES, :2].tolist()  # Python floats: cheaper than NumPy for 5 points
+        x = sum(p[0] for p in palm) / len(palm)
+        y = sum(p[1] for p in palm) / len(palm)
+        wrist, middle = palm[0], palm[2]
+        return x, y, ((middle[0] - wrist[0]) ** 2 + (middle[1] - wrist[1]) ** 2) ** 0.5
+    landmarks = hand_landmarks.landmark
+    x = sum(landmarks[i].x for i in PALM_INDICES) / len(PALM_INDICES)
+    y = sum(landmarks[i].y for i in PALM_INDICES) / len(PALM_INDICES)
+    wrist, middle = landmarks[0], landmarks[9]
+    size = ((middle.x - wrist.x) ** 2 + (middle.y - wrist.y) ** 2) ** 0.5
+    return x, y, size
+
+
+class HandTrack:
+    """One tracked hand."""
+    __slots__ = ('id', 'x', 'y', 'size', 'handedness', 'age', 'missing')
+
+    def __init__(self, track_id: int, x: float, y: float, size: float):
+        self.id = track_id
+        self.x, self.y, self.size = x, y, size
+        self.handedness = 0.0  # Smoothed label: +1 'Right', -1 'Left', 0 unknown
+        self.age = 0           # Frames since the track was created
+        self.missing = 0       # Consecutive frames without a detection
+
+
+class HandTracker:
+    """Assigns persistent ids to hands and picks the primary hand with hysteresis.
+
+    policy:          which hand should be primary: 'right' / 'left' (by smoothed
+                     handedness), 'oldest' (first hand to appear) or 'largest' (closest
+                     to the camera)
+    max_distance:    largest palm centroid movement (normalized) between frames that
+                     still counts as the same hand
+    max_missing:     frames a track is kept without a detection
+    switch_frames:   frames the policy must prefer another hand before the primary moves
+    label_smoothing: weight of each new handedness label in the smoothed score
+    """
+
+    def __init__(self, policy: str = 'right', max_distance: float = 0.25, max_missing: int = 5,
+                 switch_frames: int = 8, label_smoothing: float = 0.2):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown primary hand policy '{policy}', expected one of {POLICIES}")
+        self.policy = policy
+        self.max_distance = max_distance
+        self.max_missing = max_missing
+        self.switch_frames = switch_frames
+        self.label_smoothing = label_smoothing
+        self.reset()
+
+    def reset(self):
+        """Forget all tracks (e.g. when the input switches to another camera)."""
+        self.tracks: List[HandTrack] = []
+        self.primary_id: Optional[int] = None
+        self._next_id = 0
+        self._challenger = None  # Track id the policy prefers over the primary
+        self._challenger_frames = 0
+
+        # Statistics
+        self.primary_switches = 0
+
+    def _associate(self, centroids) -> List[Optional[HandTrack]]:
+        """Greedily pair hands with tracks, nearest pairs first."""
+        pairs = []
+        limit = self.max_distance * self.max_distance
+        for hand, (x, y, _) in enumerate(centroids):
+            for track in self.tracks:
+                d = (track.x - x) ** 2 + (track.y - y) ** 2
+                if d <= limit:
+                    pairs.append((d, hand, track))
+        pairs.sort(key=lambda pair: pair[0])
+
+        assigned: List[Optional[HandTrack]] = [None] * len(centroids)
+        used = set()
+        for _, hand, track in pairs:
+            if assigned[hand] is None and track.id not in used:
+                assigned[hand] = track
+                used.add(track.id)
+        return assigned
+
+    def _preference(self, track: HandTrack):
+        """Sort key of the policy: higher is more preferred; ties go to the older track."""
+        if self.policy == 'right':
+            return track.handedness, track.age
+        if self.policy == 'left':
+            return -track.handedness, track.age
+        if self.policy == 'largest':
+            return track.size, track.age
+        return track.age, 0
+
+    def update(self, hands: Optional[Sequence], labels: Sequence[str] = ()) -> TrackedHands:
+        """Match this frame's hands to tracks. Call once per frame, also when no hands are seen."""
+        hands = hands or ()
+        centroids = [palm_centroid(hand) for hand in hands]
+        assigned = self._associate(centroids) if self.tracks else [None] * len(centroids)
+
+        seen = set()
+        for hand, (x, y, size) in enumerate(centroids):
+            track = assigned[hand]
+            if track is None:
+                track = HandTrack(self._next_id, x, y, size)
+                self._next_id += 1
+                self.tracks.append(track)
+                assigned[hand] = track
+            else:
+                track.x, track.y, track.size = x, y, size
+                track.age += 1
+            track.missing = 0
+            seen.add(track.id)
+            label = labels[hand] if hand < len(labels) else None
+            if label in ('Right', 'Left'):
+                observed = 1.0 if label == 'Right' else -1.0
+                if track.age == 0:
+                    track.handedness = observed
+                else:
+                    track.handedness += self.label_smoothing * (observed - track.handedness)
+
+        for track in self.tracks:
+            if track.id not in seen:
+                track.missing += 1
+        self.tracks = [track for track in self.tracks if track.missing <= self.max_missing]
+
+        previous = self.primary_id
+        if not hands:
+            self.primary_id = previous if any(t.id == previous for t in self.tracks) else None
+            return TrackedHands([], -1, self.primary_id != previous)
+
+        ids = [track.id for track in assigned]
+        preferred = max(assigned, key=self._preference).id
+        if self.primary_id not in ids and any(t.id == self.primary_id for t in self.tracks):
+            # Primary hand missed this frame but its track is alive: keep the role, no primary this frame
+            return TrackedHands(ids, -1, False)
+        if self.primary_id not in ids:
+            # Primary track dropped (or none yet): hand the role over right away
+            self.primary_id = preferred
+            self._challenger, self._challenger_frames = None, 0
+        elif preferred != self.primary_id:
+            if preferred == self._challenger:
+                self._challenger_frames += 1
+            else:
+                self._challenger, self._challenger_frames = preferred, 1
+            if self._challenger_frames >= self.switch_frames:
+                self.primary_id = preferred
+                self._challenger, self._challenger_frames = None, 0
+        else:
+            self._challenger, self._challenger_frames = None, 0
+
+        changed = self.primary_id != previous
+        if changed and previous is not None:
+            self.primary_switches += 1
+        return TrackedHands(ids, ids.index(self.primary_id), changed)
@@ -0,0 +1,111 @@
+"""Frame-skipping hand inference with landmark prediction between inference frames.
+
+On slower CPUs hands.process() cannot keep up with the camera, so the whole loop (and
+the cursor) runs at inference speed. InferenceScheduler runs the detector only every N
+frames (fixed, or chosen from the measured inference time) and, in between, predicts each
+hand's landmarks with a constant-velocity model from the last two inference results, so
+cursor movement keeps updating at camera rate.
+
+Predicted frames are marked inferred=False; process_hands() skips clicks, drags and
+custom gestures on them, so discrete actions only ever fire on real detections.
+"""
+import math
+import time
+from collections import namedtuple
+from typing import Callable, Optional
+
+import numpy as np
+
+from landmark_array import NUM_LANDMARKS, as_landmark_array
+
+ScheduledResults = namedtuple('ScheduledResults', [
+    'multi_hand_landmarks',  # MediaPipe landmarks on inference frames, predicted (21, 3) arrays otherwise
+    'multi_handedness',      # Handedness from the last inference frame
+    'inferred',              # True if the detector actually ran on this frame
+])
+
+
+class InferenceScheduler:
+    """Wraps a detector (hands or RoiHandDetector) and decides per frame whether to run it.
+
+    every:        run inference every this many frames (1 = every frame)
+    adaptive:     pick the interval from the measured inference time instead, so the average
+                  per-frame cost stays within frame_budget (at most max_interval)
+    max_horizon:  never extrapolate further than this many seconds past the last detection
+    max_jump:     a hand moving more than this (normalized) between detections is treated
+                  as a new hand, and is held still rather than extrapolated
+    """
+
+    def __init__(self, detector, every: int = 1, adaptive: bool = False, frame_budget: float = 1 / 30,
+                 max_interval: int = 4, max_horizon: float = 0.15, max_jump: float = 0.25,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.detector = detector
+        self.every = max(1, every)
+        self.adaptive = adaptive
+        self.frame_budget = frame_budget
+        self.max_interval = max_interval
+        self.max_horizon = max_horizon
+        self.max_jump = max_jump
+        self.clock = clock
+
+        self.inference_time = 0.0  # Exponential moving average of detector.process(), seconds
+        self._since_inference = None  # Frames since the last inference (None: never ran)
+        self._hands = None       # (n, 21, 3) landmarks of the last inference frame
+        self._velocity = None    # (n, 21, 3) per-second velocity estimate
+        self._timestamp = 0.0
+        self._handedness = None
+
+        # Statistics
+        self.frames = 0
+        self.inferred_frames = 0
+        self.predicted_frames = 0
+
+    @property
+    def interval(self) -> int:
+        """Current number of frames per inference."""
+        if not self.adaptive:
+            return self.every
+        frames = math.ceil(self.inference_time / self.frame_budget) if self.frame_budget > 0 else 1
+        return min(max(frames, 1), self.max_interval)
+
+    def _due(self) -> bool:
+        if self._since_inference is None or self._hands is None or not len(self._hands):
+            return True  # Nothing to predict from; detect as soon as possible
+        return self._since_inference >= self.interval
+
+    def process(self, img_rgb: np.ndarray, timestamp: Optional[float] = None) -> ScheduledResults:
+        self.frames += 1
+        now = self.clock() if timestamp is None else timestamp
+        if self._due():
+            return self._infer(img_rgb, now)
+
+        self._since_inference += 1
+        self.predicted_frames += 1
+        dt = min(now - self._timestamp, self.max_horizon)
+        predicted = self._hands + self._velocity * dt
+        return ScheduledResults(list(predicted), self._handedness, False)
+
+    def _infer(self, img_rgb: np.ndarray, now: float) -> ScheduledResults:
+        start = time.perf_counter()
+        results = self.detector.process(img_rgb)
+        elapsed = time.perf_counter() - start
+        self.inference_time = elapsed if not self.inferred_frames else 0.8 * self.inference_time + 0.2 * elapsed
+        self.inferred_frames += 1
+        self._since_inference = 1
+
+        hand_list = results.multi_hand_landmarks or []
+        hands = np.array([as_landmark_array(hand) for hand in hand_list],
+                         dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+        dt = now - self._timestamp
+        velocity = np.zeros_like(hands)
+        if self._hands is not None and len(hands) and hands.shape == self._hands.shape and dt > 0:
+            delta = hands - self._hands
+            # Hands are paired by index; a large jump means MediaPipe swapped or replaced them
+            moved = np.abs(delta[:, :, :2]).max(axis=(1, 2)) <= self.max_jump
+            velocity[moved] = delta[moved] / dt
+        self._hands, self._velocity, self._timestamp = hands, velocity, now
+        self._handedness = results.multi_handedness
+        return ScheduledResults(results.multi_hand_landmarks, results.multi_handedness, True)
+
+    def close(self):
+        self.detector.close()
@@ -0,0 +1,211 @@
+"""Input backends: the only place that talks to the OS mouse/keyboard.
+
+Controller and GestureMapper emit every mouse/keyboard event through an InputBackend
+instead of calling pyautogui directly, so the pipeline can run (and be benchmarked)
+without a display:
+
+    PyAutoGUIBackend  - real input through pyautogui (imported lazily)
+    RecordingBackend  - logs every event with a timestamp, emits nothing
+    InputBackend      - the interface itself; every call is a no-op
+
+Backends keep a model of the cursor position (updated by move_to), so reading the
+cursor on the hot path does not need an OS round-trip every frame.
+"""
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+class InputBackend:
+    """Base input backend. Does nothing, which also makes it the no-op backend."""
+
+    def __init__(self, screen_size: Tuple[int, int] = (1920, 1080)):
+        self.screen_size = screen_size
+        self._cursor = (screen_size[0] // 2, screen_size[1] // 2)  # Cached cursor model
+
+    def size(self) -> Tuple[int, int]:
+        """Screen size in pixels."""
+        return self.screen_size
+
+    def position(self) -> Tuple[int, int]:
+        """Current cursor position (from the cached model)."""
+        return self._cursor
+
+    def move_to(self, x: int, y: int):
+        self._cursor = (x, y)
+
+    def click(self):
+        pass
+
+    def right_click(self):
+        pass
+
+    def double_click(self):
+        pass
+
+    def scroll(self, amount: int):
+        pass
+
+    def mouse_down(self, button: str = "left"):
+        pass
+
+    def mouse_up(self, button: str = "left"):
+        pass
+
+    def key_down(self, key: str):
+        pass
+
+    def key_up(self, key: str):
+        pass
+
+    def press(self, key: str):
+        pass
+
+    def hotkey(self, *keys: str):
+        pass
+
+    def screenshot(self, filename: str):
+        pass
+
+    def ctrl_scroll(self, amount: int):
+        """Ctrl + scroll (zoom), as one call so Ctrl is never left held down."""
+        self.key_down('ctrl')
+        self.scroll(amount)
+        self.key_up('ctrl')
+
+
+# The base class already ignores every event
+NullBackend = InputBackend
+
+
+class RecordingBackend(InputBackend):
+    """Records every event as (timestamp, name, args) instead of emitting it."""
+
+    def __init__(self, screen_size: Tuple[int, int] = (1920, 1080)):
+        super().__init__(screen_size)
+        self.events: List[tuple] = []
+        self._lock = threading.Lock()  # Events arrive from the action executor's worker thread
+
+    def _record(self, name: str, *args):
+        with self._lock:
+            self.events.append((time.perf_counter(), name, args))
+
+    def events_named(self, name: str) -> List[tuple]:
+        """All recorded events with the given name."""
+        with self._lock:
+            return [event for event in self.events if event[1] == name]
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+
+    def move_to(self, x: int, y: int):
+        super().move_to(x, y)
+        self._record('move_to', x, y)
+
+    def click(self):
+        self._record('click')
+
+    def right_click(self):
+        self._record('right_click')
+
+    def double_click(self):
+        self._record('double_click')
+
+    def scroll(self, amount: int):
+        self._record('scroll', amount)
+
+    def mouse_down(self, button: str = "left"):
+        self._record('mouse_down', button)
+
+    def mouse_up(self, button: str = "left"):
+        self._record('mouse_up', button)
+
+    def key_down(self, key: str):
+        self._record('key_down', key)
+
+    def key_up(self, key: str):
+        self._record('key_up', key)
+
+    def press(self, key: str):
+        self._record('press', key)
+
+    def hotkey(self, *keys: str):
+        self._record('hotkey', *keys)
+
+    def screenshot(self, filename: str):
+        self._record('screenshot', filename)
+
+
+class PyAutoGUIBackend(InputBackend):
+    """Real mouse/keyboard input through pyautogui.
+
+    position() answers from the cached cursor model and only re-reads the OS cursor every
+    `position_refresh` seconds, to pick up moves made with the physical mouse. `pause` sets
+    pyautogui.PAUSE, the sleep pyautogui adds after every call (0.1 s by default).
+    """
+
+    def __init__(self, position_refresh: float = 0.5, pause: float = 0.0):
+        import pyautogui  # Imported here so headless code paths never need a display
+        self._pyautogui = pyautogui
+        pyautogui.PAUSE = pause
+        super().__init__(tuple(pyautogui.size()))
+        self.position_refresh = position_refresh
+        self._cursor = tuple(pyautogui.position())
+        self._cursor_synced_at = time.monotonic()
+
+    def position(self) -> Tuple[int, int]:
+        now = time.monotonic()
+        if now - self._cursor_synced_at >= self.position_refresh:
+            self._cursor = tuple(self._pyautogui.position())
+            self._cursor_synced_at = now
+        return self._cursor
+
+    def move_to(self, x: int, y: int):
+        self._pyautogui.moveTo(x, y, duration=0) # duration=0 for fastest response
+        super().move_to(x, y)
+
+    def click(self):
+        self._pyautogui.click()
+
+    def right_click(self):
+        self._pyautogui.rightClick()
+
+    def double_click(self):
+        self._pyautogui.doubleClick()
+
+    def scroll(self, amount: int):
+        self._pyautogui.scroll(amount)
+
+    def mouse_down(self, button: str = "left"):
+        self._pyautogui.mouseDown(button=button)
+
+    def mouse_up(self, button: str = "left"):
+        self._pyautogui.mouseUp(button=button)
+
+    def key_down(self, key: str):
+        self._pyautogui.keyDown(key)
+
+    def key_up(self, key: str):
+        self._pyautogui.keyUp(key)
+
+    def press(self, key: str):
+        self._pyautogui.press(key)
+
+    def hotkey(self, *keys: str):
+        self._pyautogui.hotkey(*keys)
+
+    def screenshot(self, filename: str):
+        self._pyautogui.screenshot(filename)
+
+
+def create_backend(name: Optional[str] = None) -> InputBackend:
+    """Backend by name: 'pyautogui' (default), 'recording' or 'null'."""
+    name = (name or 'pyautogui').lower()
+    if name == 'pyautogui':
+        return PyAutoGUIBackend()
+    if name == 'recording':
+        return RecordingBackend()
+    if name in ('null', 'none', 'noop'):
+        return NullBackend()
+    raise ValueError(f"Unknown input backend '{name}'")
@@ -0,0 +1,144 @@
+"""Per-frame landmark views of the 21 MediaPipe hand landmarks.
+
+Controller and GestureMapper both read the same landmarks several times per frame.
+analyze_hand() runs every finger test and distance for one hand in a single pass and
+caches the result, which every consumer then shares. One hand is too small for NumPy to
+pay off (per-call overhead dominates), so it reads just the landmarks it needs as Python
+floats. The array functions (as_landmark_array and the batched helpers below) are for
+stacks of hands (..., 21, 3): trace recording, inference prediction and benchmarks.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+# Landmark indices (see "fingers names from internet.png")
+WRIST = 0
+THUMB_TIP = 4
+INDEX_TIP = 8
+MIDDLE_MCP = 9
+MIDDLE_TIP = 12
+TIP_INDICES = np.array([4, 8, 12, 16, 20])   # Thumb, Index, Middle, Ring, Little
+PIP_INDICES = np.array([3, 6, 10, 14, 18])   # Thumb IP, Index PIP, Middle PIP, Ring PIP, Little PIP
+MCP_INDICES = np.array([2, 5, 9, 13, 17])    # MCP joints (base of fingers)
+
+# Point pairs for all distances: 4 finger tips to thumb tip, thumb-index, index-middle
+_PAIR_A = np.array([8, 12, 16, 20, THUMB_TIP, INDEX_TIP])
+_PAIR_B = np.array([4, 4, 4, 4, INDEX_TIP, MIDDLE_TIP])
+
+HandAnalysis = namedtuple('HandAnalysis', [
+    'fingers_up',             # [5] tip above PIP (Controller's up/down test)
+    'fingers_extended',       # [5] tip above PIP and MCP (GestureMapper signature test)
+    'thumb_distances',        # [4] Index/Middle/Ring/Little tip to thumb tip, in palm sizes (clicks)
+    'index_middle_distance',  # Index-middle tip distance, in palm sizes (zoom)
+    'index_tip',              # (x, y) of the index tip (cursor)
+    'palm_size',              # Wrist to middle MCP distance in normalized image coordinates
+])
+MIN_PALM_SIZE = 1e-6
+
+# Identity caches: the same landmarks object is converted/analyzed at most once.
+# Arrays passed in directly are treated as immutable for the frame they belong to.
+_cached_source = None
+_cached_points = None
+_analysis_source = None
+_cached_analysis = None
+
+
+def landmarks_to_array(hand_landmarks) -> np.ndarray:
+    """Convert a MediaPipe NormalizedLandmarkList into a (21, 3) float32 array of x, y, z."""
+    values = []
+    append = values.extend
+    for lm in hand_landmarks.landmark:
+        append((lm.x, lm.y, lm.z))
+    return np.array(values, dtype=np.float32).reshape(NUM_LANDMARKS, 3)
+
+
+def as_landmark_array(hand_landmarks) -> np.ndarray:
+    """Return the (21, 3) array for hand_landmarks, converting it only once per frame.
+
+    Accepts a MediaPipe landmark list or an already-converted array (returned as-is).
+    """
+    global _cached_source, _cached_points
+    if isinstance(hand_landmarks, np.ndarray):
+        return hand_landmarks
+    if hand_landmarks is _cached_source:
+        return _cached_points
+    points = landmarks_to_array(hand_landmarks)
+    _cached_source, _cached_points = hand_landmarks, points
+    return points
+
+
+def analyze_hand(hand_landmarks) -> HandAnalysis:
+    """All per-frame finger tests and distances for one hand, computed once and cached.
+
+    Distances are 2D (x, y) divided by the 2D palm size: MediaPipe's z is much noisier than
+    x and y, and dividing by the palm size keeps thresholds valid at any camera distance.
+    """
+    global _analysis_source, _cached_analysis
+    if hand_landmarks is _analysis_source:
+        return _cached_analysis
+
+    # Read just the points the tests need into Python floats: wrist, middle MCP and tips (x, y),
+    # PIP and MCP heights
+    if isinstance(hand_landmarks, np.ndarray):
+        p = hand_landmarks.tolist()
+        wrist, middle_mcp = p[0], p[9]
+        thumb, index, middle, ring, little = p[4], p[8], p[12], p[16], p[20]
+        pip_y = (p[3][1], p[6][1], p[10][1], p[14][1], p[18][1])
+        mcp_y = (p[2][1], p[5][1], p[9][1], p[13][1], p[17][1])
+    else:
+        lm = hand_landmarks.landmark
+        w, c, t, i, m, r, l = lm[0], lm[9], lm[4], lm[8], lm[12], lm[16], lm[20]
+        wrist, middle_mcp = (w.x, w.y), (c.x, c.y)
+        thumb, index, middle, ring, little = (t.x, t.y), (i.x, i.y), (m.x, m.y), (r.x, r.y), (l.x, l.y)
+        pip_y = (lm[3].y, lm[6].y, lm[10].y, lm[14].y, lm[18].y)
+        mcp_y = (lm[2].y, lm[5].y, c.y, lm[13].y, lm[17].y)
+
+    # Unrolled: loops over five fingers cost more than the comparisons themselves
+    up = [thumb[1] < pip_y[0], index[1] < pip_y[1], middle[1] < pip_y[2], ring[1] < pip_y[3], little[1] < pip_y[4]]
+    extended = [up[0] and thumb[1] < mcp_y[0], up[1] and index[1] < mcp_y[1], up[2] and middle[1] < mcp_y[2],
+                up[3] and ring[1] < mcp_y[3], up[4] and little[1] < mcp_y[4]]
+    palm_size = max(math.hypot(middle_mcp[0] - wrist[0], middle_mcp[1] - wrist[1]), MIN_PALM_SIZE)
+    scale = 1.0 / palm_size
+    tx, ty = thumb[0], thumb[1]
+    thumb_distances = [math.hypot(index[0] - tx, index[1] - ty) * scale, math.hypot(middle[0] - tx, middle[1] - ty) * scale,
+                       math.hypot(ring[0] - tx, ring[1] - ty) * scale, math.hypot(little[0] - tx, little[1] - ty) * scale]
+
+    analysis = HandAnalysis(up, extended, thumb_distances,
+                            math.hypot(index[0] - middle[0], index[1] - middle[1]) * scale,
+                            (index[0], index[1]), palm_size)
+    _analysis_source, _cached_analysis = hand_landmarks, analysis
+    return analysis
+
+
+# --- Batched helpers: work on (21, 3) or stacks of hands (..., 21, 3) ---
+
+def fingers_up(points: np.ndarray) -> np.ndarray:
+    """(..., 5) bool: finger tip above its PIP joint (image y grows downwards)."""
+    return points[..., TIP_INDICES, 1] < points[..., PIP_INDICES, 1]
+
+
+def fingers_extended(points: np.ndarray) -> np.ndarray:
+    """(..., 5) bool: finger tip above both its PIP and MCP joints (used for signatures)."""
+    tip_y = points[..., TIP_INDICES, 1]
+    return (tip_y < points[..., PIP_INDICES, 1]) & (tip_y < points[..., MCP_INDICES, 1])
+
+
+def palm_sizes(points: np.ndarray) -> np.ndarray:
+    """(...,) 2D wrist to middle MCP distance (HandAnalysis.palm_size)."""
+    delta = points[..., MIDDLE_MCP, :2] - points[..., WRIST, :2]
+    return np.maximum(np.sqrt((delta * delta).sum(axis=-1)), MIN_PALM_SIZE)
+
+
+def thumb_tip_distances(points: np.ndarray) -> np.ndarray:
+    """(..., 4) 2D distances from the Index, Middle, Ring and Little tips to the thumb tip, in palm sizes."""
+    delta = points[..., _PAIR_A[:4], :2] - points[..., [THUMB_TIP], :2]
+    return np.sqrt((delta * delta).sum(axis=-1)) / palm_sizes(points)[..., None]
+
+
+def signature_distances(points: np.ndarray) -> np.ndarray:
+    """(..., 2) 3D thumb-index and index-middle tip distances: the signature layout before hand_features."""
+    delta = points[..., _PAIR_A[4:], :] - points[..., _PAIR_B[4:], :]
+    return np.sqrt((delta * delta).sum(axis=-1))
@@ -0,0 +1,260 @@
+"""Landmark trace recording and deterministic replay.
+
+A trace stores what MediaPipe produced for every frame (landmarks and handedness of each
+hand) in a compact binary file, so gesture logic can be re-run without a camera or
+MediaPipe: to reproduce bugs, regression-test Controller/GestureMapper and measure the
+decision path alone.
+
+File layout (little-endian):
+    header   b'HGTRACE' + version byte
+    frame    float64 timestamp (s since first frame), uint8 hand count, then per hand:
+             uint8 handedness (0 unknown, 1 Left, 2 Right), float32 score,
+             21 x 3 float32 landmarks (x, y, z)
+
+Record with `python app_with_gui.py --record-trace session.hgt`, replay with
+`python landmark_trace.py replay session.hgt [--realtime]`.
+"""
+import argparse
+import os
+import struct
+import tempfile
+import time
+from collections import namedtuple
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from landmark_array import NUM_LANDMARKS, as_landmark_array
+
+MAGIC = b'HGTRACE'
+VERSION = 1
+_HEADER = MAGIC + bytes([VERSION])
+_FRAME = struct.Struct('<dB')
+_HAND = struct.Struct('<Bf')
+_POINTS_BYTES = NUM_LANDMARKS * 3 * 4
+
+_LABEL_CODES = {'Left': 1, 'Right': 2}
+_CODE_LABELS = {0: '', 1: 'Left', 2: 'Right'}
+
+TraceFrame = namedtuple('TraceFrame', [
+    'timestamp',   # Seconds since the first recorded frame
+    'hands',       # (n, 21, 3) float32 landmarks
+    'labels',      # Handedness label per hand ('Left', 'Right' or '')
+    'scores',      # Handedness confidence per hand
+])
+
+
+def encode_frame(timestamp: float, hands: Sequence, labels: Sequence[str] = (),
+                 scores: Sequence[float] = ()) -> bytes:
+    """Pack one frame; hands may be landmark lists or (21, 3) arrays."""
+    parts = [_FRAME.pack(timestamp, len(hands))]
+    for i, hand in enumerate(hands):
+        label = labels[i] if i < len(labels) else ''
+        score = scores[i] if i < len(scores) else 0.0
+        parts.append(_HAND.pack(_LABEL_CODES.get(label, 0), score))
+        parts.append(np.ascontiguousarray(as_landmark_array(hand), dtype='<f4').tobytes())
+    return b''.join(parts)
+
+
+def decode_frame(buffer, offset: int = 0):
+    """Unpack the frame at offset. Returns (TraceFrame, offset of the next frame)."""
+    timestamp, count = _FRAME.unpack_from(buffer, offset)
+    offset += _FRAME.size
+    hands = np.empty((count, NUM_LANDMARKS, 3), dtype=np.float32)
+    labels, scores = [], []
+    for i in range(count):
+        code, score = _HAND.unpack_from(buffer, offset)
+        offset += _HAND.size
+        hands[i] = np.frombuffer(buffer, dtype='<f4', count=NUM_LANDMARKS * 3,
+                                 offset=offset).reshape(NUM_LANDMARKS, 3)
+        offset += _POINTS_BYTES
+        labels.append(_CODE_LABELS.get(code, ''))
+        scores.append(score)
+    return TraceFrame(timestamp, hands, labels, scores), offset
+
+
+class TraceWriter:
+    """Appends frames to a trace file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER)
+        self._start = None
+        self.frames_written = 0
+
+    def write_frame(self, hands: Sequence, labels: Sequence[str] = (), scores: Sequence[float] = (),
+                    timestamp: Optional[float] = None):
+        """Record one frame (an empty hands list records a frame without hands)."""
+        now = time.perf_counter() if timestamp is None else timestamp
+        if self._start is None:
+            self._start = now
+        self._file.write(encode_frame(now - self._start, hands or (), labels, scores))
+        self.frames_written += 1
+
+    def write_results(self, results, timestamp: Optional[float] = None):
+        """Record a MediaPipe Hands result (multi_hand_landmarks + multi_handedness)."""
+        hands = results.multi_hand_landmarks or []
+        labels, scores = [], []
+        for info in results.multi_handedness or []:
+            labels.append(info.classification[0].label)
+            scores.append(info.classification[0].score)
+        self.write_frame(hands, labels, scores, timestamp)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_trace(path: str) -> List[TraceFrame]:
+    """Load every frame of a trace file."""
+    return list(iter_trace(path))
+
+
+def iter_trace(path: str) -> Iterator[TraceFrame]:
+    """Iterate over the frames of a trace file."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"'{path}' is not a landmark trace")
+    if data[len(MAGIC)] != VERSION:
+        raise ValueError(f"Unsupported trace version {data[len(MAGIC)]} in '{path}'")
+    offset = len(_HEADER)
+    while offset < len(data):
+        frame, offset = decode_frame(data, offset)
+        yield frame
+
+
+class ReplayEngine:
+    """Feeds a trace through its own ControllerEngine and a GestureMapper, with no camera or MediaPipe.
+
+    Gesture timing (holds, cooldowns, rate limits) follows the trace's own timestamps and
+    actions run synchronously on the given input backend, so a replay is deterministic.
+    With realtime=True frames are paced to their recorded timestamps, otherwise they run
+    as fast as possible.
+
+    Without a mapper, the replay gets its own GestureMapper on a config in a temporary
+    directory, seeded from config_file (mappings and templates, read only) if one is given,
+    so a replay never loads or writes the user's gesture config.
+    """
+
+    def __init__(self, frames: Sequence[TraceFrame], backend=None, mapper=None, realtime: bool = False,
+                 config_file: Optional[str] = None):
+        from input_backend import RecordingBackend
+        self.frames = frames
+        self.backend = backend if backend is not None else RecordingBackend()
+        self.mapper = mapper
+        self.config_file = config_file
+        self.realtime = realtime
+        self._scratch_dir = None  # Temporary directory of the replay's own mapper, if it made one
+        self.trace_time = 0.0  # Timestamp of the frame being processed
+        self.controller = None  # ControllerEngine the trace drives, built by install()
+
+    def _clock(self) -> float:
+        return self.trace_time
+
+    def _scratch_mapper(self):
+        """GestureMapper on a temporary config, seeded from self.config_file without writing to it."""
+        from gesture_mapper import GestureMapper
+        from template_store import TemplateStore, store_path_for
+        self._scratch_dir = tempfile.TemporaryDirectory(prefix='replay-')  # Removed with the engine
+        mapper = GestureMapper(os.path.join(self._scratch_dir.name, 'gesture_config.json'), backend=self.backend,
+                               save_delay=None)
+        if self.config_file is not None:
+            mapper.import_config(self.config_file)
+            store_file = store_path_for(self.config_file)
+            if os.path.exists(store_file):
+                store = TemplateStore(store_file)
+                mapper.import_templates(store.to_dict())
+                store.close()
+        return mapper
+
+    def install(self):
+        """Build this replay's ControllerEngine (kept as self.controller and returned).
+
+        It gets the replay's backend and clock, a synchronous executor, a fresh hand tracker
+        and the given mapper (or its own scratch one); Controller's default engine is left alone.
+        """
+        from action_executor import ActionExecutor
+        from controller import ControllerEngine
+        from hand_tracker import HandTracker
+        if self.mapper is None:
+            self.mapper = self._scratch_mapper()
+        executor = ActionExecutor(synchronous=True, clock=self._clock)
+        self.controller = ControllerEngine(backend=self.backend, executor=executor, mapper=self.mapper,
+                                           tracker=HandTracker(), clock=self._clock)
+        self.mapper.set_input_backend(self.backend)
+        self.mapper.executor = executor
+        return self.controller
+
+    def run(self, on_frame=None) -> dict:
+        """Replay every frame; on_frame(frame, primary_hand) is called after each one."""
+        from gesture_pipeline import process_hands
+        self.install()
+
+        start = time.perf_counter()
+        decision_time = 0.0
+        for frame in self.frames:
+            if self.realtime:
+                delay = frame.timestamp - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            self.trace_time = frame.timestamp
+            hands = list(frame.hands)  # Stable per-frame objects, so per-frame caches hit
+            t0 = time.perf_counter()
+            primary = process_hands(hands, frame.labels, controller=self.controller)
+            decision_time += time.perf_counter() - t0
+            if on_frame is not None:
+                on_frame(frame, primary)
+        elapsed = time.perf_counter() - start
+
+        frames = len(self.frames)
+        return {
+            'frames': frames,
+            'elapsed_s': elapsed,
+            'fps': frames / elapsed if elapsed > 0 else 0.0,
+            'decision_us_per_frame': decision_time / frames * 1e6 if frames else 0.0,
+            'events': len(getattr(self.backend, 'events', ())),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or replay a landmark trace")
+    sub = parser.add_subparsers(dest='command', required=True)
+    info = sub.add_parser('info', help="summarize a trace file")
+    info.add_argument('trace')
+    replay = sub.add_parser('replay', help="run a trace through Controller and GestureMapper")
+    replay.add_argument('trace')
+    replay.add_argument('--realtime', action='store_true', help="pace frames to their recorded timestamps")
+    replay.add_argument('--config', default='gesture_config.json',
+                        help="gesture config to take mappings and templates from (not modified)")
+    replay.add_argument('--events', action='store_true', help="print every emitted input event")
+    args = parser.parse_args()
+
+    frames = read_trace(args.trace)
+    if args.command == 'info':
+        hands = sum(len(f.hands) for f in frames)
+        duration = frames[-1].timestamp if frames else 0.0
+        print(f"{args.trace}: {len(frames)} frames, {duration:.1f}s, {hands} hands")
+        return
+
+    from input_backend import RecordingBackend
+    backend = RecordingBackend()
+    engine = ReplayEngine(frames, backend=backend, realtime=args.realtime,
+                          config_file=args.config if os.path.exists(args.config) else None)
+    stats = engine.run()
+    if args.events:
+        for timestamp, name, event_args in backend.events:
+            print(f"{timestamp:.4f} {name} {event_args}")
+    print(f"Replayed {stats['frames']} frames in {stats['elapsed_s']:.2f}s ({stats['fps']:.0f} FPS), "
+          f"decision path {stats['decision_us_per_frame']:.1f} us/frame, {stats['events']} input events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Low-overhead per-frame metrics for the live performance dashboard.
+
+The vision loop writes one row per frame into a preallocated ring: a handful of float
+stores and one integer increment, no lock, no allocation. The dashboard drains the rows
+written since its last visit at a fixed low rate (see gesture_gui.py) and summarizes the
+batch, so all the arithmetic happens on the GUI thread, a few times a second:
+
+    timestamp   perf_counter() at the end of the frame
+    captured    FrameGrabber.frames_captured so far (capture FPS)
+    dropped     FrameGrabber.frames_dropped so far
+    inference   seconds in hand inference (NaN on predicted frames)
+    decision    seconds in gesture decisions (process_hands)
+    queue       ActionExecutor queue depth
+
+Per-gesture match scores are kept as the peak per gesture since the last drain, in a
+dict guarded by a lock: record_score's read-modify-write and drain's swap must not
+interleave, or a score is lost and the reader sees a dict still being written. The lock
+is only held for a dict update or a swap. The row writer never waits for the reader; if
+the dashboard falls more than `capacity` frames behind, the oldest rows are simply gone.
+"""
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, Optional
+
+import numpy as np
+
+FIELDS = ('timestamp', 'captured', 'dropped', 'inference', 'decision', 'queue')
+NO_MATCH = '(no match)'  # Score key for the best similarity of frames that matched nothing
+
+MetricsSummary = namedtuple('MetricsSummary', [
+    'frames',           # Frames in the batch
+    'fps',              # Frames processed per second
+    'capture_fps',      # Frames captured per second
+    'inference_ms',     # Mean and 95th percentile over inference frames (NaN if none)
+    'inference_p95_ms',
+    'decision_ms',      # Mean and 95th percentile over all frames
+    'decision_p95_ms',
+    'queue_depth',      # Largest action queue depth seen
+    'dropped',          # Frames dropped by the capture ring during the batch
+    'dropped_total',
+    'scores',           # Gesture name -> peak match score during the batch
+])
+
+
+class MetricsRing:
+    """Preallocated ring of per-frame metric rows; one writer (vision loop), one reader (dashboard)."""
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.rows = np.full((capacity, len(FIELDS)), np.nan)
+        self.written = 0  # Rows written so far; published after the row is complete
+        self.scores: Dict[str, float] = {}
+        self._scores_lock = threading.Lock()  # record_score (vision loop) vs drain's swap (dashboard)
+        self._read = 0
+        self._last = None  # Last row of the previous drain, for per-batch deltas
+
+    def record(self, inference: float, decision: float, queue_depth: int, captured: int = 0,
+               dropped: int = 0, timestamp: Optional[float] = None):
+        """Write one frame's row (vision loop)."""
+        row = self.rows[self.written % self.capacity]
+        row[0] = time.perf_counter() if timestamp is None else timestamp
+        row[1] = captured
+        row[2] = dropped
+        row[3] = inference
+        row[4] = decision
+        row[5] = queue_depth
+        self.written += 1
+
+    def record_score(self, name: Optional[str], score: float):
+        """Keep the peak match score of a gesture (None: the best score of a frame that matched nothing)."""
+        key = NO_MATCH if name is None else name
+        with self._scores_lock:
+            if score > self.scores.get(key, -np.inf):
+                self.scores[key] = score
+
+    def drain(self) -> Optional[MetricsSummary]:
+        """Summary of the rows written since the last drain (None if there are none). Reader side."""
+        written = self.written
+        new = written - self._read  # May exceed capacity if the reader fell behind
+        count = min(new, self.capacity)
+        self._read = written
+        with self._scores_lock:
+            scores, self.scores = self.scores, {}
+        if count <= 0:
+            return None
+        rows = self.rows[np.arange(written - count, written) % self.capacity]
+        # Rates span the intervals since the previous batch's last frame (or this batch's first)
+        previous, intervals = (rows[0], count - 1) if self._last is None else (self._last, new)
+        self._last = rows[-1].copy()
+
+        elapsed = rows[-1, 0] - previous[0]
+        inference = rows[:, 3][~np.isnan(rows[:, 3])] * 1000.0
+        decision = rows[:, 4] * 1000.0
+        return MetricsSummary(
+            frames=count,
+            fps=intervals / elapsed if elapsed > 0 else 0.0,
+            capture_fps=(rows[-1, 1] - previous[1]) / elapsed if elapsed > 0 else 0.0,
+            inference_ms=float(inference.mean()) if len(inference) else float('nan'),
+            inference_p95_ms=float(np.percentile(inference, 95)) if len(inference) else float('nan'),
+            decision_ms=float(decision.mean()),
+            decision_p95_ms=float(np.percentile(decision, 95)),
+            queue_depth=int(rows[:, 5].max()),
+            dropped=int(rows[-1, 2] - previous[2]),
+            dropped_total=int(rows[-1, 2]),
+            scores=scores,
+        )
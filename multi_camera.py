@@ -0,0 +1,271 @@
+"""Multi-camera mode: one capture + MediaPipe worker process per source.
+
+Every source (camera index or video file) gets its own process, so capture and hand
+inference for different cameras run in parallel instead of sharing one GIL. Workers send
+each frame's landmarks back over a pipe in the landmark trace encoding (a few hundred
+bytes per hand, see landmark_trace.encode_frame); a single decision process runs
+Controller and GestureMapper on them.
+
+Only one source drives Controller at a time: the first source that sees a hand becomes
+active and keeps control until a frame from it has no hands, so two cameras never fight
+over the cursor. Per-source capture and inference FPS are reported periodically.
+
+    python multi_camera.py 0 1 [video.mp4 ...] [--roi] [--backend recording]
+"""
+import argparse
+import multiprocessing
+import struct
+import time
+from multiprocessing.connection import wait
+from typing import Dict, List, Optional, Sequence
+
+from landmark_trace import decode_frame, encode_frame
+
+# Worker message: source stats, then one encoded trace frame
+_STATS = struct.Struct('<IIf')  # frames captured, frames dropped, inference seconds
+
+
+def parse_source(source: str):
+    """Device indices become ints, 'synthetic' stays as is (generated frames), anything else is a video path."""
+    return int(source) if source.isdigit() else source
+
+
+def create_hands(max_hands: int = 2, static_image_mode: bool = False):
+    """Default per-worker detector: a MediaPipe Hands instance (static-mode for ROI crops)."""
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(static_image_mode=static_image_mode, max_num_hands=max_hands,
+                                    min_detection_confidence=0.7, min_tracking_confidence=0.5)
+
+
+def camera_worker(source, conn, stop_event, max_hands: int = 2, roi: bool = False,
+                  max_fps: Optional[float] = None, detector_factory=create_hands, frames_conn=None):
+    """Worker process body: capture, flip, convert, detect and send landmarks until stopped.
+
+    With frames_conn, frames come from a separate capture process through shared memory
+    (see shared_frames.py), already mirrored and converted to RGB.
+    """
+    import cv2
+    from frame_capture import FrameGrabber, synthetic_frames
+    from shared_frames import SharedFrameReader
+
+    if frames_conn is not None:
+        grabber = SharedFrameReader(frames_conn)
+    else:
+        if source == 'synthetic':
+            source = synthetic_frames(fps=max_fps or 30)
+        grabber = FrameGrabber(source, max_fps=max_fps).start()
+    detector = detector_factory(max_hands)
+    if roi:
+        from roi_inference import RoiHandDetector
+        detector = RoiHandDetector(detector, detector_factory(max_hands, static_image_mode=True))
+    img_rgb = None  # Reused conversion buffer
+    try:
+        while not stop_event.is_set():
+            success, img = grabber.read(timeout=1.0)
+            if not success:
+                if grabber.isOpened():
+                    continue  # Just a slow frame
+                break
+            if frames_conn is not None:
+                img_rgb = img  # Read in place from the shared ring
+            else:
+                img = cv2.flip(img, 1, dst=img)
+                img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img_rgb)
+            start = time.perf_counter()
+            results = detector.process(img_rgb)
+            inference = time.perf_counter() - start
+            if frames_conn is not None and not grabber.frame_valid():
+                # The capture process reused the slot while we were reading it: a torn frame
+                grabber.frames_overwritten += 1
+                if roi:
+                    detector.reset()  # Its box came from the torn frame too
+                continue
+
+            hands = results.multi_hand_landmarks or []
+            labels, scores = [], []
+            for info in results.multi_handedness or []:
+                labels.append(info.classification[0].label)
+                scores.append(info.classification[0].score)
+            dropped = grabber.frames_dropped + getattr(grabber, 'frames_overwritten', 0)  # Shared ring: torn too
+            conn.send_bytes(_STATS.pack(grabber.frames_captured, dropped, inference) +
+                            encode_frame(time.monotonic(), hands, labels, scores))
+    except (BrokenPipeError, EOFError):
+        pass  # Decision process went away
+    except KeyboardInterrupt:
+        pass
+    finally:
+        img = img_rgb = None  # Drop views into shared memory before releasing it
+        grabber.release()
+        detector.close()
+        conn.close()
+
+
+class SourceStats:
+    """Per-source counters, as seen by the decision process."""
+
+    def __init__(self, source):
+        self.source = source
+        self.frames = 0            # Landmark frames received
+        self.frames_captured = 0   # Reported by the worker
+        self.frames_dropped = 0    # Frames the worker's grabber skipped (inference was slower)
+        self.inference_time = 0.0  # Summed inference seconds since the last report
+        self.latency = 0.0         # Summed worker-to-decision seconds (IPC + queueing) since the last report
+        self._window_frames = 0
+        self._window_captured = 0
+        self.closed = False
+
+    def report(self, elapsed: float) -> str:
+        frames = self.frames - self._window_frames
+        captured = self.frames_captured - self._window_captured
+        mean_ms = self.inference_time / frames * 1000 if frames else 0.0
+        latency_ms = self.latency / frames * 1000 if frames else 0.0
+        self._window_frames, self._window_captured = self.frames, self.frames_captured
+        self.inference_time = self.latency = 0.0
+        state = " (closed)" if self.closed else ""
+        return (f"[{self.source}]{state} capture {captured / elapsed:.1f} FPS, inference {frames / elapsed:.1f} FPS "
+                f"({mean_ms:.1f} ms), latency {latency_ms:.1f} ms, dropped {self.frames_dropped}")
+
+
+class MultiCameraPipeline:
+    """Starts one worker per source and feeds their landmarks to gesture_pipeline.process_hands."""
+
+    def __init__(self, sources: Sequence, max_hands: int = 2, roi: bool = False,
+                 max_fps: Optional[float] = None, detector_factory=create_hands, split_capture: bool = False):
+        self.sources = list(sources)
+        self.max_hands = max_hands
+        self.roi = roi
+        self.max_fps = max_fps
+        self.split_capture = split_capture  # Capture in its own process, frames shared through shared memory
+        self.detector_factory = detector_factory
+        # spawn: MediaPipe and OpenCV are not fork-safe once initialized
+        self._context = multiprocessing.get_context('spawn')
+        self._stop = self._context.Event()
+        self._workers: List = []
+        self._connections: Dict = {}  # Connection -> source index
+        self.stats = [SourceStats(source) for source in self.sources]
+        self.active_source = None  # Index of the source currently driving Controller
+
+    def start(self):
+        from shared_frames import capture_to_ring
+        for index, source in enumerate(self.sources):
+            frames_receiver = None
+            if self.split_capture:
+                frames_receiver, frames_sender = self._context.Pipe(duplex=False)
+                capture = self._context.Process(target=capture_to_ring, name=f"capture-{source}", daemon=True,
+                                                args=(source, frames_sender, self._stop, 4, self.max_fps))
+                capture.start()
+                frames_sender.close()
+                self._workers.append(capture)
+            receiver, sender = self._context.Pipe(duplex=False)
+            worker = self._context.Process(
+                target=camera_worker, name=f"camera-{source}", daemon=True,
+                args=(source, sender, self._stop, self.max_hands, self.roi, self.max_fps, self.detector_factory,
+                      frames_receiver))
+            worker.start()
+            sender.close()  # Only the worker writes; lets recv raise EOFError when it exits
+            if frames_receiver is not None:
+                frames_receiver.close()
+            self._workers.append(worker)
+            self._connections[receiver] = index
+        return self
+
+    def poll(self, timeout: Optional[float] = None) -> int:
+        """Handle every frame that arrived within timeout. Returns the number handled."""
+        from controller import Controller
+        from gesture_pipeline import process_hands
+        handled = 0
+        for conn in wait(list(self._connections), timeout):
+            index = self._connections[conn]
+            try:
+                message = conn.recv_bytes()
+            except (EOFError, OSError):
+                del self._connections[conn]
+                self.stats[index].closed = True
+                if self.active_source == index:
+                    self.active_source = None
+                    process_hands(None)  # Release anything (e.g. a drag) the source was holding
+                continue
+
+            captured, dropped, inference = _STATS.unpack_from(message)
+            frame, _ = decode_frame(message, _STATS.size)
+            stats = self.stats[index]
+            stats.frames += 1
+            stats.frames_captured, stats.frames_dropped = captured, dropped
+            stats.inference_time += inference
+            stats.latency += time.monotonic() - frame.timestamp
+            handled += 1
+
+            has_hands = len(frame.hands) > 0
+            if self.active_source is None and has_hands:
+                self.active_source = index
+                Controller.get_hand_tracker().reset()  # Other camera, other coordinates: start new tracks
+            if self.active_source == index:
+                process_hands(list(frame.hands), frame.labels)
+                if not has_hands:
+                    self.active_source = None  # Hand left this camera; any source may take over
+        return handled
+
+    @property
+    def running(self) -> bool:
+        return bool(self._connections)
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        for worker in self._workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hand gesture control from several cameras/videos at once")
+    parser.add_argument('sources', nargs='+', help="camera indices, video files or 'synthetic'")
+    parser.add_argument('--max-hands', type=int, default=2, help="hands to detect per source")
+    parser.add_argument('--roi', action='store_true', help="run inference on a crop around the tracked hand")
+    parser.add_argument('--max-fps', type=float, help="pace each source to this frame rate (for video files)")
+    parser.add_argument('--split-capture', action='store_true',
+                        help="capture in a separate process per source, sharing frames through shared memory")
+    parser.add_argument('--backend', default='pyautogui', help="input backend: pyautogui, recording or null")
+    parser.add_argument('--config', default='gesture_config.json', help="gesture config to load")
+    parser.add_argument('--stats-interval', type=float, default=5.0, help="seconds between FPS reports")
+    parser.add_argument('--duration', type=float, help="stop after this many seconds")
+    args = parser.parse_args()
+
+    from controller import Controller
+    from gesture_mapper import GestureMapper
+    from input_backend import create_backend
+    backend = create_backend(args.backend)
+    Controller.set_input_backend(backend)
+    Controller.set_gesture_mapper(GestureMapper(args.config, executor=Controller.get_action_executor(),
+                                                backend=backend))
+
+    pipeline = MultiCameraPipeline([parse_source(s) for s in args.sources], max_hands=args.max_hands,
+                                   roi=args.roi, max_fps=args.max_fps, split_capture=args.split_capture).start()
+    print(f"Started {len(args.sources)} camera worker(s). Press Ctrl+C to stop.")
+    start = last_report = time.perf_counter()
+    try:
+        while pipeline.running:
+            pipeline.poll(timeout=0.5)
+            now = time.perf_counter()
+            if now - last_report >= args.stats_interval:
+                for stats in pipeline.stats:
+                    print(stats.report(now - last_report))
+                last_report = now
+            if args.duration and now - start >= args.duration:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pipeline.stop()
+        Controller.get_action_executor().stop() # Let queued input actions finish
+        Controller.get_gesture_mapper().flush_config() # Write pending config changes
+        now = time.perf_counter()
+        for stats in pipeline.stats:
+            print(stats.report(max(now - last_report, 1e-9)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Region-of-interest hand inference.
+
+Once a hand is tracked, its bounding box in the next frame is close to the one from the
+previous frame's landmarks. RoiHandDetector crops the camera frame to a padded box around
+the last landmarks, downscales the crop and runs MediaPipe on that small image instead of
+the full frame. Landmarks are mapped back to full-frame normalized coordinates, so
+Controller and GestureMapper see exactly the coordinates they always did.
+
+When no hand is found in the crop (tracking lost) the same frame is re-run on the full
+image, and a full-frame pass is also forced every `redetect_interval` frames so hands that
+enter outside the box are still picked up.
+
+Crops and full frames go to separate Hands instances. A video-mode instance tracks
+landmarks from one image to the next, so feeding it crops and full frames in turn would
+carry landmarks between two unrelated geometries; crops go to a static-mode instance
+instead (static_image_mode=True), whose results do not depend on the previous image.
+"""
+import copy
+from collections import namedtuple
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Same fields the apps read from MediaPipe's results, plus the box that was used
+RoiResults = namedtuple('RoiResults', [
+    'multi_hand_landmarks',  # Landmarks per hand, in full-frame normalized coordinates
+    'multi_handedness',      # As returned by MediaPipe
+    'roi',                   # (x0, y0, x1, y1) pixel box that was processed, None for a full-frame pass
+])
+
+
+def landmark_bounds(hand_landmarks_list) -> Optional[Tuple[float, float, float, float]]:
+    """Normalized (min_x, min_y, max_x, max_y) over all landmarks of all hands."""
+    if not hand_landmarks_list:
+        return None
+    xs = [lm.x for hand in hand_landmarks_list for lm in hand.landmark]
+    ys = [lm.y for hand in hand_landmarks_list for lm in hand.landmark]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def roi_from_bounds(bounds, frame_size: Tuple[int, int], padding: float = 0.5,
+                    min_size: float = 0.2) -> Tuple[int, int, int, int]:
+    """Square pixel box around normalized bounds, padded and clamped to the frame.
+
+    padding is added on every side as a fraction of the bounds' longest side; min_size is
+    the smallest box side as a fraction of the frame's shorter side.
+    """
+    width, height = frame_size
+    min_x, min_y, max_x, max_y = bounds
+    cx, cy = (min_x + max_x) / 2 * width, (min_y + max_y) / 2 * height
+    side = max((max_x - min_x) * width, (max_y - min_y) * height) * (1 + 2 * padding)
+    side = min(max(side, min_size * min(width, height)), min(width, height))
+    # Shift (rather than shrink) the box to keep it inside the frame
+    x0 = int(round(min(max(cx - side / 2, 0), width - side)))
+    y0 = int(round(min(max(cy - side / 2, 0), height - side)))
+    return x0, y0, x0 + int(round(side)), y0 + int(round(side))
+
+
+def _contains(roi, bounds, frame_size, margin: float) -> bool:
+    """True if the normalized bounds sit inside roi, at least margin (fraction of its side) from the edges."""
+    width, height = frame_size
+    x0, y0, x1, y1 = roi
+    inset = (x1 - x0) * margin
+    return (bounds[0] * width >= x0 + inset and bounds[1] * height >= y0 + inset and
+            bounds[2] * width <= x1 - inset and bounds[3] * height <= y1 - inset)
+
+
+def _downscale(img: np.ndarray, max_side: Optional[int]) -> np.ndarray:
+    if not max_side:
+        return img
+    longest = max(img.shape[:2])
+    if longest <= max_side:
+        return img
+    scale = max_side / longest
+    return cv2.resize(img, (max(1, int(img.shape[1] * scale)), max(1, int(img.shape[0] * scale))),
+                      interpolation=cv2.INTER_AREA)
+
+
+def _remap(hand_landmarks, ox: float, oy: float, sx: float, sy: float):
+    """Copy of a hand's landmarks mapped from crop to full-frame normalized coordinates.
+
+    MediaPipe's own result object is left untouched.
+    """
+    hand = copy.deepcopy(hand_landmarks)
+    for lm in hand.landmark:
+        lm.x = ox + lm.x * sx
+        lm.y = oy + lm.y * sy
+        lm.z = lm.z * sx  # z shares x's scale (relative to image width)
+    return hand
+
+
+class RoiHandDetector:
+    """Drop-in for hands.process(img_rgb) that runs inference on a crop around the tracked hands.
+
+    hands:             a MediaPipe Hands instance (anything with process(rgb_image)) for full frames
+    roi_hands:         a separate static-mode Hands instance (static_image_mode=True) for crops
+    roi_size:          longest side the crop is downscaled to before inference
+    full_size:         longest side for full-frame passes (None keeps the camera resolution)
+    padding:           box padding around the landmarks, as a fraction of the hand size
+    margin:            the box is only re-centered once the hand gets this close to its edge,
+                       so MediaPipe's own tracking sees a stable crop
+    redetect_interval: force a full-frame pass every this many frames (0 disables)
+    """
+
+    def __init__(self, hands, roi_hands, roi_size: int = 256, full_size: Optional[int] = 640, padding: float = 0.5,
+                 margin: float = 0.1, min_size: float = 0.2, redetect_interval: int = 30):
+        self.hands = hands
+        self.roi_hands = roi_hands
+        self.roi_size = roi_size
+        self.full_size = full_size
+        self.padding = padding
+        self.margin = margin
+        self.min_size = min_size
+        self.redetect_interval = redetect_interval
+        self.roi = None  # Current pixel box, None when nothing is tracked
+        self._since_full = 0
+
+        # Statistics
+        self.frames = 0
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.fallbacks = 0  # ROI passes that lost the hand and were re-run on the full frame
+
+    def reset(self):
+        """Forget the tracked box; the next frame gets a full-frame pass."""
+        self.roi = None
+
+    def process(self, img_rgb: np.ndarray) -> RoiResults:
+        self.frames += 1
+        height, width = img_rgb.shape[:2]
+        self._since_full += 1
+        redetect = self.redetect_interval and self._since_full >= self.redetect_interval
+
+        if self.roi is not None and not redetect:
+            results = self._process_roi(img_rgb, self.roi)
+            if results.multi_hand_landmarks:
+                self._update_roi(results.multi_hand_landmarks, (width, height))
+                return results
+            self.fallbacks += 1  # Hand left the box (or was lost); look at the whole frame
+
+        results = self._process_full(img_rgb)
+        self.roi = None
+        if results.multi_hand_landmarks:
+            self._update_roi(results.multi_hand_landmarks, (width, height))
+        return results
+
+    def _process_full(self, img_rgb: np.ndarray) -> RoiResults:
+        self.full_frames += 1
+        self._since_full = 0
+        # Landmarks are normalized, so a uniformly downscaled frame needs no remapping
+        results = self.hands.process(_downscale(img_rgb, self.full_size))
+        return RoiResults(results.multi_hand_landmarks, results.multi_handedness, None)
+
+    def _process_roi(self, img_rgb: np.ndarray, roi) -> RoiResults:
+        self.roi_frames += 1
+        height, width = img_rgb.shape[:2]
+        x0, y0, x1, y1 = roi
+        crop = _downscale(img_rgb[y0:y1, x0:x1], self.roi_size)
+        results = self.roi_hands.process(np.ascontiguousarray(crop))
+        hands = results.multi_hand_landmarks
+        if hands:
+            sx, sy = (x1 - x0) / width, (y1 - y0) / height
+            hands = [_remap(hand, x0 / width, y0 / height, sx, sy) for hand in hands]
+        return RoiResults(hands, results.multi_handedness, roi)
+
+    def _update_roi(self, hand_landmarks_list, frame_size):
+        bounds = landmark_bounds(hand_landmarks_list)
+        if self.roi is not None and _contains(self.roi, bounds, frame_size, self.margin):
+            return  # Still well inside the current box; keep it stable
+        self.roi = roi_from_bounds(bounds, frame_size, self.padding, self.min_size)
+
+    def close(self):
+        self.hands.close()
+        self.roi_hands.close()
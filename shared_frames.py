@@ -0,0 +1,215 @@
+"""Zero-copy frame hand-off between processes through a shared-memory ring.
+
+A SharedFrameRing is one multiprocessing.shared_memory block holding a few preallocated
+frame slots plus a small header of sequence numbers. The capture side flips and converts
+each camera frame straight into the next slot (cv2 dst= buffers, no new arrays), then only
+sends the frame's sequence number to the consumer. The consumer reads the slot in place,
+so a frame is never copied or pickled between stages.
+
+Slots are reused round-robin; a consumer that falls more than `slots - 1` frames behind
+sees its slot overwritten, which frame_valid() reports (the reader always skips to the
+newest frame, so in practice this only happens if inference takes longer than
+`slots` capture intervals). Consumers that read in place check frame_valid() after they
+are done with the frame and drop their results if it was overwritten, as multi_camera's
+workers do after inference.
+
+    capture_to_ring(...)   capture process body (camera/video/'synthetic' -> ring)
+    SharedFrameReader      consumer side, with the same read() API as FrameGrabber
+"""
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+_SEQ = struct.Struct('<q')
+
+
+class SharedFrameRing:
+    """`slots` uint8 frames of `shape` in one shared memory block.
+
+    Header: int64 count of committed frames, then per slot the sequence number of the frame
+    it holds (-1 while being written).
+    """
+
+    def __init__(self, shape: Tuple[int, ...], slots: int = 4, name: Optional[str] = None, create: bool = True):
+        self.shape = tuple(shape)
+        self.slots = slots
+        header_bytes = 8 * (1 + slots)
+        frame_bytes = int(np.prod(self.shape))
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=header_bytes + slots * frame_bytes)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = create
+        self._header = np.ndarray((1 + slots,), dtype=np.int64, buffer=self._shm.buf)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self._shm.buf, offset=header_bytes)
+        if create:
+            self._header[0] = 0
+            self._header[1:] = -1
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def count(self) -> int:
+        """Number of frames committed so far (the next sequence number)."""
+        return int(self._header[0])
+
+    def begin_write(self) -> Tuple[int, np.ndarray]:
+        """Claim the next slot. Returns (sequence number, slot array to write into)."""
+        seq = int(self._header[0])
+        slot = seq % self.slots
+        self._header[1 + slot] = -1
+        return seq, self.frames[slot]
+
+    def commit(self, seq: int):
+        """Publish the frame written after begin_write()."""
+        self._header[1 + seq % self.slots] = seq
+        self._header[0] = seq + 1
+
+    def write_camera_frame(self, frame_bgr: np.ndarray, flip: bool = True) -> int:
+        """Mirror (in place) and convert a BGR camera frame to RGB directly into the next slot."""
+        seq, slot = self.begin_write()
+        if flip:
+            cv2.flip(frame_bgr, 1, dst=frame_bgr)
+        cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=slot)
+        self.commit(seq)
+        return seq
+
+    def frame(self, seq: int) -> Optional[np.ndarray]:
+        """The slot holding frame seq (a view, not a copy), or None if it was overwritten."""
+        slot = seq % self.slots
+        if self._header[1 + slot] != seq:
+            return None
+        return self.frames[slot]
+
+    def frame_valid(self, seq: int) -> bool:
+        """True if frame seq has not been overwritten (check after using a frame() view)."""
+        return self._header[1 + seq % self.slots] == seq
+
+    def close(self):
+        # Views must go before the buffer can be released
+        self._header = self.frames = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # A caller still holds a frame view; the mapping goes away with the process
+        if self._owner:
+            self._shm.unlink()
+
+
+def capture_to_ring(source, conn, stop_event, slots: int = 4, max_fps: Optional[float] = None):
+    """Capture process body: read frames into a SharedFrameRing and send their sequence numbers.
+
+    The first message on conn is (ring name, frame shape, slots); after that each frame is
+    announced as 8 bytes. Frames are mirrored and converted to RGB on the way in.
+    """
+    from frame_capture import synthetic_frames
+    if source == 'synthetic':
+        frames = synthetic_frames(fps=max_fps or 30)
+        read = lambda buffer: (True, next(frames, None))
+    else:
+        capture = cv2.VideoCapture(source)
+        read = capture.read  # read(buffer) decodes into buffer when it already has the right shape
+
+    ring = None
+    raw = None
+    frame_interval = 1.0 / max_fps if max_fps and source != 'synthetic' else 0.0
+    next_due = time.perf_counter()
+    try:
+        while not stop_event.is_set():
+            success, raw = read(raw)
+            if not success or raw is None:
+                break
+            if ring is None:
+                ring = SharedFrameRing(raw.shape, slots)
+                conn.send((ring.name, ring.shape, ring.slots))
+            conn.send_bytes(_SEQ.pack(ring.write_camera_frame(raw)))
+            if frame_interval:
+                next_due += frame_interval
+                delay = next_due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_due = time.perf_counter()
+    except (BrokenPipeError, EOFError):
+        pass  # Consumer went away
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+        if source != 'synthetic':
+            capture.release()
+        if ring is not None:
+            ring.close()
+
+
+class SharedFrameReader:
+    """Consumer side of capture_to_ring: read() returns the newest frame as a view into the ring.
+
+    Frames arrive already mirrored and in RGB. Frames that arrived while the caller was busy
+    are skipped (latest frame wins) and counted in frames_dropped.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.ring = None
+        self._closed = False
+        self.last_seq = -1
+
+        # Statistics (same names as FrameGrabber)
+        self.frames_captured = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self.frames_overwritten = 0  # Frames whose slot was reused before the caller got to them
+
+    def _attach(self, timeout: Optional[float]) -> bool:
+        if not self._conn.poll(timeout):
+            return False
+        name, shape, slots = self._conn.recv()
+        self.ring = SharedFrameRing(shape, slots, name=name, create=False)
+        return True
+
+    def read(self, timeout: Optional[float] = None):
+        """Return (success, frame view) for the newest frame; (False, None) on timeout or end of stream."""
+        if self._closed:
+            return False, None
+        try:
+            if self.ring is None and not self._attach(timeout):
+                return False, None
+            if not self._conn.poll(timeout):
+                return False, None
+            seq = _SEQ.unpack(self._conn.recv_bytes())[0]
+            while self._conn.poll(0):  # Skip to the newest announced frame
+                seq = _SEQ.unpack(self._conn.recv_bytes())[0]
+        except (EOFError, OSError):
+            self._closed = True
+            return False, None
+
+        if self.last_seq >= 0:
+            self.frames_dropped += seq - self.last_seq - 1
+        self.last_seq = seq
+        self.frames_captured = seq + 1
+        frame = self.ring.frame(seq)
+        if frame is None:
+            self.frames_overwritten += 1
+            return self.read(timeout)
+        self.frames_delivered += 1
+        return True, frame
+
+    def frame_valid(self) -> bool:
+        """True if the frame returned by the last read() was not overwritten meanwhile."""
+        return self.ring is not None and self.ring.frame_valid(self.last_seq)
+
+    def isOpened(self) -> bool:
+        return not self._closed
+
+    def release(self):
+        self._closed = True
+        self._conn.close()
+        if self.ring is not None:
+            self.ring.close()
@@ -0,0 +1,259 @@
+"""Packed, vectorized scoring of a gesture signature against all templates at once.
+
+GestureMapper used to loop over gesture_templates in Python and call
+calculate_gesture_similarity per template on every frame. TemplateMatcher compiles the
+templates into a finger-state bitmask column plus a distance-feature matrix, rebuilt
+only when the templates change, and scores every template with a few array operations.
+Scores equal signature_similarity() below (the original per-template code) up to float rounding.
+
+Templates are also bucketed by their 5-bit finger mask. When an acceptance threshold is
+given, buckets are visited in order of Hamming distance from the live finger mask and
+skipped once their best possible score can no longer win or pass the threshold, so most
+frames only score a handful of templates. Results match the full scan exactly.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+FINGER_WEIGHT = 0.7    # Finger state is more important
+DISTANCE_WEIGHT = 0.3  # Distances help differentiate similar poses
+NUM_FINGERS = 5
+
+# Number of set bits for every 5-bit finger mask
+POPCOUNT = np.array([bin(i).count('1') for i in range(1 << NUM_FINGERS)], dtype=np.int64)
+
+
+def finger_mask(fingers_up) -> int:
+    """Pack a [thumb, index, middle, ring, little] boolean list into a 5-bit mask."""
+    mask = 0
+    for bit, is_up in enumerate(fingers_up[:NUM_FINGERS]):
+        if is_up:
+            mask |= 1 << bit
+    return mask
+
+
+def signature_similarity(signature1: Dict, signature2: Dict) -> float:
+    """Calculate similarity between two gesture signatures (reference, one pair at a time)."""
+    if not signature1 or not signature2:
+        return 0.0
+
+    # Compare finger states (up/down)
+    finger_match_score = sum(1 for a, b in zip(signature1['fingers_up'], signature2['fingers_up']) if a == b)
+    finger_score = finger_match_score / len(signature1['fingers_up'])
+
+    # Compare finger distances
+    distance_diffs = []
+    for d1, d2 in zip(signature1['finger_distances'], signature2['finger_distances']):
+        # Normalize difference relative to the distances
+        avg_dist = (d1 + d2) / 2
+        if avg_dist > 0:
+            diff = abs(d1 - d2) / avg_dist
+            distance_diffs.append(max(0, 1 - diff))
+        else:
+            distance_diffs.append(1.0 if d1 == d2 else 0.0)
+
+    distance_score = sum(distance_diffs) / len(distance_diffs) if distance_diffs else 1.0
+
+    # Weighted combination (can adjust weights based on importance)
+    return (finger_score * FINGER_WEIGHT) + (distance_score * DISTANCE_WEIGHT)
+
+
+class TemplateMatcher:
+    """Compiled view of gesture_templates for fast best-match lookup.
+
+    num_features: if set, only templates with exactly this many distance features are
+    compiled (the others were recorded with another signature layout); see `skipped`.
+    """
+
+    def __init__(self, num_features: Optional[int] = None):
+        self.num_features = num_features
+        self.skipped: List[str] = []  # Templates left out by the num_features check
+        self.names: List[str] = []
+        self.masks = np.zeros(0, dtype=np.int64)          # (K,) 5-bit finger masks
+        self.distances = np.zeros((0, 0), dtype=np.float64)  # (K, D) NaN-padded distance features
+        self.dirty = True  # Set by invalidate(); compile() runs lazily on the next match
+        self._ragged = False
+        # For each of the 32 possible live finger masks: [(hamming distance, template rows)]
+        # with the rows of every bucket at that distance, nearest buckets first
+        self._levels = [[] for _ in range(1 << NUM_FINGERS)]
+        self.last_candidates = 0  # Templates scored by the last best_match() call
+
+    def invalidate(self):
+        """Mark the compiled templates stale (call whenever gesture_templates changes)."""
+        self.dirty = True
+
+    def compile(self, templates: Dict[str, Dict]):
+        """Pack templates into the mask column and the distance matrix."""
+        if hasattr(templates, 'compiled_arrays'):
+            # TemplateStore: the records are already packed, no per-template decoding
+            names, masks, distances = templates.compiled_arrays()
+        else:
+            names, masks, distances = self._pack(templates)
+
+        self.skipped = []
+        if self.num_features is not None and len(names):
+            counts = np.count_nonzero(~np.isnan(distances), axis=1)
+            keep = counts == self.num_features
+            if not keep.all():
+                self.skipped = [name for name, kept in zip(names, keep.tolist()) if not kept]
+                names = [name for name, kept in zip(names, keep.tolist()) if kept]
+                masks, distances = masks[keep], distances[keep]
+            distances = distances[:, :self.num_features]
+
+        self.names, self.masks, self.distances = names, masks, distances
+        self._ragged = bool(np.isnan(distances).any())  # Templates with differing feature counts
+        self._build_buckets()
+        self.dirty = False
+
+    @staticmethod
+    def _pack(templates: Dict[str, Dict]):
+        names = [name for name, template in templates.items() if template]  # Skip empty templates
+        width = max((len(templates[n].get('finger_distances', [])) for n in names), default=0)
+
+        masks = np.empty(len(names), dtype=np.int64)
+        distances = np.full((len(names), width), np.nan, dtype=np.float64)
+        for row, name in enumerate(names):
+            template = templates[name]
+            masks[row] = finger_mask(template['fingers_up'])
+            values = template.get('finger_distances', [])
+            distances[row, :len(values)] = values
+        return names, masks, distances
+
+    def _build_buckets(self):
+        """Group template rows by finger mask and precompute the visiting order per live mask."""
+        levels = [[] for _ in range(1 << NUM_FINGERS)]
+        order = np.argsort(self.masks, kind='stable')  # Rows grouped by mask, template order kept
+        bucket_masks, starts = np.unique(self.masks[order], return_index=True)
+        buckets = np.split(order, starts[1:]) if len(order) else []
+        for query_mask in range(1 << NUM_FINGERS):
+            hamming = POPCOUNT[bucket_masks ^ query_mask]
+            for h in range(NUM_FINGERS + 1):
+                at_h = [buckets[b] for b in np.flatnonzero(hamming == h)]
+                if at_h:
+                    # Rows sorted back into template order so argmax keeps the earliest on ties
+                    levels[query_mask].append((h, np.sort(np.concatenate(at_h))))
+        self._levels = levels
+
+    def scores(self, signature: Dict, rows=None) -> np.ndarray:
+        """Similarity of signature to every compiled template (or only the given rows)."""
+        masks = self.masks if rows is None else self.masks[rows]
+        templ = self.distances if rows is None else self.distances[rows]
+        query = np.asarray(signature['finger_distances'], dtype=np.float64)
+        return self._score(finger_mask(signature['fingers_up']), len(signature['fingers_up']), query, masks, templ)
+
+    def _score(self, query_mask, num_fingers: int, query: np.ndarray, masks: np.ndarray,
+               templ: np.ndarray) -> np.ndarray:
+        """Scores for one query (mask scalar, query (D,)) or pairwise for (P,) masks and (P, D) queries."""
+        finger_matches = NUM_FINGERS - POPCOUNT[masks ^ query_mask]
+        finger_score = finger_matches / num_fingers
+
+        width = min(query.shape[-1], templ.shape[1])  # zip() semantics: compare the common prefix
+        if width == 0:
+            distance_score = np.ones(finger_score.shape)
+        else:
+            d1 = query[..., :width]
+            d2 = templ[:, :width]
+            avg = (d1 + d2) / 2
+            with np.errstate(divide='ignore', invalid='ignore'):
+                per_feature = np.maximum(0, 1 - np.abs(d1 - d2) / avg)
+            zero_avg = avg <= 0
+            if zero_avg.any():
+                per_feature = np.where(zero_avg, d1 == d2, per_feature)
+            if self._ragged:
+                valid = ~np.isnan(d2)
+                per_feature = np.where(valid, per_feature, 0.0)
+                counts = valid.sum(axis=1)
+                distance_score = np.where(counts > 0, per_feature.sum(axis=-1) / np.maximum(counts, 1), 1.0)
+            else:
+                distance_score = per_feature.sum(axis=-1) / width
+
+        return (finger_score * FINGER_WEIGHT) + (distance_score * DISTANCE_WEIGHT)
+
+    def best_match(self, signature: Dict, threshold: Optional[float] = None) -> Tuple[Optional[str], float]:
+        """(name, similarity) of the best template; ties go to the earliest template.
+
+        With a threshold, only templates that can still score above it are examined and
+        (None, best score seen) is returned when none does.
+        """
+        if not self.names:
+            self.last_candidates = 0
+            return None, -1.0
+        if threshold is None:
+            scores = self.scores(signature)
+            best = int(np.argmax(scores))
+            self.last_candidates = len(scores)
+            return self.names[best], float(scores[best])
+
+        num_fingers = len(signature['fingers_up'])
+        best_row, best_score, scored = -1, -1.0, 0
+        for hamming, rows in self._levels[finger_mask(signature['fingers_up'])]:
+            # Upper bound for this level: its finger score plus a perfect distance score
+            bound = ((NUM_FINGERS - hamming) / num_fingers * FINGER_WEIGHT) + (1.0 * DISTANCE_WEIGHT)
+            if bound <= threshold or bound < best_score:
+                break  # Levels only get worse from here
+            scores = self.scores(signature, rows)
+            scored += len(rows)
+            i = int(np.argmax(scores))
+            score, row = float(scores[i]), int(rows[i])
+            if score > best_score or (score == best_score and row < best_row):
+                best_row, best_score = row, score
+
+        self.last_candidates = scored
+        if best_row < 0 or best_score <= threshold:
+            return None, best_score
+        return self.names[best_row], best_score
+
+    def best_matches(self, signatures: List[Dict], threshold: float) -> List[Tuple[Optional[str], float]]:
+        """best_match() for several signatures (e.g. every hand in a frame), scored together.
+
+        Works through the mask buckets like best_match(), one Hamming level per round, but
+        each round scores the candidate rows of every hand that still needs them in a single
+        vectorized call (one (hand, template) pair per row). Usually one round settles
+        every hand. Results are identical to calling best_match() per hand.
+        """
+        shapes = {(len(s['fingers_up']), len(s['finger_distances'])) for s in signatures}
+        if len(signatures) <= 1 or not self.names or len(shapes) != 1:
+            return [self.best_match(signature, threshold) for signature in signatures]
+
+        num_fingers, width = shapes.pop()
+        hands = len(signatures)
+        query_masks = np.array([finger_mask(s['fingers_up']) for s in signatures], dtype=np.int64)
+        queries = np.array([s['finger_distances'] for s in signatures], dtype=np.float64).reshape(hands, width)
+        levels = [self._levels[mask] for mask in query_masks]
+        best_row = np.full(hands, -1, dtype=np.int64)
+        best_score = np.full(hands, -1.0)
+        depth = [0] * hands
+        scored = 0
+        while True:
+            active, candidates = [], []
+            for hand in range(hands):
+                if depth[hand] >= len(levels[hand]):
+                    continue
+                hamming, rows = levels[hand][depth[hand]]
+                bound = ((NUM_FINGERS - hamming) / num_fingers * FINGER_WEIGHT) + (1.0 * DISTANCE_WEIGHT)
+                if bound <= threshold or bound < best_score[hand]:
+                    depth[hand] = len(levels[hand])  # Done: deeper levels only get worse
+                    continue
+                depth[hand] += 1
+                active.append(hand)
+                candidates.append(rows)
+            if not active:
+                break
+
+            rows = np.concatenate(candidates)
+            owner = np.repeat(active, [len(r) for r in candidates])
+            scores = self._score(query_masks[owner], num_fingers, queries[owner],
+                                 self.masks[rows], self.distances[rows])
+            scored += len(rows)
+            start = 0
+            for hand, hand_rows in zip(active, candidates):
+                # Rows within a level are in template order, so argmax keeps the earliest on ties
+                i = int(np.argmax(scores[start:start + len(hand_rows)]))
+                score, row = float(scores[start + i]), int(hand_rows[i])
+                if score > best_score[hand] or (score == best_score[hand] and row < best_row[hand]):
+                    best_row[hand], best_score[hand] = row, score
+                start += len(hand_rows)
+
+        self.last_candidates = scored
+        return [(self.names[row], float(score)) if row >= 0 and score > threshold else (None, float(score))
+                for row, score in zip(best_row, best_score)]
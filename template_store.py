@@ -0,0 +1,278 @@
+"""Binary, memory-mapped gesture template store.
+
+gesture_config.json used to hold every template, so loading parsed all of them and every
+mapping change or recording re-serialized the whole library. Templates now live in a
+compact binary file next to the config (gesture_config.templates), as fixed-width records:
+
+    header   b'HGTMPL' + uint16 version + uint16 distance width (16 bytes)
+    record   uint8 flags (bit 0: live), uint8 finger mask, uint8 finger count,
+             uint8 distance count, 64-byte UTF-8 name, width x float32 distances (NaN padded)
+
+The file is memory-mapped when opened; the name index (name -> record) is built from
+the name column. Adding a template appends one record and updating one rewrites just
+that record in place. Removal marks the record dead, and dead records are compacted away
+once they make up half the file. A template wider than the records rewrites the file with
+wider records (stores from before the 30-feature signatures have 8 slots). TemplateStore
+behaves like the gesture_templates dict it replaces, and TemplateMatcher compiles straight
+from its arrays. JSON stays available through import_json()/export_json().
+
+The GUI thread writes (recording, import, removal) while the vision thread reads. A write
+builds the new memory map and name index first and swaps both in one assignment under
+the store's lock. Readers copy what they need out of the map while holding that lock, so
+no view of a map outlives it: compact() can close the map before it replaces the file,
+which Windows refuses to do while any view is left. Should the replace still fail there
+(a virus scanner or sync client holding the file), the file is rewritten in place.
+"""
+import json
+import os
+import struct
+import threading
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from template_matcher import NUM_FINGERS, finger_mask
+
+MAGIC = b'HGTMPL'
+VERSION = 1
+DEFAULT_WIDTH = 32  # Distance slots per record (hand_features.NUM_FEATURES fits)
+NAME_BYTES = 64
+_HEADER = struct.Struct('<6sHH6x')
+_LIVE = 1
+
+
+def record_dtype(width: int) -> np.dtype:
+    return np.dtype([('flags', 'u1'), ('mask', 'u1'), ('num_fingers', 'u1'), ('num_distances', 'u1'),
+                     ('name', f'S{NAME_BYTES}'), ('distances', '<f4', (width,))])
+
+
+def store_path_for(config_file: str) -> str:
+    """Template store that belongs to a config file: gesture_config.json -> gesture_config.templates"""
+    return os.path.splitext(config_file)[0] + '.templates'
+
+
+class TemplateStore(MutableMapping):
+    """Dict-like view (name -> {'fingers_up', 'finger_distances'}) over a template file."""
+
+    def __init__(self, path: str, width: int = DEFAULT_WIDTH):
+        self.path = path
+        self.width = width
+        self._records = None  # np.memmap of the record array (None while the file is empty/missing)
+        self._index: Dict[str, int] = {}  # Name -> record row
+        self._dead = 0
+        self._lock = threading.RLock()  # Guards _records/_index swaps and in-place record writes
+        self._write_lock = threading.RLock()  # Serializes writers
+        self._open()
+
+    # --- File handling ---
+    def _open(self):
+        records, index, dead = None, {}, 0
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                header = f.read(_HEADER.size)
+            magic, version, width = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"'{self.path}' is not a template store")
+            if version != VERSION:
+                raise ValueError(f"Unsupported template store version {version} in '{self.path}'")
+            self.width = width
+            records = self._map()
+            if records is not None:
+                live = np.flatnonzero(records['flags'] & _LIVE)
+                names = records['name'][live].tolist()
+                index = {name.decode('utf-8'): row for name, row in zip(names, live.tolist())}
+                dead = len(records) - len(live)
+        with self._lock:
+            self._records, self._index = records, index
+        self._dead = dead
+
+    def _map(self) -> Optional[np.memmap]:
+        """A new map of the record array with the file's current length (None if it has no records)."""
+        dtype = record_dtype(self.width)
+        count = (os.path.getsize(self.path) - _HEADER.size) // dtype.itemsize
+        if not count:
+            return None
+        return np.memmap(self.path, dtype=dtype, mode='r+', offset=_HEADER.size, shape=(count,))
+
+    def _snapshot(self) -> Tuple[Optional[np.memmap], Dict[str, int]]:
+        """The current (records, index) pair, consistent with each other (writers only; readers copy
+        rows under the lock so compact() never replaces a file that is still mapped)."""
+        with self._lock:
+            return self._records, self._index
+
+    def _close_map(self):
+        with self._lock:
+            if self._records is not None:
+                self._records.flush()
+            self._records, self._index = None, {}  # Unmapped once the last view of it goes away
+
+    def _encode(self, name: str, template: Dict) -> np.ndarray:
+        encoded_name = name.encode('utf-8')
+        if len(encoded_name) > NAME_BYTES:
+            raise ValueError(f"Gesture name '{name}' is longer than {NAME_BYTES} bytes")
+        fingers = template.get('fingers_up', [])
+        distances = template.get('finger_distances', [])
+        if len(distances) > self.width:
+            raise ValueError(f"Template '{name}' has {len(distances)} distances, the store holds {self.width}")
+        record = np.zeros(1, dtype=record_dtype(self.width))
+        record['flags'] = _LIVE
+        record['mask'] = finger_mask(fingers)
+        record['num_fingers'] = min(len(fingers), NUM_FINGERS)
+        record['num_distances'] = len(distances)
+        record['name'] = encoded_name
+        record['distances'] = np.nan
+        record['distances'][0, :len(distances)] = distances
+        return record
+
+    def _append(self, records: np.ndarray):
+        new_file = not os.path.exists(self.path)
+        old_records, old_index = self._snapshot()
+        start = 0 if old_records is None else len(old_records)
+        if old_records is not None:
+            old_records.flush()
+        # Appending leaves the current map's rows as they are, so readers carry on with it meanwhile
+        with open(self.path, 'ab') as f:
+            if new_file:
+                f.write(_HEADER.pack(MAGIC, VERSION, self.width))
+            f.write(records.tobytes())
+        new_records = self._map()
+        index = dict(old_index)
+        for row, name in enumerate(records['name'].tolist(), start):
+            index[name.decode('utf-8')] = row
+        with self._lock:
+            self._records, self._index = new_records, index
+
+    def compact(self, width: Optional[int] = None):
+        """Rewrite the file without dead records (temp file + atomic rename), optionally with wider records."""
+        with self._write_lock:
+            old_records, old_index = self._snapshot()
+            width = max(width or self.width, self.width)
+            live = np.zeros(len(old_index), dtype=record_dtype(width))
+            records = None
+            if old_index:
+                records = old_records[np.fromiter(old_index.values(), dtype=np.int64, count=len(old_index))]
+                for field in ('flags', 'mask', 'num_fingers', 'num_distances', 'name'):
+                    live[field] = records[field]
+                live['distances'] = np.nan
+                live['distances'][:, :self.width] = records['distances']
+            contents = _HEADER.pack(MAGIC, VERSION, width) + live.tobytes()
+            del old_records, records  # No view of the old map may be left when it is closed
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(contents)
+            # Readers wait out the swap: the old map must be closed before the file is replaced
+            with self._lock:
+                self._close_map()
+                try:
+                    os.replace(tmp_path, self.path)
+                except PermissionError:
+                    # Windows: another process still has the file open. Rewriting it in place needs no rename
+                    with open(self.path, 'r+b') as f:
+                        f.write(contents)
+                        f.truncate()
+                    os.remove(tmp_path)
+                self._open()
+
+    def _ensure_width(self, templates):
+        """Widen the records if any of these templates has more distances than they hold."""
+        needed = max((len(t.get('finger_distances', [])) for t in templates if t), default=0)
+        if needed <= self.width:
+            return
+        if os.path.exists(self.path):
+            self.compact(max(needed, DEFAULT_WIDTH))
+        else:
+            self.width = max(needed, DEFAULT_WIDTH)
+
+    def close(self):
+        self._close_map()
+
+    # --- Mapping interface ---
+    def __getitem__(self, name: str) -> Dict:
+        with self._lock:
+            record = self._records[self._index[name]]
+            return {
+                'fingers_up': [bool(record['mask'] >> bit & 1) for bit in range(record['num_fingers'])],
+                'finger_distances': [float(d) for d in record['distances'][:record['num_distances']]],
+            }
+
+    def __setitem__(self, name: str, template: Dict):
+        with self._write_lock:
+            self._ensure_width([template])
+            record = self._encode(name, template)
+            row = self._index.get(name)
+            if row is None:
+                self._append(record)
+            else:
+                with self._lock:
+                    self._records[row] = record[0]  # In place; only this record's pages get written
+                self._records.flush()
+
+    def __delitem__(self, name: str):
+        with self._write_lock:
+            records, index = self._snapshot()
+            row = index[name]
+            index = dict(index)
+            del index[name]
+            with self._lock:
+                self._index = index  # Same map, one name fewer
+                records['flags'][row] = 0
+            records.flush()
+            self._dead += 1
+            mostly_dead = self._dead * 2 >= len(records)
+            del records  # compact() closes this map
+            if mostly_dead:
+                self.compact()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._snapshot()[1]))
+
+    def __len__(self) -> int:
+        return len(self._snapshot()[1])
+
+    def __contains__(self, name) -> bool:
+        return name in self._snapshot()[1]
+
+    # --- Matcher support ---
+    def compiled_arrays(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """(names, finger masks, NaN-padded float64 distances) of live templates, in insertion order."""
+        with self._lock:
+            index = self._index
+            if not index:
+                return [], np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float64)
+            rows = np.fromiter(index.values(), dtype=np.int64, count=len(index))
+            records = self._records[rows]  # Fancy indexing copies: nothing left referencing the map
+        width = int(records['num_distances'].max())
+        return (list(index), records['mask'].astype(np.int64),
+                records['distances'][:, :width].astype(np.float64))
+
+    # --- JSON import/export ---
+    def import_templates(self, templates: Dict[str, Dict]):
+        """Add or replace templates from a gesture_templates-style dict (new ones in a single append)."""
+        if not templates:
+            return
+        with self._write_lock:
+            self._ensure_width(templates.values())
+            records = [self._encode(name, template) for name, template in templates.items()
+                       if template and name not in self._index]
+            for name, template in templates.items():
+                if template and name in self._index:
+                    self[name] = template
+            if records:
+                self._append(np.concatenate(records))
+
+    def import_json(self, path: str) -> int:
+        """Import the 'gesture_templates' of a JSON config. Returns the number of templates read."""
+        with open(path, 'r') as f:
+            templates = json.load(f).get('gesture_templates', {})
+        self.import_templates(templates)
+        return len(templates)
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {name: self[name] for name in self}
+
+    def export_json(self, path: str, gesture_mapping: Optional[Dict[str, str]] = None):
+        """Write templates (and optionally mappings) in the gesture_config.json format."""
+        data = {'gesture_mapping': gesture_mapping or {}, 'gesture_templates': self.to_dict()}
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=4)
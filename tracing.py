@@ -0,0 +1,105 @@
+"""Hot-path tracing: named spans in a preallocated ring, exported as Chrome trace JSON.
+
+Spans are recorded at the call sites with the same now()/lap() protocol as the stage
+timer process_hands() takes (see benchmarks/pipeline.py), guarded so that a disabled
+tracer costs one attribute test per site:
+
+    t = tracer.now() if tracer.enabled else 0
+    ...work...
+    if t: tracer.lap('match_gestures', t)
+
+Enabled, a span is one perf_counter_ns() call, a name lookup and four stores into
+preallocated int64 arrays; the ring keeps the newest `capacity` spans and is safe to
+write from several threads (the vision loop, the action executor). export_chrome()
+writes them as complete ('X') events for chrome://tracing or https://ui.perfetto.dev.
+
+The process-wide `tracer` starts disabled; app_with_gui.py --profile FILE enables it and
+writes the trace on exit.
+"""
+import itertools
+import json
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class Tracer:
+    """Ring of (name, start, duration, thread) spans; times are perf_counter_ns()."""
+
+    def __init__(self, capacity: int = 65536, enabled: bool = False):
+        self.enabled = enabled
+        self.now = time.perf_counter_ns
+        self._names: Dict[str, int] = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        self.capacity = capacity
+        self._name_ids = np.full(capacity, -1, dtype=np.int64)  # -1: slot never written
+        self._starts = np.zeros(capacity, dtype=np.int64)
+        self._durations = np.zeros(capacity, dtype=np.int64)
+        self._threads = np.zeros(capacity, dtype=np.int64)
+        self._slots = itertools.count()  # next() is atomic, so concurrent writers never share a slot
+
+    def enable(self, capacity: int = None):
+        """Start recording (optionally with a new ring size, which clears the ring)."""
+        if capacity is not None and capacity != self.capacity:
+            self._allocate(capacity)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self._allocate(self.capacity)
+
+    def lap(self, name: str, start: int) -> int:
+        """Record a span from start to now; returns now (so consecutive stages can chain)."""
+        end = time.perf_counter_ns()
+        name_id = self._names.get(name)
+        if name_id is None:
+            name_id = self._names.setdefault(name, len(self._names))
+        slot = next(self._slots) % self.capacity
+        self._starts[slot] = start
+        self._durations[slot] = end - start
+        self._threads[slot] = threading.get_ident()
+        self._name_ids[slot] = name_id
+        return end
+
+    def spans(self) -> List[Tuple[str, int, int, int]]:
+        """(name, start ns, duration ns, thread id) of every span in the ring, oldest first."""
+        names = {name_id: name for name, name_id in self._names.items()}
+        written = np.flatnonzero(self._name_ids >= 0)
+        order = written[np.argsort(self._starts[written], kind='stable')]
+        return [(names[int(self._name_ids[i])], int(self._starts[i]), int(self._durations[i]), int(self._threads[i]))
+                for i in order]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per span name: count, mean and p95 duration in ms."""
+        durations: Dict[str, List[int]] = {}
+        for name, _, duration, _ in self.spans():
+            durations.setdefault(name, []).append(duration)
+        result = {}
+        for name, values in durations.items():
+            ms = np.asarray(values) / 1e6
+            result[name] = {'count': len(ms), 'mean_ms': float(ms.mean()), 'p95_ms': float(np.percentile(ms, 95))}
+        return result
+
+    def export_chrome(self, path: str) -> int:
+        """Write the ring as Chrome trace event JSON. Returns the number of spans written."""
+        spans = self.spans()
+        origin = spans[0][1] if spans else 0
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid,
+                   'args': {'name': thread_names.get(tid, f"thread {tid}")}}
+                  for tid in sorted({span[3] for span in spans})]
+        events += [{'name': name, 'ph': 'X', 'pid': 1, 'tid': tid,
+                    'ts': (start - origin) / 1000.0, 'dur': duration / 1000.0}  # Microseconds
+                   for name, start, duration, tid in spans]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(spans)
+
+
+tracer = Tracer()  # Process-wide tracer used by the instrumented modules